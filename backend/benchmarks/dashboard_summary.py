@@ -0,0 +1,85 @@
+"""Compare dashboard and team read latency: ticket scans vs SLA rollups
+
+Needs a running mongod. Usage, from the backend directory:
+
+    python -m benchmarks.dashboard_summary --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'sla_tracker_bench')
+
+import server  # noqa: E402
+from benchmarks import legacy  # noqa: E402
+from benchmarks.synthetic import synthetic_ticket_documents  # noqa: E402
+
+IMPLEMENTATIONS = [
+    ('dashboard', 'seven queries', legacy.seven_query_dashboard_summary),
+    ('dashboard', '$facet tickets', legacy.facet_dashboard_summary),
+    ('dashboard', 'rollups', server.compute_dashboard_summary),
+    ('team', '$group tickets', legacy.ticket_team_performance),
+    ('team', 'rollups', server.compute_team_performance),
+]
+
+
+async def seed(size: int, batch_size: int = 10000):
+    """Replace the benchmark tickets with size synthetic documents"""
+    await server.db.tickets.drop()
+    batch = []
+    for document in synthetic_ticket_documents(size):
+        batch.append(server.stored_ticket(document))
+        if len(batch) >= batch_size:
+            await server.db.tickets.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await server.db.tickets.insert_many(batch, ordered=False)
+    await server.ensure_indexes()
+    await server.rebuild_sla_rollups()
+
+
+async def time_calls(func, repeat: int):
+    """Return per-call latencies in milliseconds after one warm-up call"""
+    await func()
+    latencies = []
+    for _ in range(repeat):
+        started = perf_counter()
+        await func()
+        latencies.append((perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    
+    print(f"{'tickets':>10}  {'endpoint':<11}{'implementation':<16}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for size in args.sizes:
+        await seed(size)
+        for endpoint, label, func in IMPLEMENTATIONS:
+            latencies = await time_calls(func, args.repeat)
+            print(
+                f"{size:>10}  {endpoint:<11}{label:<16}"
+                f"{percentile(latencies, 0.5):>10.1f}{percentile(latencies, 0.95):>10.1f}{statistics.mean(latencies):>10.1f}"
+            )
+    
+    await server.db.tickets.drop()
+    await server.db.sla_rollups.drop()
+    server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
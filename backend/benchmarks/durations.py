@@ -0,0 +1,74 @@
+"""Time time_series_to_hours against parse_time_to_hours
+
+Both run over a synthetic column shaped like a real upload, and their
+results are compared before the timings are printed; the cell-by-cell
+golden corpus lives in tests/test_durations.py. Runs without a database.
+Usage, from the backend directory:
+
+    python -m benchmarks.durations --size 1000000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+from datetime import time
+from pathlib import Path
+from time import perf_counter
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'sla_tracker_bench')
+
+import server  # noqa: E402
+
+
+def same(expected, actual) -> bool:
+    """Scalar and column results agree; NaN and None both mean no value once stored"""
+    expected_missing = expected is None or (isinstance(expected, float) and math.isnan(expected))
+    actual_missing = actual is None or (isinstance(actual, float) and math.isnan(actual))
+    if expected_missing or actual_missing:
+        return expected_missing and actual_missing
+    return expected == actual
+
+
+def synthetic_column(size: int, rng: random.Random) -> pd.Series:
+    """A mixed column shaped like a real upload: mostly hh:mm text and times, some fractions and blanks"""
+    shapes = [
+        lambda: f"{rng.randint(0, 72):02d}:{rng.randint(0, 59):02d}",
+        lambda: f"{rng.randint(0, 3)} days {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+        lambda: time(rng.randint(0, 23), rng.randint(0, 59)),
+        lambda: rng.random() * 3,
+        lambda: None,
+    ]
+    weights = [50, 15, 20, 10, 5]
+    return pd.Series([rng.choices(shapes, weights)[0]() for _ in range(size)], dtype=object)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    
+    column = synthetic_column(args.size, rng)
+    started = perf_counter()
+    expected = column.map(server.parse_time_to_hours)
+    per_cell = perf_counter() - started
+    started = perf_counter()
+    actual = server.time_series_to_hours(column)
+    vectorized = perf_counter() - started
+    
+    if not all(same(want, got) for want, got in zip(expected, actual)):
+        sys.exit("synthetic column: results differ")
+    print(f"{'implementation':<16}{'seconds':>10}{'ns/value':>10}")
+    print(f"{'per cell':<16}{per_cell:>10.2f}{per_cell * 1e9 / args.size:>10.0f}")
+    print(f"{'vectorized':<16}{vectorized:>10.2f}{vectorized * 1e9 / args.size:>10.0f}")
+    print(f"speedup: {per_cell / vectorized:.1f}x over {args.size} values")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""Ticket-scanning implementations the API used before SLA rollups, kept for comparison"""
+from typing import Any, Dict, List
+
+import server
+
+# Tickets store these fields as integer codes
+RESOLVED = server.stored_code('status', server.TicketStatus.RESOLVED.value)
+MET = server.SLA_STATUS_CODES[server.SLAStatus.MET.value]
+BREACHED = server.SLA_STATUS_CODES[server.SLAStatus.BREACHED.value]
+
+
+def pending_by_team_pipeline() -> List[Dict[str, Any]]:
+    """Count non-resolved tickets per normalized team"""
+    return [
+        {"$match": {"status": {"$ne": RESOLVED}}},  # Count tickets that are NOT resolved
+        {
+            "$addFields": {
+                # Normalize team names same as team performance
+                "team": {
+                    "$cond": {
+                        "if": {
+                            "$or": [
+                                {"$eq": ["$updated_team", None]}, 
+                                {"$eq": ["$updated_team", ""]},
+                                {"$eq": ["$updated_team", "null"]}
+                            ]
+                        },
+                        "then": "L1",
+                        "else": "$updated_team"
+                    }
+                }
+            }
+        },
+        {
+            "$group": {
+                "_id": "$team",
+                "pending_count": {"$sum": 1}
+            }
+        }
+    ]
+
+
+def top_performers_pipeline() -> List[Dict[str, Any]]:
+    """Rank agents by a balanced score of SLA performance and ticket volume"""
+    return [
+        # The baseline wrote {"$ne": None, "$ne": ""}; Python keeps the last key, so tickets without an agent still matched
+        {"$match": {"resolved_by": {"$ne": ""}}},
+        {
+            "$group": {
+                "_id": "$resolved_by",
+                "total_tickets": {"$sum": 1},
+                "response_sla_met": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$response_sla_status", MET]}, 1, 0]
+                    }
+                },
+                "resolution_sla_met": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$resolution_sla_status", MET]}, 1, 0]
+                    }
+                }
+            }
+        }
+    ] + server.top_performers_ranking_stages()
+
+
+def dashboard_summary_pipeline() -> List[Dict[str, Any]]:
+    """Compute totals, pending-by-team and top performers in one $facet pass"""
+    return [
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_tickets": {"$sum": 1},
+                            "tickets_closed": {
+                                "$sum": {"$cond": [{"$eq": ["$status", RESOLVED]}, 1, 0]}
+                            },
+                            "response_sla_met": {
+                                "$sum": {"$cond": [{"$eq": ["$response_sla_status", MET]}, 1, 0]}
+                            },
+                            "resolution_sla_met": {
+                                "$sum": {"$cond": [{"$eq": ["$resolution_sla_status", MET]}, 1, 0]}
+                            },
+                            "sla_breaches": {
+                                "$sum": {
+                                    "$cond": [
+                                        {
+                                            "$or": [
+                                                {"$eq": ["$response_sla_status", BREACHED]},
+                                                {"$eq": ["$resolution_sla_status", BREACHED]}
+                                            ]
+                                        },
+                                        1,
+                                        0
+                                    ]
+                                }
+                            }
+                        }
+                    }
+                ],
+                "pending_by_team": pending_by_team_pipeline(),
+                "top_performers": top_performers_pipeline()
+            }
+        }
+    ]
+
+
+def team_performance_pipeline() -> List[Dict[str, Any]]:
+    """Aggregate SLA metrics per normalized team (L1, L2, Business Team, others)"""
+    return [
+        {
+            "$addFields": {
+                # Ensure we have a team for every ticket, default to L1
+                "team": {
+                    "$cond": {
+                        "if": {
+                            "$or": [
+                                {"$eq": ["$updated_team", None]}, 
+                                {"$eq": ["$updated_team", ""]},
+                                {"$eq": ["$updated_team", "null"]}
+                            ]
+                        },
+                        "then": "L1",
+                        "else": "$updated_team"
+                    }
+                }
+            }
+        },
+        {
+            "$group": {
+                "_id": "$team",
+                "total_tickets": {"$sum": 1},
+                "response_sla_met": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$response_sla_status", MET]}, 1, 0]
+                    }
+                },
+                "resolution_sla_met": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$resolution_sla_status", MET]}, 1, 0]
+                    }
+                },
+                "response_sla_breached": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$response_sla_status", BREACHED]}, 1, 0]
+                    }
+                },
+                "resolution_sla_breached": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$resolution_sla_status", BREACHED]}, 1, 0]
+                    }
+                },
+                "response_times": {"$push": "$response_time_hours"},
+                "resolution_times": {"$push": "$resolution_time_hours"}
+            }
+        },
+        {
+            "$project": {
+                "team_name": "$_id",
+                "total_tickets": 1,
+                "response_sla_met": 1,
+                "resolution_sla_met": 1,
+                "response_sla_breached": 1,
+                "resolution_sla_breached": 1,
+                "response_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$response_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                },
+                "resolution_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$resolution_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                },
+                # Calculate averages by filtering out null values
+                "avg_response_time": {
+                    "$cond": {
+                        "if": {"$gt": [{"$size": {"$filter": {"input": "$response_times", "cond": {"$ne": ["$$this", None]}}}}, 0]},
+                        "then": {
+                            "$avg": {
+                                "$filter": {
+                                    "input": "$response_times",
+                                    "cond": {"$ne": ["$$this", None]}
+                                }
+                            }
+                        },
+                        "else": 0
+                    }
+                },
+                "avg_resolution_time": {
+                    "$cond": {
+                        "if": {"$gt": [{"$size": {"$filter": {"input": "$resolution_times", "cond": {"$ne": ["$$this", None]}}}}, 0]},
+                        "then": {
+                            "$avg": {
+                                "$filter": {
+                                    "input": "$resolution_times", 
+                                    "cond": {"$ne": ["$$this", None]}
+                                }
+                            }
+                        },
+                        "else": 0
+                    }
+                }
+            }
+        }
+    ] + server.team_sort_stages()
+
+
+
+async def seven_query_dashboard_summary():
+    """Dashboard figures via four counts, a breach count and two aggregates"""
+    db = server.db
+    total_tickets = await db.tickets.count_documents({})
+    await db.tickets.count_documents({"status": RESOLVED})
+    await db.tickets.count_documents({"status": {"$ne": RESOLVED}})
+    await db.tickets.aggregate(pending_by_team_pipeline()).to_list(None)
+    await db.tickets.count_documents({"response_sla_status": MET})
+    await db.tickets.count_documents({"resolution_sla_status": MET})
+    await db.tickets.count_documents({
+        "$or": [
+            {"response_sla_status": BREACHED},
+            {"resolution_sla_status": BREACHED}
+        ]
+    })
+    await db.tickets.aggregate(top_performers_pipeline()).to_list(None)
+    return total_tickets
+
+
+async def facet_dashboard_summary():
+    """Dashboard figures via one $facet scan of the tickets collection"""
+    return await server.db.tickets.aggregate(dashboard_summary_pipeline()).to_list(1)
+
+
+async def ticket_team_performance():
+    """Team figures via a $group over every ticket"""
+    return await server.db.tickets.aggregate(team_performance_pipeline()).to_list(None)
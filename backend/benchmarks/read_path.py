@@ -0,0 +1,69 @@
+"""Per-row cost of serializing ticket reads: pydantic models vs projected rows + orjson
+
+Runs without a database, on synthetic documents shaped like stored tickets.
+Usage, from the backend directory:
+
+    python -m benchmarks.read_path --rows 1000 --repeat 50
+"""
+import argparse
+import os
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'sla_tracker_bench')
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import server  # noqa: E402
+from benchmarks.synthetic import synthetic_ticket_documents  # noqa: E402
+
+
+def model_path(documents):
+    """The previous read path: re-validate every document, then encode it again"""
+    tickets = [server.Ticket(**server.parse_from_mongo(dict(document))) for document in documents]
+    return JSONResponse(content=jsonable_encoder({"tickets": tickets})).body
+
+
+def fast_path(documents):
+    """The current read path: lay out the projected fields and render with orjson"""
+    rows = server.response_rows(documents, server.TICKET_RESPONSE_FIELDS)
+    return server.FastJSONResponse({"tickets": rows}).body
+
+
+def time_per_row(func, documents, repeat: int):
+    """Return per-row costs in microseconds, one sample per repeat, after a warm-up call"""
+    func(documents)
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func(documents)
+        samples.append((perf_counter() - started) * 1e6 / len(documents))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    
+    documents = list(synthetic_ticket_documents(args.rows))
+    if model_path(documents) != fast_path(documents):
+        sys.exit("read paths produced different response bodies")
+    
+    print(f"{'implementation':<16}{'p50 us/row':>12}{'mean us/row':>13}")
+    results = {}
+    for label, func in (('pydantic models', model_path), ('rows + orjson', fast_path)):
+        samples = time_per_row(func, documents, args.repeat)
+        results[label] = statistics.median(samples)
+        print(f"{label:<16}{statistics.median(samples):>12.2f}{statistics.mean(samples):>13.2f}")
+    print(f"speedup: {results['pydantic models'] / results['rows + orjson']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
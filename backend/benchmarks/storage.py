@@ -0,0 +1,112 @@
+"""Compare ticket document sizes: the earlier full shape vs compact storage
+
+The full shape is what ingest stored before: a uuid id, an ISO created_at,
+every null field and enum values as text. The compact shape is what
+server.ticket_documents stores now. Without --mongo this only BSON-encodes
+both, so it runs without a database. With --mongo both shapes are loaded into
+scratch collections with the ticket indexes and collStats is reported.
+Usage, from the backend directory:
+
+    python -m benchmarks.storage --size 100000
+    python -m benchmarks.storage --size 1000000 --mongo
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bson
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'sla_tracker_bench')
+
+import server  # noqa: E402
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows  # noqa: E402
+
+
+def full_documents(frame: pd.DataFrame):
+    """Ticket documents in the full shape ingest used to store"""
+    hashes = server.content_hashes(frame).tolist()
+    risks = server.sla_risk_series(frame['sla_deadline'], datetime.now()).tolist()
+    created_at = datetime.now(timezone.utc).isoformat()
+    records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    documents = []
+    for record, content_hash, risk in zip(records, hashes, risks):
+        document = {'id': str(uuid.uuid4()), **record}
+        document['sla_risk'] = risk
+        document['created_at'] = created_at
+        document['content_hash'] = content_hash
+        documents.append(document)
+    return documents
+
+
+def compact_documents(frame: pd.DataFrame):
+    """Ticket documents as stored now, with the area fields coded locally instead of via MongoDB"""
+    documents = server.ticket_documents(frame)
+    for field in server.DICTIONARY_FIELDS:
+        codes = {}
+        for document in documents:
+            if field in document:
+                document[field] = codes.setdefault(document[field], len(codes) + 1)
+    return documents
+
+
+def encoded_bytes(documents) -> float:
+    """Mean BSON size per document, counting the _id MongoDB adds"""
+    return sum(len(bson.encode({'_id': bson.ObjectId(), **document})) for document in documents) / len(documents)
+
+
+async def collection_stats(name: str, documents, batch_size: int = 10000):
+    """Load documents into a scratch collection with the ticket indexes and read collStats"""
+    collection = server.db[name]
+    await collection.drop()
+    for start in range(0, len(documents), batch_size):
+        await collection.insert_many(documents[start:start + batch_size], ordered=False)
+    await collection.create_indexes(server.TICKET_INDEXES)
+    stats = await server.db.command('collStats', name)
+    await collection.drop()
+    return stats
+
+
+async def report_mongo(full, compact):
+    print(f"\n{'shape':<10}{'avg bytes':>12}{'data MB':>10}{'storage MB':>12}{'index MB':>10}")
+    for label, documents in (('full', full), ('compact', compact)):
+        stats = await collection_stats(f"storage_bench_{label}", documents)
+        print(
+            f"{label:<10}{stats['avgObjSize']:>12.0f}{stats['size'] / 1e6:>10.1f}"
+            f"{stats['storageSize'] / 1e6:>12.1f}{stats['totalIndexSize'] / 1e6:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--agents', type=int, default=50)
+    parser.add_argument('--teams', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mongo', action='store_true', help='also load both shapes into mongod and report collStats')
+    args = parser.parse_args()
+
+    rows = synthetic_upload_rows(args.size, args.agents, args.teams, args.seed)
+    frame = server.build_ticket_frame(pd.DataFrame(list(rows), columns=UPLOAD_COLUMNS))
+    full = full_documents(frame)
+    compact = compact_documents(frame)
+
+    full_bytes = encoded_bytes(full)
+    compact_bytes = encoded_bytes(compact)
+    print(f"{'shape':<10}{'bytes/ticket':>14}")
+    print(f"{'full':<10}{full_bytes:>14.0f}")
+    print(f"{'compact':<10}{compact_bytes:>14.0f}")
+    print(f"saving: {1 - compact_bytes / full_bytes:.0%} over {args.size} tickets")
+
+    if args.mongo:
+        asyncio.run(report_mongo(full, compact))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""Benchmark upload ingest and every GET /api endpoint at several dataset sizes
+
+Each size uploads a synthetic workbook through /api/upload-excel, timing it
+until the ingest job completes, then calls every GET endpoint repeat times
+and reports p50/p95/p99 latency and peak memory. Reads are measured with
+the response cache off unless RESPONSE_CACHE_TTL is set. Results can be saved
+as a JSON baseline and compared against an earlier one. Usage, from the
+backend directory:
+
+    python -m benchmarks.suite --sizes 1000 10000 --output baseline.json
+    python -m benchmarks.suite --sizes 1000 10000 --compare baseline.json
+
+--backend mongomock runs without a mongod, against mongomock-motor. Its
+timings only show relative changes in Python-side cost. Peak memory covers
+the server process; set INGEST_PARSE_WORKERS=0 to parse uploads in it too.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'sla_tracker_bench')
+os.environ.setdefault('RESPONSE_CACHE_TTL', '0')
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from benchmarks.synthetic import agent_names, synthetic_workbook  # noqa: E402
+
+# Long-lived or destructive routes that can't be timed as plain reads
+SKIPPED_ROUTES = {'/api/stream/dashboard'}
+ROUTE_QUERIES = {'/api/tickets': {'limit': 100}}
+
+
+def use_mongomock():
+    """Point the server at an in-process mongomock database"""
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    # mongomock rejects the comment option the endpoint queries are tagged with
+    for name in ('find', 'aggregate', 'count_documents'):
+        method = getattr(mongomock.collection.Collection, name)
+
+        def without_comment(self, *args, _method=method, **kwargs):
+            kwargs.pop('comment', None)
+            return _method(self, *args, **kwargs)
+        setattr(mongomock.collection.Collection, name, without_comment)
+
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ['DB_NAME']]
+
+
+def read_endpoints(sample_agent: str, job_id: str):
+    """List (path, query params) for every GET /api route, filling in path parameters"""
+    samples = {'agent_name': sample_agent, 'job_id': job_id}
+    endpoints = []
+    for route in server.app.routes:
+        path = getattr(route, 'path', '')
+        if 'GET' not in getattr(route, 'methods', ()) or not path.startswith('/api') or path in SKIPPED_ROUTES:
+            continue
+        if any(name not in samples for name in route.param_convertors):
+            continue
+        url = path.format(**{name: samples[name] for name in route.param_convertors})
+        endpoints.append((path, url, ROUTE_QUERIES.get(path, {})))
+    return endpoints
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far"""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+async def ingest(api: httpx.AsyncClient, workbook: bytes, size: int, batch_size: int):
+    """Upload a workbook and wait for its ingest job, returning throughput and the job"""
+    started = perf_counter()
+    response = await api.post(
+        '/api/upload-excel',
+        files={'file': ('benchmark.xlsx', workbook)},
+        params={'stream': 'true', 'batch_size': batch_size}
+    )
+    response.raise_for_status()
+    job_id = response.json()['id']
+    while True:
+        job = (await api.get(f'/api/ingest-jobs/{job_id}')).json()
+        if job['status'] in ('completed', 'failed'):
+            break
+        await asyncio.sleep(0.02)
+    elapsed = perf_counter() - started
+    if job['status'] != 'completed':
+        raise RuntimeError(f"ingest failed: {job['errors']}")
+    return {
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(size / elapsed, 1),
+        'job_rows_per_second': job['rows_per_second'],
+        'timings': job['timings'],
+    }, job
+
+
+async def time_endpoint(api: httpx.AsyncClient, url: str, params, repeat: int):
+    """Return latency stats in milliseconds after one warm-up call"""
+    await api.get(url, params=params)
+    latencies = []
+    failures = 0
+    for _ in range(repeat):
+        started = perf_counter()
+        response = await api.get(url, params=params)
+        latencies.append((perf_counter() - started) * 1000)
+        failures += response.status_code >= 400
+    return {
+        'p50': round(percentile(latencies, 0.5), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'mean': round(statistics.mean(latencies), 3),
+        'failures': failures,
+    }
+
+
+async def run_size(api: httpx.AsyncClient, size: int, args):
+    """Reset the data, ingest size tickets and time every read endpoint"""
+    workbook = synthetic_workbook(size, args.agents, args.teams, args.seed)
+    (await api.delete('/api/clear-data')).raise_for_status()
+
+    if args.trace_memory:
+        tracemalloc.reset_peak()
+    ingest_stats, job = await ingest(api, workbook, size, args.batch_size)
+    memory = {'ingest_rss_mb': peak_rss_mb()}
+    if args.trace_memory:
+        memory['ingest_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        tracemalloc.reset_peak()
+
+    endpoints = {}
+    for path, url, params in read_endpoints(agent_names(args.agents)[0], job['id']):
+        endpoints[path] = await time_endpoint(api, url, params, args.repeat)
+    memory['reads_rss_mb'] = peak_rss_mb()
+    if args.trace_memory:
+        memory['reads_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+
+    return {'size': size, 'ingest': ingest_stats, 'endpoints': endpoints, 'memory': memory}
+
+
+def print_result(result):
+    ingest_stats = result['ingest']
+    print(f"\n{result['size']} tickets: ingest {ingest_stats['seconds']:.2f}s, {ingest_stats['rows_per_second']:.0f} rows/s")
+    print(f"{'endpoint':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for path, stats in result['endpoints'].items():
+        note = f"  {stats['failures']} failed" if stats['failures'] else ""
+        print(f"{path:<40}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}{stats['mean']:>10.1f}{note}")
+    print(f"peak rss: {result['memory']['reads_rss_mb']:.0f} MB")
+
+
+def compare(results, baseline, tolerance: float) -> int:
+    """Print changes against a baseline and return how many exceed the tolerance"""
+    previous = {result['size']: result for result in baseline['results']}
+    regressions = 0
+    print(f"\n{'size':>10}  {'metric':<40}{'baseline':>12}{'current':>12}{'change':>9}")
+    for result in results:
+        before = previous.get(result['size'])
+        if before is None:
+            continue
+        # Throughput regresses when it drops, latency when it rises
+        rows = [('ingest rows/s', before['ingest']['rows_per_second'], result['ingest']['rows_per_second'], -1)]
+        for path, stats in result['endpoints'].items():
+            if path in before['endpoints']:
+                rows.append((f"{path} p95", before['endpoints'][path]['p95'], stats['p95'], 1))
+        for metric, old, new, direction in rows:
+            change = (new - old) / old if old else 0.0
+            regressed = change * direction > tolerance
+            regressions += regressed
+            print(f"{result['size']:>10}  {metric:<40}{old:>12.1f}{new:>12.1f}{change:>+9.0%}{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+async def run(args):
+    if args.backend == 'mongomock':
+        use_mongomock()
+    await server.app.router.startup()
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as api:
+            for size in args.sizes:
+                result = await run_size(api, size, args)
+                print_result(result)
+                results.append(result)
+            await api.delete('/api/clear-data')
+    finally:
+        await server.app.router.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--agents', type=int, default=50)
+    parser.add_argument('--teams', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=server.INGEST_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['mongod', 'mongomock'], default='mongod')
+    parser.add_argument('--trace-memory', action='store_true', help='also report tracemalloc peaks (slower)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed fractional regression before failing')
+    args = parser.parse_args()
+
+    if args.trace_memory:
+        tracemalloc.start()
+    results = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            'meta': {
+                'backend': args.backend,
+                'agents': args.agents,
+                'teams': args.teams,
+                'repeat': args.repeat,
+                'batch_size': args.batch_size,
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'parse_workers': server.INGEST_PARSE_WORKERS,
+                'response_cache_ttl': server.RESPONSE_CACHE_TTL,
+            },
+            'results': results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            sys.exit(f"{regressions} metrics regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic ticket data for benchmarks"""
+import io
+import random
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+from openpyxl import Workbook
+
+TEAMS = ['L1', 'L2', 'Business Team']
+STATUSES = ['Resolved', 'Resolved', 'Resolved', 'Assigned', 'Pending', 'Open']
+SLA_STATUSES = ['Met', 'Met', 'Met', 'Breached', None]
+
+
+def agent_names(count: int) -> List[str]:
+    """Generate stable agent names"""
+    return [f"Agent {index:04d}" for index in range(count)]
+
+
+def synthetic_ticket_documents(count: int, agents: int = 50, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield Ticket-shaped records (the API view; server.stored_ticket gives the stored form)"""
+    rng = random.Random(seed)
+    names = agent_names(agents)
+    agent_teams = {name: rng.choice(TEAMS) for name in names}
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    created_at = datetime.now(timezone.utc).isoformat()
+    
+    for index in range(count):
+        agent = rng.choice(names)
+        team = agent_teams[agent]
+        created = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        response_hours = round(rng.expovariate(1 / 2.0), 2)
+        resolution_hours = round(response_hours + rng.expovariate(1 / 20.0), 2)
+        status = rng.choice(STATUSES)
+        yield {
+            'id': str(uuid.uuid4()),
+            'sr_number': f"SR{index:08d}",
+            'created': created.replace(tzinfo=None),
+            'status': status,
+            'assigned': agent,
+            'resolved_by': agent if status == 'Resolved' else rng.choice([agent, None]),
+            'resolved_date': (created + timedelta(hours=resolution_hours)).replace(tzinfo=None, microsecond=0) if status == 'Resolved' else None,
+            'updated_resolved_by_team': team,
+            'updated_team': team,
+            'response_sla_status': rng.choice(SLA_STATUSES),
+            'resolution_sla_status': rng.choice(SLA_STATUSES),
+            'response_time_hours': response_hours,
+            'resolution_time_hours': resolution_hours,
+            'life_cycle_target_hrs': rng.choice([8.0, 24.0, 72.0]),
+            'total_time_taken_hrs': resolution_hours,
+            'created_at': created_at,
+        }
+
+
+def team_names(count: int) -> List[str]:
+    """The three standard teams, then extra ones named Team 04, Team 05, ..."""
+    return TEAMS[:count] + [f"Team {index:02d}" for index in range(len(TEAMS) + 1, count + 1)]
+
+
+def duration_cell(hours: float, rng: random.Random) -> Any:
+    """Write a duration in one of the shapes real exports use for the hh:mm columns"""
+    shape = rng.random()
+    if shape < 0.05:
+        return None
+    if shape < 0.55:
+        return f"{int(hours):02d}:{int(hours * 60) % 60:02d}"
+    if shape < 0.70:
+        days, rest = divmod(hours, 24)
+        return f"{int(days)} days {int(rest):02d}:{int(rest * 60) % 60:02d}:00"
+    if shape < 0.90 and hours < 24:
+        return time(int(hours), int(hours * 60) % 60)
+    # Excel day fraction
+    return round(hours / 24, 6)
+
+
+UPLOAD_COLUMNS = [
+    'SR Number', 'Created', 'Area', 'Sub Area', 'Status', 'Assigned', 'Updated', 'Resolved Date',
+    'Resolved By', 'Updated Resolved By Team', 'Updated Team', 'Response SLA Status', 'Resolution SLA Status',
+    'Response Time (hh:mm)', 'Resolution Time (hh:mm)', 'Life Cycle Target (hrs)', 'Total Time Taken (hrs)',
+]
+
+
+def synthetic_upload_rows(count: int, agents: int = 50, teams: int = 3, seed: int = 42) -> Iterator[List[Any]]:
+    """Yield upload rows, in UPLOAD_COLUMNS order, for count tickets across agents and teams
+    
+    Each team gets its own breach rate and response/resolution time scale,
+    so per-team SLA percentages differ the way they do in real exports.
+    """
+    rng = random.Random(seed)
+    names = agent_names(agents)
+    teams_list = team_names(teams)
+    agent_teams = {name: rng.choice(teams_list) for name in names}
+    breach_rates = {team: rng.uniform(0.03, 0.3) for team in teams_list}
+    time_scales = {team: rng.uniform(0.5, 3.0) for team in teams_list}
+    areas = ['Billing', 'Access', 'Hardware', 'Software', 'Network']
+    start = datetime(2024, 1, 1)
+    
+    for index in range(count):
+        agent = rng.choice(names)
+        team = agent_teams[agent]
+        created = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        response_hours = rng.expovariate(1 / (2.0 * time_scales[team]))
+        resolution_hours = response_hours + rng.expovariate(1 / (20.0 * time_scales[team]))
+        status = rng.choice(STATUSES)
+        resolved = status == 'Resolved'
+        target = rng.choice([8.0, 24.0, 72.0])
+        yield [
+            f"SR{index:08d}",
+            created,
+            rng.choice(areas),
+            f"Sub {rng.randint(1, 20)}",
+            status,
+            agent,
+            (created + timedelta(hours=resolution_hours / 2)).replace(microsecond=0),
+            (created + timedelta(hours=resolution_hours)).replace(microsecond=0) if resolved else None,
+            agent if resolved else rng.choice([agent, None]),
+            team,
+            team,
+            'Breached' if rng.random() < breach_rates[team] else rng.choice(['Met', 'Met', 'Met', None]),
+            ('Breached' if rng.random() < breach_rates[team] else 'Met') if resolved else None,
+            duration_cell(response_hours, rng),
+            duration_cell(resolution_hours, rng) if resolved else None,
+            target,
+            round(resolution_hours, 2) if resolved else None,
+        ]
+
+
+def synthetic_workbook(count: int, agents: int = 50, teams: int = 3, seed: int = 42) -> bytes:
+    """Build an .xlsx upload holding count synthetic tickets"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Tickets')
+    sheet.append(UPLOAD_COLUMNS)
+    for row in synthetic_upload_rows(count, agents, teams, seed):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
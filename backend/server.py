@@ -1,27 +1,227 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
+import multiprocessing
+import queue
+import threading
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, AsyncIterator, Callable, Awaitable, Tuple, Union
 import uuid
-from datetime import datetime, timezone, date as date_type, time
+from datetime import datetime, timedelta, timezone, date as date_type, time
 import pandas as pd
+import numpy as np
 import io
+import csv
+import tempfile
+import shutil
+import zipfile
+from time import monotonic, perf_counter
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlencode
+import hashlib
+import math
+import orjson
+from bisect import bisect_right
 from enum import Enum
+from openpyxl import load_workbook
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, IndexModel, ReplaceOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export and bulk duration parsing of text cells are optional
+    pa = None
+    pc = None
+    pq = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Metrics
+# MongoDB commands slower than this are logged with their filter or pipeline
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def prometheus_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Render a label set as {name="value",...}, escaped per the Prometheus text format"""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class MetricsRegistry:
+    """Process-local counters, gauges and histograms rendered in the Prometheus text format
+    
+    MongoDB command listeners run on Motor's worker threads, so every update
+    takes the lock.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+    
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: Tuple[float, ...] = ()):
+        self.metrics[name] = {"type": metric_type, "help": help_text, "buckets": buckets, "series": {}}
+    
+    def inc(self, name: str, value: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.metrics[name]["series"]
+            series[key] = series.get(key, 0.0) + value
+    
+    def set(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.metrics[name]["series"][key] = float(value)
+    
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        metric = self.metrics[name]
+        with self.lock:
+            state = metric["series"].get(key)
+            if state is None:
+                state = metric["series"][key] = {"buckets": [0] * len(metric["buckets"]), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(metric["buckets"]):
+                if value <= bound:
+                    state["buckets"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+    
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for name, metric in self.metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in metric["series"].items():
+                    if metric["type"] != "histogram":
+                        lines.append(f"{name}{prometheus_labels(key)} {value!r}")
+                        continue
+                    for bound, count in zip(metric["buckets"], value["buckets"]):
+                        lines.append(f"{name}_bucket{prometheus_labels(key + (('le', repr(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{prometheus_labels(key + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{prometheus_labels(key)} {value['sum']!r}")
+                    lines.append(f"{name}_count{prometheus_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("sla_http_request_duration_seconds", "histogram", "HTTP request latency by route, method and status", LATENCY_BUCKETS)
+metrics.describe("sla_response_render_seconds", "histogram", "Time spent serializing JSON response bodies", LATENCY_BUCKETS)
+metrics.describe("sla_mongo_command_duration_seconds", "histogram", "MongoDB command latency by command, collection and query name", LATENCY_BUCKETS)
+metrics.describe("sla_mongo_documents_returned_total", "counter", "Documents returned in MongoDB cursor batches")
+metrics.describe("sla_mongo_command_failures_total", "counter", "MongoDB commands that returned an error")
+metrics.describe("sla_mongo_slow_commands_total", "counter", "MongoDB commands slower than SLOW_QUERY_MS")
+metrics.describe("sla_query_documents_examined", "gauge", "Documents examined by each catalog query at the last execution-stats plan check")
+metrics.describe("sla_query_keys_examined", "gauge", "Index keys examined by each catalog query at the last execution-stats plan check")
+metrics.describe("sla_query_documents_returned", "gauge", "Documents returned by each catalog query at the last execution-stats plan check")
+metrics.describe("sla_ingest_rows_total", "counter", "Rows stored by completed ingests")
+metrics.describe("sla_ingest_rows_per_second", "gauge", "Throughput of the most recent ingest")
+metrics.describe("sla_ingest_phase_seconds_total", "counter", "Time spent in each ingest phase")
+
+def slow_command_summary(command: Dict[str, Any]) -> str:
+    """The parts of a command worth logging: its filter, pipeline and sort, or how many documents it writes"""
+    summary = {key: command[key] for key in ("filter", "pipeline", "sort", "comment") if key in command}
+    for key in ("documents", "updates", "deletes"):
+        if key in command:
+            summary[key] = len(command[key])
+    return str(summary)[:1000]
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every MongoDB command, counts the documents it returns and logs slow ones
+    
+    Commands are labelled with their comment, which names the endpoint query
+    (see query_plan_catalog), so database time can be read per pipeline.
+    """
+    
+    def __init__(self):
+        self.pending: Dict[Tuple[Any, int], Tuple[str, str, Dict[str, Any]]] = {}
+    
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = command.get("collection", "")
+        self.pending[(event.connection_id, event.request_id)] = (collection, str(command.get("comment", "")), command)
+    
+    def finished(self, event) -> Tuple[str, str, Dict[str, Any], Dict[str, str]]:
+        collection, query, command = self.pending.pop((event.connection_id, event.request_id), ("", "", {}))
+        # Staging and scratch collections are named per load; label them by the collection they stand in for
+        labels = {"command": event.command_name, "collection": collection.split(STAGING_MARKER)[0], "query": query}
+        seconds = event.duration_micros / 1e6
+        metrics.observe("sla_mongo_command_duration_seconds", seconds, **labels)
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            metrics.inc("sla_mongo_slow_commands_total", **labels)
+            logger.warning(
+                "Slow MongoDB %s on %s%s took %.0f ms: %s",
+                event.command_name, collection, f" ({query})" if query else "", seconds * 1000, slow_command_summary(command)
+            )
+        return labels
+    
+    def succeeded(self, event):
+        labels = self.finished(event)
+        cursor = event.reply.get("cursor")
+        if isinstance(cursor, dict):
+            batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+            metrics.inc("sla_mongo_documents_returned_total", len(batch), **labels)
+    
+    def failed(self, event):
+        labels = self.finished(event)
+        metrics.inc("sla_mongo_command_failures_total", **labels)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[CommandMetricsListener()])
 db = client[os.environ['DB_NAME']]
 
+# Ingestion settings
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '1000'))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+INGEST_CONCURRENCY = int(os.environ.get('INGEST_CONCURRENCY', '2'))
+INGEST_JOB_HISTORY = int(os.environ.get('INGEST_JOB_HISTORY', '100'))
+# Seconds between progress saves of a running job to db.ingest_jobs
+INGEST_JOB_SAVE_INTERVAL = float(os.environ.get('INGEST_JOB_SAVE_INTERVAL', '1'))
+# Processes that decode and transform uploads off the event loop (0 parses in a thread instead)
+INGEST_PARSE_WORKERS = int(os.environ.get('INGEST_PARSE_WORKERS', str(os.cpu_count() or 1)))
+# Parsed chunks a parse worker may run ahead of the database writer
+INGEST_PARSE_PREFETCH = int(os.environ.get('INGEST_PARSE_PREFETCH', '4'))
+
+# Rows fetched per cursor batch and encoded per chunk by /api/tickets/export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '5000'))
+
+# Read endpoint response cache (backend: memory or mongo; TTL 0 disables caching)
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+
+# Server-sent dashboard stream: keepalive interval, frames buffered per client, and how
+# often the shared dataset version is polled for changes made by other workers
+DASHBOARD_STREAM_HEARTBEAT = float(os.environ.get('DASHBOARD_STREAM_HEARTBEAT', '15'))
+DASHBOARD_STREAM_BUFFER = int(os.environ.get('DASHBOARD_STREAM_BUFFER', '8'))
+DASHBOARD_STREAM_POLL = float(os.environ.get('DASHBOARD_STREAM_POLL', '5'))
+
+# Live SLA risk: open tickets within this many hours of their deadline are At Risk;
+# the scheduler re-checks every SLA_RISK_INTERVAL seconds (0 turns it off)
+SLA_RISK_WINDOW_HOURS = float(os.environ.get('SLA_RISK_WINDOW_HOURS', '2'))
+SLA_RISK_INTERVAL = float(os.environ.get('SLA_RISK_INTERVAL', '60'))
+
+# Log COLLSCAN query plans at startup
+CHECK_QUERY_PLANS = os.environ.get('CHECK_QUERY_PLANS', 'false').lower() == 'true'
+
 # Create the main app without a prefix
 app = FastAPI(title="SLA Tracker API", description="Help Center Individual SLA Tracker Dashboard API")
 
@@ -34,6 +234,32 @@ class SLAStatus(str, Enum):
     BREACHED = "Breached"
     AT_RISK = "At Risk"
 
+class IngestJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class IngestMode(str, Enum):
+    APPEND = "append"
+    MERGE = "merge"
+    REPLACE = "replace"
+
+class TicketCountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+class TicketExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+class TimeGrouping(str, Enum):
+    OVERALL = "overall"
+    AGENT = "agent"
+    TEAM = "team"
+
 class TicketStatus(str, Enum):
     RESOLVED = "Resolved"
     ASSIGNED = "Assigned"
@@ -53,7 +279,7 @@ class Agent(BaseModel):
 class Ticket(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     sr_number: str
-    created: Optional[str] = None
+    created: Optional[datetime] = None
     raised_for: Optional[str] = None
     area: Optional[str] = None
     sub_area: Optional[str] = None
@@ -61,9 +287,9 @@ class Ticket(BaseModel):
     status: Optional[str] = None
     sub_status: Optional[str] = None
     assigned: Optional[str] = None
-    updated: Optional[str] = None
+    updated: Optional[datetime] = None
     assigned_sr_category: Optional[str] = None
-    resolved_date: Optional[str] = None
+    resolved_date: Optional[datetime] = None
     resolved_by: Optional[str] = None
     updated_resolved_by_team: Optional[str] = None
     response_sla_status: Optional[str] = None
@@ -75,6 +301,8 @@ class Ticket(BaseModel):
     updated_team: Optional[str] = None
     life_cycle_target_hrs: Optional[float] = None
     total_time_taken_hrs: Optional[float] = None
+    sla_deadline: Optional[datetime] = None
+    sla_risk: Optional[SLAStatus] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class SLAMetrics(BaseModel):
@@ -103,11 +331,34 @@ class DashboardSummary(BaseModel):
     top_performers: List[Dict[str, Any]] = []
     sla_breaches_today: int = 0
 
-class FileUploadResponse(BaseModel):
-    message: str
-    tickets_processed: int
-    agents_created: int
+class IngestSource(BaseModel):
+    file_name: str
+    sheet: Optional[str] = None
+    rows_parsed: int = 0
+    tickets_duplicate: int = 0
+    error: Optional[str] = None
+
+class IngestJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     file_name: str
+    mode: IngestMode = IngestMode.APPEND
+    status: IngestJobStatus = IngestJobStatus.QUEUED
+    rows_parsed: int = 0
+    rows_written: int = 0
+    tickets_inserted: int = 0
+    tickets_updated: int = 0
+    tickets_unchanged: int = 0
+    tickets_duplicate: int = 0
+    tickets_rejected: int = 0
+    agents_created: int = 0
+    agents_updated: int = 0
+    rows_per_second: float = 0.0
+    timings: Dict[str, float] = {}
+    errors: List[str] = []
+    sources: List[IngestSource] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 # Helper functions
 def prepare_for_mongo(data):
@@ -129,6 +380,48 @@ def parse_from_mongo(item):
             pass
     return item
 
+def response_rows(documents: Iterable[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+    """Lay stored documents out in response-model field order without re-validating them
+    
+    Fields missing from a document come back as None, matching the model
+    defaults, and ISO created_at strings are parsed the way parse_from_mongo does.
+    """
+    rows = []
+    for document in documents:
+        row = {name: document.get(name) for name in fields}
+        if isinstance(row.get('created_at'), str):
+            try:
+                row['created_at'] = datetime.fromisoformat(row['created_at'])
+            except ValueError:
+                pass
+        rows.append(row)
+    return rows
+
+def response_projection(fields: List[str]) -> Dict[str, int]:
+    """Fetch only the response fields from MongoDB"""
+    projection = {name: 1 for name in fields}
+    projection["_id"] = 0
+    return projection
+
+def ticket_projection(fields: List[str]) -> Dict[str, int]:
+    """Fetch only the response fields of stored tickets, with _id when id or created_at is asked for"""
+    projection = {name: 1 for name in fields if name not in ('id', 'created_at')}
+    projection["_id"] = int(any(name in fields for name in ('id', 'created_at')))
+    return projection
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson
+    
+    UTC datetimes are written with a Z suffix, as pydantic does, and anything
+    orjson can't encode natively (response models) goes through jsonable_encoder.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        started = perf_counter()
+        body = orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_UTC_Z)
+        metrics.observe("sla_response_render_seconds", perf_counter() - started)
+        return body
+
 def parse_time_to_hours(time_val):
     """Convert Excel time value to hours"""
     if pd.isna(time_val) or time_val == '' or time_val is None:
@@ -198,487 +491,2692 @@ def parse_time_to_hours(time_val):
     except (ValueError, TypeError, AttributeError):
         return None
 
-async def process_excel_data(file_content: bytes, filename: str):
-    """Process uploaded Excel file and extract ticket data"""
-    try:
-        # Read Excel file
-        df = pd.read_excel(io.BytesIO(file_content))
-        
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        
-        # Column names are now clean and ready for processing
-        
-        tickets_processed = 0
-        agents_set = set()
-        
-        for _, row in df.iterrows():
-            # Create ticket from row data
-            ticket_data = {
-                'sr_number': str(row.get('SR Number', '')),
-                'created': str(row.get('Created', '')) if pd.notna(row.get('Created')) else None,
-                'raised_for': str(row.get('Raised For', '')) if pd.notna(row.get('Raised For')) else None,
-                'area': str(row.get('Area', '')) if pd.notna(row.get('Area')) else None,
-                'sub_area': str(row.get('Sub Area', '')) if pd.notna(row.get('Sub Area')) else None,
-                'problem_area': str(row.get('Problem Area', '')) if pd.notna(row.get('Problem Area')) else None,
-                'status': str(row.get('Status', '')) if pd.notna(row.get('Status')) else None,
-                'sub_status': str(row.get('Sub Status', '')) if pd.notna(row.get('Sub Status')) else None,
-                'assigned': str(row.get('Assigned', '')) if pd.notna(row.get('Assigned')) else None,
-                'updated': str(row.get('Updated', '')) if pd.notna(row.get('Updated')) else None,
-                'assigned_sr_category': str(row.get('Assigned SR Category', '')) if pd.notna(row.get('Assigned SR Category')) else None,
-                'resolved_date': str(row.get('Resolved Date', '')) if pd.notna(row.get('Resolved Date')) else None,
-                'resolved_by': str(row.get('Resolved By', '')) if pd.notna(row.get('Resolved By')) else None,
-                'updated_resolved_by_team': str(row.get('Updated Resolved By Team', '')) if pd.notna(row.get('Updated Resolved By Team')) else None,
-                'response_sla_status': str(row.get('Response SLA Status', '')) if pd.notna(row.get('Response SLA Status')) else None,
-                'resolution_sla_status': str(row.get('Resolution SLA Status', '')) if pd.notna(row.get('Resolution SLA Status')) else None,
-                'updated_team': str(row.get('Updated Team', '')) if pd.notna(row.get('Updated Team')) else None,
-            }
-            
-            # Normalize and default team assignment
-            updated_team = ticket_data['updated_team']
-            if not updated_team or updated_team in ['', 'None', 'null']:
-                ticket_data['updated_team'] = 'L1'  # Default to L1 if no team data
-            else:
-                # Normalize team names
-                updated_team = updated_team.strip()
-                if updated_team.upper() in ['L1', 'LEVEL 1', 'LEVEL1', 'TIER 1', 'TIER1']:
-                    ticket_data['updated_team'] = 'L1'
-                elif updated_team.upper() in ['L2', 'LEVEL 2', 'LEVEL2', 'TIER 2', 'TIER2']:
-                    ticket_data['updated_team'] = 'L2'
-                elif updated_team.upper() in ['BUSINESS', 'BUSINESS TEAM', 'BT']:
-                    ticket_data['updated_team'] = 'Business Team'
-                else:
-                    # Keep original team name but clean it
-                    ticket_data['updated_team'] = updated_team
-            
-            # Parse time fields (hh:mm format) and numeric fields
-            time_fields = [
-                ('response_time_hours', 'Response Time (hh:mm)'),
-                ('resolution_time_hours', 'Resolution Time (hh:mm)')
-            ]
-            
-            numeric_fields = [
-                ('if_breached_response_hrs', 'If Breached - Response (hrs)'),
-                ('if_breached_resolution_hrs', 'If Breached - Resolution (hrs)'),
-                ('life_cycle_target_hrs', 'Life Cycle Target (hrs)'),
-                ('total_time_taken_hrs', 'Total Time Taken (hrs)')
-            ]
-            
-            # Parse time fields using special parser
-            for field, col_name in time_fields:
-                val = row.get(col_name)
-                parsed_hours = parse_time_to_hours(val)
-                ticket_data[field] = parsed_hours
-                
-                # Time parsing completed
-            
-            # Parse numeric fields
-            for field, col_name in numeric_fields:
-                try:
-                    val = row.get(col_name)
-                    if pd.notna(val) and val != '':
-                        ticket_data[field] = float(val)
-                except:
-                    ticket_data[field] = None
-            
-            # Create ticket object
-            ticket = Ticket(**ticket_data)
-            
-            # Store in database
-            ticket_dict = prepare_for_mongo(ticket.dict())
-            await db.tickets.insert_one(ticket_dict)
-            tickets_processed += 1
-            
-            # Collect agent information using the normalized team names
-            if ticket.resolved_by:
-                agents_set.add((ticket.resolved_by, ticket.updated_team or 'L1'))
-            if ticket.assigned:
-                agents_set.add((ticket.assigned, ticket.updated_team or 'L1'))
-        
-        # Create agents if they don't exist
-        agents_created = 0
-        for agent_name, team in agents_set:
-            if agent_name and agent_name.strip():
-                existing_agent = await db.agents.find_one({"name": agent_name})
-                if not existing_agent:
-                    agent = Agent(
-                        name=agent_name,
-                        employee_id=agent_name,  # Using name as ID for now
-                        team=team
-                    )
-                    agent_dict = prepare_for_mongo(agent.dict())
-                    await db.agents.insert_one(agent_dict)
-                    agents_created += 1
-        
-        return tickets_processed, agents_created
-        
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing Excel file: {str(e)}")
+# Excel column -> ticket field mappings used by the ingestion engine
+TICKET_TEXT_COLUMNS = {
+    'raised_for': 'Raised For',
+    'area': 'Area',
+    'sub_area': 'Sub Area',
+    'problem_area': 'Problem Area',
+    'status': 'Status',
+    'sub_status': 'Sub Status',
+    'assigned': 'Assigned',
+    'assigned_sr_category': 'Assigned SR Category',
+    'resolved_by': 'Resolved By',
+    'updated_resolved_by_team': 'Updated Resolved By Team',
+    'response_sla_status': 'Response SLA Status',
+    'resolution_sla_status': 'Resolution SLA Status',
+    'updated_team': 'Updated Team',
+}
 
-# API Routes
-@api_router.post("/upload-excel", response_model=FileUploadResponse)
-async def upload_excel_file(file: UploadFile = File(...)):
-    """Upload and process Excel file with ticket data"""
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
-    
-    file_content = await file.read()
-    tickets_processed, agents_created = await process_excel_data(file_content, file.filename)
-    
-    return FileUploadResponse(
-        message="File processed successfully",
-        tickets_processed=tickets_processed,
-        agents_created=agents_created,
-        file_name=file.filename
+# Stored as BSON datetimes (naive, as written in the upload) so date ranges can use indexes
+TICKET_DATE_COLUMNS = {
+    'created': 'Created',
+    'updated': 'Updated',
+    'resolved_date': 'Resolved Date',
+}
+
+TICKET_TIME_COLUMNS = {
+    'response_time_hours': 'Response Time (hh:mm)',
+    'resolution_time_hours': 'Resolution Time (hh:mm)',
+}
+
+TICKET_NUMERIC_COLUMNS = {
+    'if_breached_response_hrs': 'If Breached - Response (hrs)',
+    'if_breached_resolution_hrs': 'If Breached - Resolution (hrs)',
+    'life_cycle_target_hrs': 'Life Cycle Target (hrs)',
+    'total_time_taken_hrs': 'Total Time Taken (hrs)',
+}
+
+TEAM_ALIASES = {
+    'L1': ['L1', 'LEVEL 1', 'LEVEL1', 'TIER 1', 'TIER1'],
+    'L2': ['L2', 'LEVEL 2', 'LEVEL2', 'TIER 2', 'TIER2'],
+    'Business Team': ['BUSINESS', 'BUSINESS TEAM', 'BT'],
+}
+
+def _column(df: pd.DataFrame, col_name: str) -> pd.Series:
+    """Return a column from the upload, or an all-null Series if it is missing"""
+    if col_name in df.columns:
+        return df[col_name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+def text_series(series: pd.Series) -> pd.Series:
+    """Convert a column to strings, keeping missing cells as None"""
+    return series.map(str, na_action='ignore').astype(object).where(series.notna(), None)
+
+def sr_number_series(series: pd.Series) -> pd.Series:
+    """Convert the SR Number column to stripped strings, None where blank
+    
+    Whole numbers read as floats (a numeric column with blank cells) keep
+    their integer form, so 1000.0 is stored as '1000'.
+    """
+    def sr_text(value: Any) -> Any:
+        if isinstance(value, (float, np.floating)) and value.is_integer():
+            value = int(value)
+        return str(value).strip() or None
+    return series.map(sr_text, na_action='ignore').astype(object).where(series.notna(), None)
+
+def datetime_objects(parsed: pd.Series) -> pd.Series:
+    """A datetime64 column as Python datetimes, None where missing"""
+    return pd.Series(parsed.dt.to_pydatetime(), index=parsed.index, dtype=object).where(parsed.notna(), None)
+
+def datetime_series(series: pd.Series) -> pd.Series:
+    """Convert a column to naive datetimes, turning unparseable cells into None
+    
+    Numbers are Excel serial dates; text with a UTC offset is converted to UTC.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series.dt.tz_convert(None) if series.dt.tz is not None else series
+    else:
+        values = series.astype(object).where(series.notna(), None)
+        is_number = values.map(lambda value: isinstance(value, (int, float, np.number)) and not isinstance(value, bool))
+        parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[us]')
+        if is_number.any():
+            serials = pd.to_numeric(values[is_number], errors='coerce')
+            parsed[is_number] = pd.to_datetime(serials, unit='D', origin='1899-12-30', errors='coerce')
+        others = ~is_number & values.notna()
+        if others.any():
+            parsed[others] = pd.to_datetime(values[others], errors='coerce', format='mixed', utc=True).dt.tz_convert(None)
+    return datetime_objects(parsed)
+
+def normalize_team_series(series: pd.Series) -> pd.Series:
+    """Normalize team names for a whole column, defaulting missing teams to L1"""
+    teams = text_series(series)
+    stripped = teams.str.strip()
+    upper = stripped.str.upper()
+    
+    normalized = stripped.copy()
+    for team_name, aliases in TEAM_ALIASES.items():
+        normalized = normalized.mask(upper.isin(aliases), team_name)
+    
+    # Default to L1 if no team data
+    missing = teams.isna() | teams.isin(['', 'None', 'null'])
+    return normalized.mask(missing, 'L1')
+
+def numeric_series(series: pd.Series) -> pd.Series:
+    """Convert a column to floats, turning unparseable cells into None"""
+    # Whole-number cells would otherwise stay ints and be stored (and returned) as 24, not 24.0
+    values = pd.to_numeric(series, errors='coerce').astype(float)
+    return values.astype(object).where(values.notna(), None)
+
+# Duration strings parse_time_to_hours accepts, as RE2 patterns for pyarrow.
+# int() takes "+5" and "-5" but not "+-5", hence the two number alternatives.
+_DURATION_INT = r'(?:\+?[0-9]{1,15}|-[0-9]{1,15})'
+_DURATION_CLOCK = rf'(?P<hours>{_DURATION_INT}):(?P<minutes>{_DURATION_INT})(?::(?P<seconds>{_DURATION_INT}))?'
+DURATION_PATTERN = rf'^\s*(?:(?P<days>{_DURATION_INT}) days )?{_DURATION_CLOCK}\s*$'
+
+def round_hours(hours: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals exactly like the builtin round()
+    
+    np.round scales by 100 first, which can land on the other side of a
+    half-way point, so values that end up near one are re-rounded in Python.
+    """
+    rounded = np.round(hours, 2)
+    with np.errstate(invalid='ignore'):
+        scaled = hours * 100
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(float(value), 2) for value in hours[near_half]]
+    return rounded
+
+def duration_hours(durations) -> np.ndarray:
+    """Convert strings matching DURATION_PATTERN to hours"""
+    durations = pc.utf8_trim_whitespace(durations)
+    # Give every duration the same d:h:m:s shape so it splits into four fields
+    durations = pc.if_else(
+        pc.equal(pc.count_substring(durations, ':'), 1),
+        pc.binary_join_element_wise(durations, ':0', ''),
+        durations
+    )
+    durations = pc.if_else(
+        pc.match_substring(durations, ' days '),
+        pc.replace_substring(durations, ' days ', ':'),
+        pc.binary_join_element_wise('0:', durations, '')
     )
+    fields = pc.list_flatten(pc.split_pattern(durations, ':'))
+    if pc.any(pc.match_substring(fields, '+')).as_py():
+        fields = pc.replace_substring(fields, '+', '')
+    fields = pc.cast(fields, pa.int64()).to_numpy(zero_copy_only=False).reshape(-1, 4)
+    # Same operation order as parse_time_to_hours so the floats match bit for bit
+    return (fields[:, 0] * 24 + fields[:, 1]) + fields[:, 2] / 60.0 + fields[:, 3] / 3600.0
 
-@api_router.get("/dashboard-summary", response_model=DashboardSummary)
-async def get_dashboard_summary():
-    """Get overall dashboard summary with key metrics"""
+def string_hours(text: pd.Series) -> pd.Series:
+    """Convert duration strings in bulk, leaving NaN where parse_time_to_hours must decide
+    
+    The pattern only matches shapes the scalar parser reads the same way;
+    any other string is left for it.
+    """
+    hours = pd.Series(np.nan, index=text.index)
+    if pc is None:
+        return hours
+    
+    strings = pa.array(text.to_numpy(), type=pa.string())
+    matched = pc.match_substring_regex(strings, DURATION_PATTERN).to_numpy(zero_copy_only=False)
+    if matched.any():
+        hours[matched] = duration_hours(strings.filter(matched))
+    
+    # Anything else without a colon is an Excel day fraction written as text
+    no_colon = pc.invert(pc.match_substring(strings, ':')).to_numpy(zero_copy_only=False)
+    rest = text[~matched & no_colon]
+    rest = rest[pd.to_numeric(rest, errors='coerce').notna()]
     try:
-        # Get total tickets
-        total_tickets = await db.tickets.count_documents({})
-        
-        # Get tickets by status
-        tickets_closed_today = await db.tickets.count_documents({"status": "Resolved"})
-        tickets_open = await db.tickets.count_documents({"status": {"$ne": "Resolved"}})
-        
-        # Get pending tickets by team (L1, L2, Business Team) - any non-resolved status
-        # Using aggregation to handle team normalization like in team performance
-        pending_pipeline = [
-            {"$match": {"status": {"$ne": "Resolved"}}},  # Count tickets that are NOT resolved
-            {
-                "$addFields": {
-                    # Normalize team names same as team performance
-                    "team": {
-                        "$cond": {
-                            "if": {
-                                "$or": [
-                                    {"$eq": ["$updated_team", None]}, 
-                                    {"$eq": ["$updated_team", ""]},
-                                    {"$eq": ["$updated_team", "null"]}
-                                ]
-                            },
-                            "then": "L1",
-                            "else": "$updated_team"
-                        }
-                    }
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$team",
-                    "pending_count": {"$sum": 1}
-                }
-            }
+        # astype(float) calls float() on each string, exactly as the scalar parser does
+        hours[rest.index] = rest.astype(float).to_numpy() * 24.0
+    except ValueError:
+        pass
+    return hours
+
+def time_series_to_hours(series: pd.Series) -> pd.Series:
+    """Convert a column of Excel time values to hours
+    
+    Cells are classified by type and format and each class is converted in
+    bulk; shapes the fast paths don't cover go through parse_time_to_hours,
+    so results match it cell for cell.
+    """
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        hours = pd.Series(round_hours(series.astype(float).to_numpy() * 24.0), index=series.index)
+        return hours.astype(object)
+    
+    values = series.astype(object).reset_index(drop=True)
+    hours = pd.Series(np.nan, index=values.index)
+    missing = values.isna()
+    kinds = values.map(type)
+    unique_kinds = kinds[~missing].unique()
+    
+    def of_kind(*bases):
+        return ~missing & kinds.isin([kind for kind in unique_kinds if issubclass(kind, bases)])
+    
+    is_number = of_kind(int, float)
+    hours[is_number] = values[is_number].astype(float).to_numpy() * 24.0
+    
+    is_timedelta = of_kind(timedelta)
+    hours[is_timedelta] = [value.total_seconds() / 3600.0 for value in values[is_timedelta]]
+    
+    # openpyxl returns hh:mm cells as datetime.time, whose str() is HH:MM:SS
+    is_time = ~missing & kinds.isin([time])
+    clock = np.fromiter(
+        ((value.hour, value.minute, value.second, value.microsecond) for value in values[is_time]),
+        dtype=np.dtype((np.int64, 4)),
+        count=int(is_time.sum())
+    ).reshape(-1, 4)
+    # str() of a time with microseconds has a fractional second the scalar parser rejects
+    clock_hours = clock[:, 0] + clock[:, 1] / 60.0 + clock[:, 2] / 3600.0
+    hours[is_time] = np.where(clock[:, 3] == 0, clock_hours, np.nan)
+    
+    is_text = of_kind(str)
+    if is_text.any():
+        hours[is_text] = string_hours(values[is_text])
+    
+    leftover = ~missing & hours.isna()
+    if leftover.any():
+        hours[leftover] = values[leftover].map(parse_time_to_hours).astype(float)
+    
+    hours = pd.Series(round_hours(hours.to_numpy()), index=series.index)
+    return hours.astype(object)
+
+def build_ticket_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Transform a raw upload DataFrame into ticket fields column by column"""
+    frame = pd.DataFrame(index=df.index)
+    frame['sr_number'] = sr_number_series(_column(df, 'SR Number'))
+    for field, col_name in TICKET_TEXT_COLUMNS.items():
+        frame[field] = text_series(_column(df, col_name))
+    for field, col_name in TICKET_DATE_COLUMNS.items():
+        frame[field] = datetime_series(_column(df, col_name))
+    
+    # Normalize and default team assignment
+    frame['updated_team'] = normalize_team_series(_column(df, 'Updated Team'))
+    
+    # Parse time fields (hh:mm format) and numeric fields
+    for field, col_name in TICKET_TIME_COLUMNS.items():
+        frame[field] = time_series_to_hours(_column(df, col_name))
+    for field, col_name in TICKET_NUMERIC_COLUMNS.items():
+        frame[field] = numeric_series(_column(df, col_name))
+    frame['sla_deadline'] = sla_deadline_series(frame)
+    
+    # Keep the same field order as the Ticket model
+    return frame[[field for field in Ticket.model_fields if field in frame.columns]]
+
+def content_hashes(frame: pd.DataFrame) -> pd.Series:
+    """Hash each ticket row's content so unchanged rows can be skipped on re-upload"""
+    return pd.util.hash_pandas_object(frame, index=False).map('{:016x}'.format)
+
+# Compact ticket storage: tickets are stored without their null fields or the
+# id/created_at pair (both come from _id), with enum fields as small integer codes
+# and the free-text area fields as codes from the shared ticket dictionary.
+# stored_ticket and api_ticket convert between this and the Ticket model's shape.
+STATUS_CODES = {
+    TicketStatus.RESOLVED.value: 1,
+    TicketStatus.ASSIGNED.value: 2,
+    TicketStatus.PENDING.value: 3,
+    TicketStatus.CLOSED.value: 4,
+    "Open": 5,
+    "In Progress": 6,
+}
+SLA_STATUS_CODES = {SLAStatus.MET.value: 1, SLAStatus.BREACHED.value: 2, SLAStatus.AT_RISK.value: 3}
+# Values outside these tables are stored as they are
+ENUM_CODED_FIELDS = {
+    'status': STATUS_CODES,
+    'response_sla_status': SLA_STATUS_CODES,
+    'resolution_sla_status': SLA_STATUS_CODES,
+    'sla_risk': SLA_STATUS_CODES,
+}
+ENUM_VALUES = {field: {code: value for value, code in codes.items()} for field, codes in ENUM_CODED_FIELDS.items()}
+DICTIONARY_FIELDS = ['area', 'sub_area', 'problem_area']
+# Ticket fields that come from _id rather than being stored
+ID_FIELDS = ('id', 'created_at')
+
+def stored_code(field: str, value: Any) -> Any:
+    """How a value of an enum-coded field is stored, for queries and updates"""
+    codes = ENUM_CODED_FIELDS.get(field)
+    return codes.get(value, value) if codes else value
+
+def enum_value(field: str, value: Any) -> Any:
+    """The API value of a stored enum-coded field"""
+    return ENUM_VALUES[field].get(value, value) if isinstance(value, int) else value
+
+def stored_ticket(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact stored form of a Ticket-shaped record (area fields are coded on write)"""
+    document = {}
+    for name, value in record.items():
+        if value is None or name in ID_FIELDS:
+            continue
+        codes = ENUM_CODED_FIELDS.get(name)
+        document[name] = codes.get(value, value) if codes else value
+    return document
+
+def api_ticket(document: Dict[str, Any], dictionary_values: Dict[str, Dict[int, str]]) -> Dict[str, Any]:
+    """Ticket-shaped view of a stored ticket; fields it doesn't store read as missing"""
+    ticket = dict(document)
+    object_id = ticket.pop('_id', None)
+    if isinstance(object_id, ObjectId):
+        ticket.setdefault('id', str(object_id))
+        ticket.setdefault('created_at', object_id.generation_time)
+    for field in ENUM_CODED_FIELDS:
+        if field in ticket:
+            ticket[field] = enum_value(field, ticket[field])
+    for field in DICTIONARY_FIELDS:
+        if isinstance(ticket.get(field), int):
+            ticket[field] = dictionary_values[field].get(ticket[field])
+    return ticket
+
+def ticket_documents(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Turn a transformed ticket frame into stored MongoDB documents"""
+    hashes = content_hashes(frame).tolist()
+    # Risk depends on when the row is read, so it stays out of the content hash
+    risks = sla_risk_series(frame['sla_deadline'], datetime.now()).tolist()
+    records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    documents = []
+    for record, content_hash, risk in zip(records, hashes, risks):
+        record['sla_risk'] = risk
+        document = stored_ticket(record)
+        document['content_hash'] = content_hash
+        documents.append(document)
+    return documents
+
+class TicketDictionary:
+    """Integer codes for the free-text area fields, kept in the ticket_dictionary collection
+    
+    A code is allocated once per distinct value and never changes, so every
+    worker caches what it has seen and only asks MongoDB about new values.
+    """
+    
+    def __init__(self):
+        self.codes = {field: {} for field in DICTIONARY_FIELDS}
+        self.values = {field: {} for field in DICTIONARY_FIELDS}
+    
+    async def load(self, field: str, query: Dict[str, Any]):
+        async for entry in db.ticket_dictionary.find({"field": field, "code": {"$exists": True}, **query}):
+            self.codes[field][entry["value"]] = entry["code"]
+            self.values[field][entry["code"]] = entry["value"]
+    
+    async def allocate(self, field: str, values: List[str]):
+        """Give new values codes; if another worker coded a value first, its code wins"""
+        counter = await db.ticket_dictionary.find_one_and_update(
+            {"_id": f"next:{field}"},
+            {"$inc": {"next": len(values)}, "$setOnInsert": {"field": field, "value": None}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first = counter["next"] - len(values)
+        entries = [{"field": field, "value": value, "code": first + offset} for offset, value in enumerate(values)]
+        try:
+            await db.ticket_dictionary.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+        await self.load(field, {"value": {"$in": values}})
+    
+    async def encode(self, documents: List[Dict[str, Any]]):
+        """Replace the area field strings in stored documents with their codes, in place"""
+        for field in DICTIONARY_FIELDS:
+            missing = {document[field] for document in documents if field in document} - self.codes[field].keys()
+            if missing:
+                await self.load(field, {"value": {"$in": list(missing)}})
+                missing -= self.codes[field].keys()
+            if missing:
+                await self.allocate(field, sorted(missing))
+            codes = self.codes[field]
+            for document in documents:
+                if field in document:
+                    document[field] = codes[document[field]]
+    
+    async def decode(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ticket-shaped views of stored tickets"""
+        for field in DICTIONARY_FIELDS:
+            missing = {
+                document[field] for document in documents if isinstance(document.get(field), int)
+            } - self.values[field].keys()
+            if missing:
+                await self.load(field, {"code": {"$in": list(missing)}})
+        return [api_ticket(document, self.values) for document in documents]
+
+ticket_dictionary = TicketDictionary()
+
+DICTIONARY_INDEXES = [
+    IndexModel([("field", ASCENDING), ("value", ASCENDING)], unique=True, name="field_value_unique"),
+    IndexModel([("field", ASCENDING), ("code", ASCENDING)], name="field_code"),
+]
+
+async def migrate_compact_tickets(batch_size: int = 10000) -> int:
+    """Rewrite tickets stored in the earlier full shape (uuid id, nulls, text enums) compactly"""
+    converted = 0
+    batch = []
+    
+    async def flush():
+        documents = [stored_ticket(ticket) for ticket in batch]
+        await ticket_dictionary.encode(documents)
+        await db.tickets.bulk_write(
+            [ReplaceOne({"_id": ticket["_id"]}, document) for ticket, document in zip(batch, documents)],
+            ordered=False
+        )
+        return len(documents)
+    
+    async for ticket in db.tickets.find({"id": {"$exists": True}}).batch_size(batch_size):
+        batch.append(ticket)
+        if len(batch) >= batch_size:
+            converted += await flush()
+            batch = []
+    if batch:
+        converted += await flush()
+    return converted
+
+def collect_agents(frame: pd.DataFrame) -> Dict[str, str]:
+    """Map each agent in the resolved_by and assigned columns to the team of their last row"""
+    pairs = pd.concat([
+        frame[[name_field, 'updated_team']].set_axis(['name', 'team'], axis=1)
+        for name_field in ('resolved_by', 'assigned')
+    ]).sort_index(kind='stable')
+    pairs = pairs[pairs['name'].notna()]
+    pairs = pairs[pairs['name'].str.strip() != '']
+    pairs = pairs.drop_duplicates('name', keep='last')
+    return dict(zip(pairs['name'], pairs['team'].fillna('L1')))
+
+# SLA rollups: per (agent, team, day) counters maintained at ingest
+ROLLUP_KEYS = ['agent', 'team', 'day']
+ROLLUP_SOURCE_FIELDS = [
+    'resolved_by', 'updated_team', 'created', 'status',
+    'response_sla_status', 'resolution_sla_status',
+    'response_time_hours', 'resolution_time_hours',
+]
+
+def ticket_days(created: pd.Series) -> pd.Series:
+    """Calendar day (YYYY-MM-DD) of each ticket's created value, or None if it can't be parsed"""
+    days = pd.to_datetime(created, errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+    return days.astype(object).where(days.notna(), None)
+
+# Response and resolution times are also kept as DDSketch bucket counts per rollup.
+# Bucket i holds times in (gamma^(i-1), gamma^i], so the counts of any set of
+# rollups add (and subtract) into the sketch of their union, and any quantile read
+# from it is within SKETCH_RELATIVE_ACCURACY of the true value.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_LOG_GAMMA = math.log(SKETCH_GAMMA)
+# Times at or below this many hours (and negative ones) count in the zero bucket
+SKETCH_MIN_HOURS = 1e-4
+SKETCH_ZERO_BUCKET = 'zero'
+SKETCH_FIELDS = {
+    'response_time_hours': 'response_time_sketch',
+    'resolution_time_hours': 'resolution_time_sketch',
+}
+# Default /api/time-distribution histogram bin edges, in hours
+DEFAULT_HISTOGRAM_HOURS = [1, 4, 8, 24, 48, 72, 168]
+
+def sketch_buckets(values: pd.Series) -> pd.Series:
+    """DDSketch bucket key of each time in hours, None where the time is missing"""
+    hours = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+    finite = np.isfinite(hours)
+    positive = finite & (hours > SKETCH_MIN_HOURS)
+    keys = np.full(len(hours), None, dtype=object)
+    keys[finite & ~positive] = SKETCH_ZERO_BUCKET
+    keys[positive] = np.ceil(np.log(hours[positive]) / SKETCH_LOG_GAMMA).astype(np.int64).astype(str)
+    return pd.Series(keys, index=values.index, dtype=object)
+
+def sketch_value(key: str) -> float:
+    """Value a bucket stands for: the point within the relative accuracy of both its bounds"""
+    if key == SKETCH_ZERO_BUCKET:
+        return 0.0
+    return 2 * SKETCH_GAMMA ** int(key) / (SKETCH_GAMMA + 1)
+
+def sketch_contributions(keys: pd.DataFrame, tickets: pd.DataFrame) -> pd.Series:
+    """Count each group's times per sketch bucket, keyed by the 'field.bucket' path to $inc
+    
+    Kept long rather than as a column per bucket, since a group only ever
+    touches a handful of the several hundred buckets.
+    """
+    parts = []
+    for source, field in SKETCH_FIELDS.items():
+        buckets = sketch_buckets(tickets[source])
+        present = buckets.notna()
+        parts.append(keys[present].assign(path=field + '.' + buckets[present]))
+    return pd.concat(parts).groupby(ROLLUP_KEYS + ['path'], dropna=False).size()
+
+def summarize_sketch(buckets: Dict[str, int], percentiles: List[float], edges: List[float]) -> Dict[str, Any]:
+    """Percentiles and a histogram over edges (hours) from merged sketch bucket counts"""
+    counts = sorted(
+        ((sketch_value(key), count) for key, count in buckets.items() if count > 0),
+        key=lambda bucket: bucket[0]
+    )
+    total = sum(count for _, count in counts)
+    values = {}
+    for percentile in percentiles:
+        rank = percentile / 100 * (total - 1)
+        seen = 0
+        for value, count in counts:
+            seen += count
+            if seen > rank:
+                values[f"p{percentile:g}"] = round(value, 2)
+                break
+        else:
+            values[f"p{percentile:g}"] = None
+    
+    # A bucket goes to the bin holding its value, so bins are exact to within the sketch accuracy
+    histogram = [0] * (len(edges) + 1)
+    for value, count in counts:
+        histogram[bisect_right(edges, value)] += count
+    bounds = [0.0] + edges + [None]
+    return {
+        "count": total,
+        "percentiles": values,
+        "histogram": [
+            {"from_hours": bounds[index], "to_hours": bounds[index + 1], "count": count}
+            for index, count in enumerate(histogram)
         ]
+    }
+
+def rollup_contributions(documents: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.Series]:
+    """Sum each stored ticket's rollup counters by (agent, team, day), and count its times per sketch bucket"""
+    tickets = pd.DataFrame(documents, columns=ROLLUP_SOURCE_FIELDS)
+    response_times = pd.to_numeric(tickets['response_time_hours'], errors='coerce')
+    resolution_times = pd.to_numeric(tickets['resolution_time_hours'], errors='coerce')
+    met, breached = SLA_STATUS_CODES[SLAStatus.MET.value], SLA_STATUS_CODES[SLAStatus.BREACHED.value]
+    response_breached = tickets['response_sla_status'] == breached
+    resolution_breached = tickets['resolution_sla_status'] == breached
+    
+    team = tickets['updated_team']
+    contributions = pd.DataFrame({
+        'agent': tickets['resolved_by'],
+        'team': team.where(~(team.isna() | team.isin(['', 'null'])), 'L1'),
+        'day': ticket_days(tickets['created']),
+        'tickets': 1,
+        'resolved': (tickets['status'] == STATUS_CODES[TicketStatus.RESOLVED.value]).astype(int),
+        'response_sla_met': (tickets['response_sla_status'] == met).astype(int),
+        'response_sla_breached': response_breached.astype(int),
+        'resolution_sla_met': (tickets['resolution_sla_status'] == met).astype(int),
+        'resolution_sla_breached': resolution_breached.astype(int),
+        'sla_breached': (response_breached | resolution_breached).astype(int),
+        'response_time_sum': response_times.fillna(0.0),
+        'response_time_count': response_times.notna().astype(int),
+        'resolution_time_sum': resolution_times.fillna(0.0),
+        'resolution_time_count': resolution_times.notna().astype(int),
+    })
+    counters = contributions.groupby(ROLLUP_KEYS, dropna=False).sum()
+    return counters, sketch_contributions(contributions[ROLLUP_KEYS], tickets)
+
+class SLARollupDelta:
+    """Accumulates rollup changes for written (and replaced) tickets until flushed"""
+    
+    def __init__(self):
+        self.contributions = []
+        self.sketches = []
+    
+    def add(self, documents: List[Dict[str, Any]], sign: int = 1):
+        """Count documents in (sign=1) or out (sign=-1) of the rollups"""
+        if documents:
+            counters, sketches = rollup_contributions(documents)
+            self.contributions.append(counters * sign)
+            self.sketches.append(sketches * sign)
+    
+    async def flush(self, collection=None) -> int:
+        """Apply the accumulated changes with one bulk $inc upsert, returning the groups touched"""
+        collection = collection if collection is not None else db.sla_rollups
+        if not self.contributions:
+            return 0
         
-        pending_cursor = db.tickets.aggregate(pending_pipeline)
-        pending_by_team = {}
-        async for result in pending_cursor:
-            pending_by_team[result["_id"]] = result["pending_count"]
-        
-        # Extract counts for each team (default to 0 if not found)
-        l1_pending = pending_by_team.get("L1", 0)
-        l2_pending = pending_by_team.get("L2", 0)  
-        business_pending = pending_by_team.get("Business Team", 0)
-        
-        # Calculate overall SLA percentages
-        response_sla_met = await db.tickets.count_documents({"response_sla_status": "Met"})
-        resolution_sla_met = await db.tickets.count_documents({"resolution_sla_status": "Met"})
+        combined = pd.concat(self.contributions).groupby(level=ROLLUP_KEYS, dropna=False).sum()
+        sketches = pd.concat(self.sketches).groupby(level=ROLLUP_KEYS + ['path'], dropna=False).sum()
+        self.contributions = []
+        self.sketches = []
         
-        overall_response_sla = (response_sla_met / total_tickets * 100) if total_tickets > 0 else 0
-        overall_resolution_sla = (resolution_sla_met / total_tickets * 100) if total_tickets > 0 else 0
+        # Only the sketch buckets that changed go into each group's $inc
+        bucket_increments = {}
+        for key, count in sketches[sketches != 0].items():
+            group = tuple(None if pd.isna(value) else value for value in key[:-1])
+            bucket_increments.setdefault(group, {})[key[-1]] = int(count)
         
-        # Get SLA breaches today
-        sla_breaches_today = await db.tickets.count_documents({
-            "$or": [
-                {"response_sla_status": "Breached"},
-                {"resolution_sla_status": "Breached"}
-            ]
-        })
+        operations = []
+        shrunk = []
+        for key, counters in zip(combined.index, combined.to_dict('records')):
+            group = {name: (None if pd.isna(value) else value) for name, value in zip(ROLLUP_KEYS, key)}
+            if counters['tickets'] < 0:
+                shrunk.append(group)
+            counters.update(bucket_increments.get(tuple(group.values()), {}))
+            operations.append(UpdateOne(group, {"$inc": counters}, upsert=True))
+        await collection.bulk_write(operations, ordered=False)
         
-        # Get top performers (balanced score: ticket volume + SLA performance)
-        pipeline = [
-            {"$match": {"resolved_by": {"$ne": None, "$ne": ""}}},
-            {
-                "$group": {
-                    "_id": "$resolved_by",
-                    "total_tickets": {"$sum": 1},
-                    "response_sla_met": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$response_sla_status", "Met"]}, 1, 0]
-                        }
-                    },
-                    "resolution_sla_met": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$resolution_sla_status", "Met"]}, 1, 0]
-                        }
-                    }
-                }
-            },
-            {
-                "$project": {
-                    "agent_name": "$_id",
-                    "total_tickets": 1,
-                    "response_sla_percentage": {
-                        "$multiply": [
-                            {"$divide": ["$response_sla_met", "$total_tickets"]},
-                            100
-                        ]
-                    },
-                    "resolution_sla_percentage": {
-                        "$multiply": [
-                            {"$divide": ["$resolution_sla_met", "$total_tickets"]},
-                            100
-                        ]
-                    }
-                }
-            },
-            {
-                "$addFields": {
-                    # Performance Score: (Resolution SLA * 0.6) + (Response SLA * 0.4) + (Ticket Volume Bonus)
-                    # Minimum 5 tickets to qualify, bonus points for higher volume
-                    "performance_score": {
-                        "$cond": {
-                            "if": {"$gte": ["$total_tickets", 5]},
-                            "then": {
-                                "$add": [
-                                    # SLA Score (60% resolution + 40% response)
-                                    {
-                                        "$add": [
-                                            {"$multiply": ["$resolution_sla_percentage", 0.6]},
-                                            {"$multiply": ["$response_sla_percentage", 0.4]}
-                                        ]
-                                    },
-                                    # Volume bonus: 1 point per ticket above 5, capped at 20 bonus points
-                                    {
-                                        "$min": [
-                                            {"$subtract": ["$total_tickets", 5]},
-                                            20
-                                        ]
-                                    }
-                                ]
-                            },
-                            "else": 0
-                        }
-                    }
-                }
-            },
-            {"$match": {"performance_score": {"$gt": 0}}},  # Only include agents with 5+ tickets
-            {"$sort": {"performance_score": -1, "total_tickets": -1}},  # Primary: score, Tiebreaker: ticket volume
-            {"$limit": 5}
-        ]
+        # Drop groups whose tickets were all replaced or removed; only groups that lost tickets can be empty
+        if shrunk:
+            await collection.delete_many({"$or": [{**group, "tickets": {"$lte": 0}} for group in shrunk]})
+        return len(operations)
+
+# A rollup rebuild holds this lease in scheduler_meta, renewing it after every batch
+ROLLUP_REBUILD_LEASE = timedelta(minutes=10)
+
+async def claim_rollup_rebuild() -> Optional[str]:
+    """Take the rollup rebuild lease, returning its token, or None while another worker holds it"""
+    token = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    try:
+        await db.scheduler_meta.find_one_and_update(
+            {"_id": "rollup_rebuild", "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"token": token, "lease_until": now + ROLLUP_REBUILD_LEASE}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The lease document exists and is held, so the upsert collided with it
+        return None
+    return token
+
+async def renew_rollup_rebuild(token: str):
+    """Extend the lease, failing if it expired and another worker took it over"""
+    result = await db.scheduler_meta.update_one(
+        {"_id": "rollup_rebuild", "token": token},
+        {"$set": {"lease_until": datetime.now(timezone.utc) + ROLLUP_REBUILD_LEASE}}
+    )
+    if result.matched_count == 0:
+        raise RuntimeError("The rollup rebuild lease was lost to another worker")
+
+async def release_rollup_rebuild(token: str):
+    await db.scheduler_meta.update_one({"_id": "rollup_rebuild", "token": token}, {"$set": {"lease_until": None}})
+
+async def rollup_rebuild_running() -> bool:
+    """Whether some worker holds the rollup rebuild lease"""
+    lease = {"_id": "rollup_rebuild", "lease_until": {"$gt": datetime.now(timezone.utc)}}
+    return await db.scheduler_meta.find_one(lease, {"_id": 1}) is not None
+
+async def rebuild_sla_rollups(batch_size: int = 10000, check_ingests: bool = True) -> Optional[int]:
+    """Recompute sla_rollups from every stored ticket and swap the result in
+    
+    Only the worker holding the rebuild lease runs it, and not while an ingest
+    is writing rollup updates that the swap would drop (check_ingests=False is
+    for a replace upload repairing its own swap). Returns the number of rollup
+    groups, or None when the rebuild was skipped for either reason.
+    """
+    token = await claim_rollup_rebuild()
+    if token is None:
+        return None
+    rebuild = db[f"sla_rollups_rebuild{STAGING_MARKER}{uuid.uuid4().hex}"]
+    try:
+        if check_ingests and await ingest_job_running():
+            return None
         
-        top_performers_cursor = db.tickets.aggregate(pipeline)
-        top_performers = []
-        async for performer in top_performers_cursor:
-            # Calculate overall SLA (average of response and resolution)
-            overall_sla = (performer["response_sla_percentage"] + performer["resolution_sla_percentage"]) / 2
-            
-            top_performers.append({
-                "agent_name": performer["agent_name"],
-                "total_tickets": performer["total_tickets"],
-                "response_sla_percentage": round(performer["response_sla_percentage"], 2),
-                "resolution_sla_percentage": round(performer["resolution_sla_percentage"], 2),
-                "overall_sla_percentage": round(overall_sla, 2),
-                "performance_score": round(performer["performance_score"], 2)
-            })
+        delta = SLARollupDelta()
+        batch = []
+        async for ticket in db.tickets.find({}, {"_id": 0, **{field: 1 for field in ROLLUP_SOURCE_FIELDS}}).batch_size(batch_size):
+            batch.append(ticket)
+            if len(batch) >= batch_size:
+                delta.add(batch)
+                await delta.flush(rebuild)
+                await renew_rollup_rebuild(token)
+                batch = []
+        delta.add(batch)
+        await delta.flush(rebuild)
+        await renew_rollup_rebuild(token)
         
-        return DashboardSummary(
-            total_tickets=total_tickets,
-            tickets_closed_today=tickets_closed_today,
-            tickets_open=tickets_open,
-            l1_pending=l1_pending,
-            l2_pending=l2_pending,
-            business_pending=business_pending,
-            overall_response_sla=round(overall_response_sla, 2),
-            overall_resolution_sla=round(overall_resolution_sla, 2),
-            top_performers=top_performers,
-            sla_breaches_today=sla_breaches_today
+        groups = await rebuild.count_documents({})
+        if groups:
+            await rebuild.create_indexes(ROLLUP_INDEXES)
+            await rebuild.rename("sla_rollups", dropTarget=True)
+        else:
+            await db.sla_rollups.delete_many({})
+        return groups
+    finally:
+        # A no-op once the rename has moved the scratch collection
+        await rebuild.drop()
+        await release_rollup_rebuild(token)
+
+async def ensure_ticket_key_index():
+    """Create the unique SR Number index that merge uploads rely on"""
+    try:
+        await db.tickets.create_indexes([SR_NUMBER_INDEX])
+    except OperationFailure as e:
+        if e.code != 11000:
+            raise
+        raise ValueError(
+            "Existing tickets contain duplicate SR Numbers; clear the data before using merge mode"
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting dashboard summary: {str(e)}")
 
-@api_router.get("/agents", response_model=List[Agent])
-async def get_agents():
-    """Get all agents"""
-    agents = await db.agents.find().to_list(1000)
-    return [Agent(**parse_from_mongo(agent)) for agent in agents]
+async def insert_ticket_batches(
+    documents: List[Dict[str, Any]],
+    batch_size: int = INGEST_BATCH_SIZE,
+    job: Optional[IngestJob] = None,
+    rollups: Optional[SLARollupDelta] = None,
+    collection=None
+) -> Dict[str, int]:
+    """Write ticket documents with unordered insert_many calls of batch_size
+    
+    When the unique SR Number index exists, rows whose SR Number is already
+    stored are left as they are and counted as duplicates; merge uploads
+    update them instead.
+    """
+    collection = collection if collection is not None else db.tickets
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        rejected = set()
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            inserted = e.details['nInserted']
+            rejected = {error['index'] for error in e.details['writeErrors']}
+        if rollups:
+            rollups.add([document for index, document in enumerate(batch) if index not in rejected])
+        counts['inserted'] += inserted
+        counts['duplicate'] += len(batch) - inserted
+        if job:
+            job.rows_written += inserted
+            await report_job_progress(job)
+    return counts
 
-@api_router.get("/agent-performance/{agent_name}")
-async def get_agent_performance(agent_name: str):
-    """Get detailed performance metrics for a specific agent"""
-    try:
-        # Get agent tickets
-        tickets = await db.tickets.find({"resolved_by": agent_name}).to_list(1000)
-        
-        if not tickets:
-            return {
-                "agent_name": agent_name,
-                "total_tickets": 0,
-                "response_sla_met": 0,
-                "response_sla_breached": 0,
-                "resolution_sla_met": 0,
-                "resolution_sla_breached": 0,
-                "response_sla_percentage": 0,
-                "resolution_sla_percentage": 0,
-                "avg_response_time": 0,
-                "avg_resolution_time": 0
-            }
+async def merge_ticket_batches(
+    documents: List[Dict[str, Any]],
+    batch_size: int = INGEST_BATCH_SIZE,
+    job: Optional[IngestJob] = None,
+    rollups: Optional[SLARollupDelta] = None,
+    collection=None
+) -> Dict[str, int]:
+    """Upsert ticket documents keyed on SR Number, skipping rows whose content hash is unchanged
+    
+    Duplicate SR Numbers within a batch collapse to the last row, and the
+    earlier ones are counted as duplicates.
+    """
+    collection = collection if collection is not None else db.tickets
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+    for start in range(0, len(documents), batch_size):
+        rows = documents[start:start + batch_size]
+        batch = {document['sr_number']: document for document in rows}
+        counts['duplicate'] += len(rows) - len(batch)
         
-        total_tickets = len(tickets)
-        response_sla_met = sum(1 for t in tickets if t.get('response_sla_status') == 'Met')
-        resolution_sla_met = sum(1 for t in tickets if t.get('resolution_sla_status') == 'Met')
-        response_sla_breached = sum(1 for t in tickets if t.get('response_sla_status') == 'Breached')
-        resolution_sla_breached = sum(1 for t in tickets if t.get('resolution_sla_status') == 'Breached')
+        stored_tickets = {}
+        projection = {"_id": 0, "sr_number": 1, "content_hash": 1, **{field: 1 for field in ROLLUP_SOURCE_FIELDS}}
+        async for stored in collection.find({"sr_number": {"$in": list(batch)}}, projection):
+            stored_tickets[stored["sr_number"]] = stored
         
-        # Calculate averages
-        response_times = [t.get('response_time_hours', 0) for t in tickets if t.get('response_time_hours')]
-        resolution_times = [t.get('resolution_time_hours', 0) for t in tickets if t.get('resolution_time_hours')]
+        operations = []
+        written, replaced = [], []
+        for sr_number, document in batch.items():
+            stored = stored_tickets.get(sr_number)
+            if stored and stored.get("content_hash") == document['content_hash']:
+                counts['unchanged'] += 1
+                continue
+            written.append(document)
+            if stored:
+                replaced.append(stored)
+            # Fields the new row leaves empty are removed rather than stored as null
+            update = {"$set": document}
+            cleared = {field: "" for field in STORED_TICKET_FIELDS if field not in document}
+            if cleared:
+                update["$unset"] = cleared
+            operations.append(UpdateOne({"sr_number": sr_number}, update, upsert=True))
         
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        avg_resolution_time = sum(resolution_times) / len(resolution_times) if resolution_times else 0
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            if rollups:
+                rollups.add(replaced, sign=-1)
+                rollups.add(written)
+            counts['inserted'] += result.upserted_count
+            counts['updated'] += result.modified_count
+            if job:
+                job.rows_written += result.upserted_count + result.modified_count
+                await report_job_progress(job)
+    return counts
+
+async def ensure_agent_name_index(collection=None):
+    """Create the unique agent name index that agent upserts rely on"""
+    collection = collection if collection is not None else db.agents
+    await collection.create_indexes([AGENT_NAME_INDEX])
+
+async def upsert_agents(agent_teams: Dict[str, str], collection=None) -> Dict[str, int]:
+    """Create missing agents and move existing ones to their latest team in one bulk write"""
+    collection = collection if collection is not None else db.agents
+    if not agent_teams:
+        return {'created': 0, 'updated': 0}
+    
+    await ensure_agent_name_index(collection)
+    operations = []
+    for agent_name, team in agent_teams.items():
+        agent = Agent(
+            name=agent_name,
+            employee_id=agent_name,  # Using name as ID for now
+            team=team
+        )
+        new_agent = prepare_for_mongo(agent.dict(exclude={'team'}))
+        operations.append(UpdateOne(
+            {"name": agent_name},
+            {"$set": {"team": team}, "$setOnInsert": new_agent},
+            upsert=True
+        ))
+    
+    result = await collection.bulk_write(operations, ordered=False)
+    return {'created': result.upserted_count, 'updated': result.modified_count}
+
+STORED_TICKET_FIELDS = [field for field in Ticket.model_fields if field not in ID_FIELDS]
+
+# Replace uploads load into staging collections and swap them in when complete
+STAGING_MARKER = "_staging_"
+
+class StagedLoad:
+    """Staging copies of the tickets, rollups and agents collections for a replace upload
+    
+    Nothing live changes until swap(), which renames each staging collection
+    over its live one. Each rename is atomic on its own but the three are
+    not atomic together: readers never see a partly loaded collection, but
+    between the renames (a few milliseconds) they can see the new tickets
+    with the old rollups or agents.
+    """
+    
+    def __init__(self):
+        suffix = uuid.uuid4().hex[:12]
+        self.tickets = db[f"tickets{STAGING_MARKER}{suffix}"]
+        self.rollups = db[f"sla_rollups{STAGING_MARKER}{suffix}"]
+        self.agents = db[f"agents{STAGING_MARKER}{suffix}"]
+        # Set once the live tickets have been replaced; from then on the load can't be discarded
+        self.swapped = False
+    
+    async def prepare(self):
+        """Create the unique keys the load upserts on; the query indexes are built after loading"""
+        await self.tickets.create_indexes([SR_NUMBER_INDEX])
+        await self.rollups.create_indexes(ROLLUP_INDEXES)
+        await self.agents.create_indexes(AGENT_INDEXES)
+    
+    async def validate(self, tickets_written: int):
+        """Refuse to swap in a load that is empty or whose rollups disagree with its tickets"""
+        stored = await self.tickets.count_documents({})
+        if stored == 0:
+            raise ValueError("The upload contained no tickets; the existing data was kept")
+        if stored != tickets_written:
+            raise ValueError(f"Staged {stored} tickets but wrote {tickets_written}; the existing data was kept")
+        totals = await self.rollups.aggregate([{"$group": {"_id": None, "tickets": {"$sum": "$tickets"}}}]).to_list(1)
+        rolled_up = totals[0]["tickets"] if totals else 0
+        if rolled_up != stored:
+            raise ValueError(f"Staged rollups count {rolled_up} tickets, not {stored}; the existing data was kept")
+    
+    async def swap(self):
+        """Build the remaining indexes on the staged tickets and rename every staging collection over its live one
         
-        return {
-            "agent_name": agent_name,
-            "total_tickets": total_tickets,
-            "response_sla_met": response_sla_met,
-            "response_sla_breached": response_sla_breached,
-            "resolution_sla_met": resolution_sla_met,
-            "resolution_sla_breached": resolution_sla_breached,
-            "response_sla_percentage": round((response_sla_met / total_tickets * 100), 2) if total_tickets > 0 else 0,
-            "resolution_sla_percentage": round((resolution_sla_met / total_tickets * 100), 2) if total_tickets > 0 else 0,
-            "avg_response_time": round(avg_response_time, 2),
-            "avg_resolution_time": round(avg_resolution_time, 2)
-        }
+        Once the tickets are renamed the swap is finished rather than undone:
+        if the rollups can't be renamed they are rebuilt from the new tickets,
+        and if the agents can't be, the staged agents are upserted instead.
+        """
+        await self.tickets.create_indexes(TICKET_INDEXES)
+        await self.tickets.rename("tickets", dropTarget=True)
+        self.swapped = True
+        try:
+            await self.rollups.rename("sla_rollups", dropTarget=True)
+        except Exception:
+            logger.exception("Could not swap in the staged SLA rollups; rebuilding them from the new tickets")
+            if await rebuild_sla_rollups(check_ingests=False) is None:
+                raise RuntimeError(
+                    "The tickets were replaced but another rollup rebuild is running; "
+                    "run POST /api/admin/rebuild-rollups once it finishes"
+                )
+            await self.rollups.drop()
+        try:
+            await self.agents.rename("agents", dropTarget=True)
+        except Exception:
+            logger.exception("Could not swap in the staged agents; upserting them instead")
+            await upsert_agents({agent["name"]: agent["team"] async for agent in self.agents.find({}, {"name": 1, "team": 1})})
+            await self.agents.drop()
+    
+    async def discard(self):
+        """Drop the staging collections; only valid before swap() has replaced the live tickets"""
+        for collection in (self.tickets, self.rollups, self.agents):
+            await collection.drop()
+
+def iter_buffered_frames(
+    source: Union[str, bytes],
+    filename: str,
+    chunk_rows: int = INGEST_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Read a whole Excel or CSV upload, from a file path or its content, in DataFrames of at most chunk_rows rows"""
+    upload = io.BytesIO(source) if isinstance(source, bytes) else source
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(upload)
+    else:
+        df = pd.read_excel(upload)
+    # Slice the frame so chunks are written while later ones are still being transformed
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def iter_upload_frames(
+    path: str,
+    filename: str,
+    chunk_rows: int = INGEST_BATCH_SIZE,
+    sheet: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """Read an Excel or CSV file from disk in DataFrames of at most chunk_rows rows
+    
+    Workbooks are read from the named sheet, or the first one.
+    """
+    lower_name = filename.lower()
+    
+    if lower_name.endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+        return
+    
+    if lower_name.endswith('.xls'):
+        # Legacy .xls workbooks can't be read row by row, so slice the full frame
+        df = pd.read_excel(path, sheet_name=sheet if sheet is not None else 0)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [
+            str(name) if name is not None else f"Unnamed: {index}"
+            for index, name in enumerate(header)
+        ]
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting agent performance: {str(e)}")
+        batch = []
+        for row in rows:
+            # Skip completely blank rows (read-only sheets often report trailing ones)
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
 
-@api_router.get("/team-performance")
-async def get_team_performance():
-    """Get performance metrics grouped by team (L1, L2, Business Team)"""
+def upload_sheet_names(path: str, filename: str) -> List[Optional[str]]:
+    """List the sheets of a workbook on disk; a CSV file counts as one unnamed sheet"""
+    lower_name = filename.lower()
+    if lower_name.endswith('.csv'):
+        return [None]
+    if lower_name.endswith('.xls'):
+        with pd.ExcelFile(path) as workbook:
+            return list(workbook.sheet_names)
+    workbook = load_workbook(path, read_only=True)
     try:
-        # Get all tickets and process team data
-        pipeline = [
-            {
-                "$addFields": {
-                    # Ensure we have a team for every ticket, default to L1
-                    "team": {
-                        "$cond": {
-                            "if": {
-                                "$or": [
-                                    {"$eq": ["$updated_team", None]}, 
-                                    {"$eq": ["$updated_team", ""]},
-                                    {"$eq": ["$updated_team", "null"]}
-                                ]
-                            },
-                            "then": "L1",
-                            "else": "$updated_team"
-                        }
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+def transform_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """Turn one raw upload DataFrame into ticket documents and agent teams
+    
+    Rows without an SR Number can't be keyed, so they are counted as rejected
+    and left out.
+    """
+    started = perf_counter()
+    # Clean column names
+    df.columns = df.columns.astype(str).str.strip()
+    
+    # Transform whole columns at once
+    frame = build_ticket_frame(df)
+    keyed = frame['sr_number'].notna()
+    frame = frame[keyed]
+    return {
+        'rows': len(df),
+        'rejected': int((~keyed).sum()),
+        'documents': ticket_documents(frame),
+        'agent_teams': collect_agents(frame),
+        'transform': perf_counter() - started,
+    }
+
+def parse_upload(
+    chunks: Any,
+    cancelled: Any,
+    source: Union[str, bytes],
+    filename: str,
+    chunk_rows: int,
+    stream: bool,
+    sheet: Optional[str] = None
+):
+    """Decode and transform an upload, putting each parsed chunk on the chunks queue
+    
+    Runs in a parse worker process. source is a spooled file path or the file
+    content; without stream it is read whole and then sliced. None on the queue marks the end;
+    setting cancelled stops the worker after its current chunk.
+    """
+    try:
+        if stream:
+            frames = iter_upload_frames(source, filename, chunk_rows, sheet)
+        else:
+            frames = iter_buffered_frames(source, filename, chunk_rows)
+        while True:
+            started = perf_counter()
+            df = next(frames, None)
+            parse_seconds = perf_counter() - started
+            if df is None or cancelled.is_set():
+                break
+            chunk = transform_frame(df)
+            chunk['parse'] = parse_seconds
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
+
+def drain_parse_queue(chunks: Any, future):
+    """Discard parsed chunks until the worker sends its end marker or exits"""
+    while not future.done():
+        try:
+            if chunks.get(True, 1.0) is None:
+                return
+        except queue.Empty:
+            pass
+
+parse_pool: Optional[Executor] = None
+parse_queue_manager = None
+
+def start_parse_pool():
+    """Start the parse worker processes, or a thread when INGEST_PARSE_WORKERS is 0"""
+    global parse_pool, parse_queue_manager
+    if INGEST_PARSE_WORKERS > 0:
+        context = multiprocessing.get_context('spawn')
+        parse_pool = ProcessPoolExecutor(max_workers=INGEST_PARSE_WORKERS, mp_context=context)
+        # Queues handed to pool tasks have to be manager proxies
+        parse_queue_manager = context.Manager()
+    else:
+        parse_pool = ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY, thread_name_prefix='ingest-parse')
+
+def stop_parse_pool():
+    global parse_pool, parse_queue_manager
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool = None
+    if parse_queue_manager is not None:
+        parse_queue_manager.shutdown()
+        parse_queue_manager = None
+
+class ParseTask:
+    """An upload being parsed on the parse pool, consumed chunk by chunk"""
+    
+    def __init__(self, source: Union[str, bytes], filename: str, chunk_rows: int, stream: bool, sheet: Optional[str] = None):
+        if parse_pool is None:
+            start_parse_pool()
+        if parse_queue_manager is not None:
+            self.queue = parse_queue_manager.Queue(maxsize=INGEST_PARSE_PREFETCH)
+            self.cancelled = parse_queue_manager.Event()
+        else:
+            self.queue = queue.Queue(maxsize=INGEST_PARSE_PREFETCH)
+            self.cancelled = threading.Event()
+        self.future = parse_pool.submit(parse_upload, self.queue, self.cancelled, source, filename, chunk_rows, stream, sheet)
+    
+    async def chunks(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield parsed chunks as the worker produces them, then re-raise any worker error"""
+        while True:
+            try:
+                chunk = await asyncio.to_thread(self.queue.get, True, 1.0)
+            except queue.Empty:
+                # A worker that died never sends the end marker
+                if self.future.done():
+                    break
+                continue
+            if chunk is None:
+                break
+            yield chunk
+        await asyncio.wrap_future(self.future)
+    
+    async def cancel(self):
+        """Stop a worker whose chunks are no longer wanted and unblock its pending put"""
+        if not self.future.done():
+            self.cancelled.set()
+            await asyncio.to_thread(drain_parse_queue, self.queue, self.future)
+
+async def parsed_chunks(source: Union[str, bytes], filename: str, chunk_rows: int, stream: bool) -> AsyncIterator[Dict[str, Any]]:
+    """Parse an upload on the parse pool, yielding chunks as the worker produces them"""
+    task = ParseTask(source, filename, chunk_rows, stream)
+    try:
+        async for chunk in task.chunks():
+            yield chunk
+    finally:
+        await task.cancel()
+
+async def ingest_chunks(
+    chunks: AsyncIterator[Dict[str, Any]],
+    batch_size: int = INGEST_BATCH_SIZE,
+    mode: IngestMode = IngestMode.APPEND,
+    job: Optional[IngestJob] = None
+) -> Dict[str, Any]:
+    """Store each parsed chunk of an upload, returning ingestion stats
+    
+    Replace uploads are written to staging collections and only swapped in
+    for the live data once every chunk is stored and the load validates;
+    if anything fails before the swap starts, the staging collections are
+    dropped and the live data is untouched.
+    """
+    timings = {'parse': 0.0, 'transform': 0.0, 'write_tickets': 0.0, 'write_rollups': 0.0}
+    started = perf_counter()
+    tickets_processed = 0
+    tickets_rejected = 0
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+    agent_teams = {}
+    rollups = SLARollupDelta()
+    staged = StagedLoad() if mode == IngestMode.REPLACE else None
+    # Appends and merges write to the live collections chunk by chunk
+    written = False
+    
+    if mode == IngestMode.MERGE:
+        await ensure_ticket_key_index()
+        write_batches = merge_ticket_batches
+    else:
+        write_batches = insert_ticket_batches
+    
+    try:
+        if staged:
+            await staged.prepare()
+        
+        # Parse and transform times are measured in the parse worker
+        async for chunk in chunks:
+            timings['parse'] += chunk['parse']
+            timings['transform'] += chunk['transform']
+            if job:
+                job.rows_parsed += chunk['rows']
+            tickets_rejected += chunk['rejected']
+            documents = chunk['documents']
+            agent_teams.update(chunk['agent_teams'])
+            
+            # Store in database
+            stage_started = perf_counter()
+            await ticket_dictionary.encode(documents)
+            written = written or not staged
+            batch_counts = await write_batches(documents, batch_size, job, rollups, staged.tickets if staged else None)
+            for key, value in batch_counts.items():
+                counts[key] += value
+            tickets_processed += len(documents)
+            timings['write_tickets'] += perf_counter() - stage_started
+            
+            # Fold the written tickets into the SLA rollups
+            stage_started = perf_counter()
+            await rollups.flush(staged.rollups if staged else None)
+            timings['write_rollups'] += perf_counter() - stage_started
+        
+        # Create agents if they don't exist and record team moves
+        stage_started = perf_counter()
+        agent_counts = await upsert_agents(agent_teams, staged.agents if staged else None)
+        timings['upsert_agents'] = perf_counter() - stage_started
+        
+        if staged:
+            stage_started = perf_counter()
+            await staged.validate(counts['inserted'])
+            await staged.swap()
+            timings['swap'] = perf_counter() - stage_started
+    except BaseException:
+        if staged and not staged.swapped:
+            await staged.discard()
+        raise
+    finally:
+        # Chunks stored before a failure are live too, so cached responses must not outlast them
+        if written or (staged and staged.swapped):
+            await response_cache.bump()
+    
+    timings['total'] = perf_counter() - started
+    
+    rows_per_second = round(tickets_processed / timings['total'], 2) if timings['total'] > 0 else 0.0
+    metrics.inc("sla_ingest_rows_total", tickets_processed)
+    metrics.set("sla_ingest_rows_per_second", rows_per_second)
+    for stage, seconds in timings.items():
+        if stage != 'total':
+            metrics.inc("sla_ingest_phase_seconds_total", seconds, phase=stage)
+    
+    return {
+        "tickets_processed": tickets_processed,
+        "tickets_inserted": counts['inserted'],
+        "tickets_updated": counts['updated'],
+        "tickets_unchanged": counts['unchanged'],
+        "tickets_duplicate": counts['duplicate'],
+        "tickets_rejected": tickets_rejected,
+        "agents_created": agent_counts['created'],
+        "agents_updated": agent_counts['updated'],
+        "rows_per_second": rows_per_second,
+        "timings": {stage: round(seconds, 4) for stage, seconds in timings.items()},
+    }
+
+async def process_excel_data(
+    source: Union[str, bytes],
+    filename: str,
+    batch_size: int = INGEST_BATCH_SIZE,
+    mode: IngestMode = IngestMode.APPEND,
+    job: Optional[IngestJob] = None
+):
+    """Process an uploaded Excel file, given as a path or its content, and extract ticket data"""
+    try:
+        return await ingest_chunks(parsed_chunks(source, filename, batch_size, stream=False), batch_size, mode, job)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing Excel file: {str(e)}")
+
+async def process_excel_stream(
+    path: str,
+    filename: str,
+    batch_size: int = INGEST_BATCH_SIZE,
+    mode: IngestMode = IngestMode.APPEND,
+    job: Optional[IngestJob] = None
+):
+    """Process an Excel or CSV file spooled to disk, batch_size rows at a time"""
+    try:
+        return await ingest_chunks(parsed_chunks(path, filename, batch_size, stream=True), batch_size, mode, job)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing Excel file: {str(e)}")
+
+async def spool_upload(file: UploadFile) -> str:
+    """Copy an upload to a temporary file in fixed-size chunks and return its path"""
+    suffix = Path(file.filename).suffix
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as spool:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            spool.write(chunk)
+    return spool.name
+
+# Background ingestion jobs: each worker runs the jobs it accepted, and saves
+# their progress to db.ingest_jobs so a poll can be answered by any worker
+ingest_queue: asyncio.Queue = asyncio.Queue()
+ingest_workers: List[asyncio.Task] = []
+ingest_job_saved_at: Dict[str, float] = {}
+INGEST_JOB_TIMES = ('created_at', 'started_at', 'finished_at')
+
+def update_job_throughput(job: IngestJob):
+    """Refresh a running job's rows/sec from the rows written so far"""
+    if job.started_at:
+        elapsed = (datetime.now(timezone.utc) - job.started_at).total_seconds()
+        job.rows_per_second = round(job.rows_written / elapsed, 2) if elapsed > 0 else 0.0
+
+async def save_ingest_job(job: IngestJob):
+    """Write a job's current state to db.ingest_jobs"""
+    ingest_job_saved_at[job.id] = monotonic()
+    document = {**job.model_dump(exclude={'id'}), "saved_at": datetime.now(timezone.utc)}
+    await db.ingest_jobs.replace_one({"_id": job.id}, document, upsert=True)
+
+async def report_job_progress(job: IngestJob):
+    """Refresh a running job's throughput, saving it at most every INGEST_JOB_SAVE_INTERVAL seconds"""
+    update_job_throughput(job)
+    if monotonic() - ingest_job_saved_at.get(job.id, 0.0) >= INGEST_JOB_SAVE_INTERVAL:
+        await save_ingest_job(job)
+
+async def finish_ingest_job(job: IngestJob):
+    """Stamp a job's finish time and save its final state"""
+    job.finished_at = datetime.now(timezone.utc)
+    await save_ingest_job(job)
+    ingest_job_saved_at.pop(job.id, None)
+
+async def load_ingest_job(job_id: str) -> Optional[IngestJob]:
+    """Read a job saved by any worker"""
+    document = await db.ingest_jobs.find_one({"_id": job_id})
+    if document is None:
+        return None
+    # MongoDB hands datetimes back naive; they were saved in UTC
+    for field in INGEST_JOB_TIMES:
+        if document.get(field) is not None:
+            document[field] = document[field].replace(tzinfo=timezone.utc)
+    document.pop("saved_at", None)
+    return IngestJob(id=document.pop("_id"), **document)
+
+async def ingest_job_running() -> bool:
+    """Whether any worker has a running ingest job (one not saved for a rebuild lease is taken as dead)"""
+    alive = {"status": IngestJobStatus.RUNNING.value, "saved_at": {"$gt": datetime.now(timezone.utc) - ROLLUP_REBUILD_LEASE}}
+    return await db.ingest_jobs.find_one(alive, {"_id": 1}) is not None
+
+async def wait_for_rollup_rebuild():
+    """Hold a starting ingest back until any rollup rebuild has swapped in"""
+    while await rollup_rebuild_running():
+        await asyncio.sleep(1)
+
+async def register_ingest_job(job: IngestJob):
+    """Save a new job, forgetting the oldest finished jobs beyond INGEST_JOB_HISTORY"""
+    await save_ingest_job(job)
+    finished = db.ingest_jobs.find({"finished_at": {"$ne": None}}, {"_id": 1}).sort("finished_at", -1).skip(INGEST_JOB_HISTORY)
+    expired = [document["_id"] async for document in finished]
+    if expired:
+        await db.ingest_jobs.delete_many({"_id": {"$in": expired}})
+
+def record_ingest_stats(job: IngestJob, stats: Dict[str, Any]):
+    """Copy the final ingestion stats onto a job"""
+    job.rows_written = stats["tickets_inserted"] + stats["tickets_updated"]
+    job.tickets_inserted = stats["tickets_inserted"]
+    job.tickets_updated = stats["tickets_updated"]
+    job.tickets_unchanged = stats["tickets_unchanged"]
+    # Batch uploads have already counted SR Numbers repeated across their files
+    job.tickets_duplicate += stats["tickets_duplicate"]
+    job.tickets_rejected = stats["tickets_rejected"]
+    if stats["tickets_rejected"]:
+        job.errors.append(f"{stats['tickets_rejected']} rows without an SR Number were skipped")
+    job.agents_created = stats["agents_created"]
+    job.agents_updated = stats["agents_updated"]
+    job.rows_per_second = stats["rows_per_second"]
+    job.timings = stats["timings"]
+
+async def run_ingest_job(job: IngestJob, spool_path: str, batch_size: int, stream: bool):
+    """Ingest a spooled upload, recording progress and the outcome on the job"""
+    job.status = IngestJobStatus.RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    await save_ingest_job(job)
+    try:
+        await wait_for_rollup_rebuild()
+        if stream:
+            stats = await process_excel_stream(spool_path, job.file_name, batch_size, job.mode, job)
+        else:
+            # The parse worker reads the spooled file itself rather than being sent a copy
+            stats = await process_excel_data(spool_path, job.file_name, batch_size, job.mode, job)
+        
+        record_ingest_stats(job, stats)
+        job.status = IngestJobStatus.COMPLETED
+    except HTTPException as e:
+        job.errors.append(str(e.detail))
+        job.status = IngestJobStatus.FAILED
+    except Exception as e:
+        logger.exception("Ingest job %s failed", job.id)
+        job.errors.append(str(e))
+        job.status = IngestJobStatus.FAILED
+    finally:
+        os.remove(spool_path)
+        await finish_ingest_job(job)
+
+BATCH_UPLOAD_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+def expand_batch_upload(path: str, file_name: str, extract_dir: str) -> List[Tuple[str, str]]:
+    """Return the (path, file name) spreadsheets in an upload, extracting them if it is a zip archive
+    
+    Archive members keep their order and are named archive.zip/member;
+    directories, hidden files and macOS metadata are skipped.
+    """
+    if not file_name.lower().endswith('.zip'):
+        return [(path, file_name)]
+    files = []
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            member_name = member.filename
+            base_name = Path(member_name).name
+            if member.is_dir() or member_name.startswith('__MACOSX/') or base_name.startswith('.'):
+                continue
+            if not base_name.lower().endswith(BATCH_UPLOAD_EXTENSIONS):
+                continue
+            fd, member_path = tempfile.mkstemp(suffix=Path(base_name).suffix.lower(), dir=extract_dir)
+            with archive.open(member) as source, os.fdopen(fd, 'wb') as target:
+                shutil.copyfileobj(source, target, UPLOAD_CHUNK_BYTES)
+            files.append((member_path, f"{file_name}/{member_name}"))
+    return files
+
+def deduplicate_documents(documents: List[Dict[str, Any]], seen_sr: set) -> List[Dict[str, Any]]:
+    """Drop tickets whose SR Number already appeared earlier in the batch"""
+    unique = []
+    for document in documents:
+        sr_number = document.get('sr_number')
+        if sr_number is not None:
+            if sr_number in seen_sr:
+                continue
+            seen_sr.add(sr_number)
+        unique.append(document)
+    return unique
+
+async def batch_chunks(
+    units: List[Tuple[str, str, Optional[str], IngestSource]],
+    job: IngestJob,
+    chunk_rows: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Parse every (path, file name, sheet, source) unit on the parse pool and yield their chunks in order
+    
+    Up to INGEST_PARSE_WORKERS units parse at once while the writer consumes
+    the oldest. The first occurrence of an SR Number wins; later rows with
+    the same SR Number, in any file or sheet, are counted as duplicates.
+    A unit that fails to parse is recorded on its source and skipped, except
+    in replace mode, where it fails the job rather than swap in partial data.
+    """
+    window = max(1, INGEST_PARSE_WORKERS)
+    pending = deque(units)
+    running = deque()
+    seen_sr = set()
+    
+    def start_next():
+        path, file_name, sheet, source = pending.popleft()
+        running.append((source, ParseTask(path, file_name, chunk_rows, stream=True, sheet=sheet)))
+    
+    try:
+        while pending and len(running) < window:
+            start_next()
+        while running:
+            source, task = running.popleft()
+            try:
+                async for chunk in task.chunks():
+                    source.rows_parsed += chunk['rows']
+                    documents = deduplicate_documents(chunk['documents'], seen_sr)
+                    duplicates = len(chunk['documents']) - len(documents)
+                    source.tickets_duplicate += duplicates
+                    job.tickets_duplicate += duplicates
+                    chunk['documents'] = documents
+                    yield chunk
+            except Exception as e:
+                source.error = str(e)
+                label = f"{source.file_name} [{source.sheet}]" if source.sheet else source.file_name
+                job.errors.append(f"{label}: {str(e)}")
+                if job.mode == IngestMode.REPLACE:
+                    raise
+            if pending:
+                start_next()
+    finally:
+        for _, task in running:
+            await task.cancel()
+
+async def run_batch_ingest_job(job: IngestJob, uploads: List[Tuple[str, str]], batch_size: int):
+    """Ingest every sheet of every file in a batch upload as one job"""
+    job.status = IngestJobStatus.RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    await save_ingest_job(job)
+    extract_dir = tempfile.mkdtemp(prefix='sla-batch-')
+    try:
+        await wait_for_rollup_rebuild()
+        loop = asyncio.get_running_loop()
+        units = []
+        for upload_path, upload_name in uploads:
+            try:
+                files = await asyncio.to_thread(expand_batch_upload, upload_path, upload_name, extract_dir)
+            except Exception as e:
+                job.sources.append(IngestSource(file_name=upload_name, error=str(e)))
+                job.errors.append(f"{upload_name}: {str(e)}")
+                continue
+            for path, file_name in files:
+                try:
+                    sheets = await loop.run_in_executor(parse_pool, upload_sheet_names, path, file_name)
+                except Exception as e:
+                    job.sources.append(IngestSource(file_name=file_name, error=str(e)))
+                    job.errors.append(f"{file_name}: {str(e)}")
+                    continue
+                for sheet in sheets:
+                    source = IngestSource(file_name=file_name, sheet=sheet)
+                    job.sources.append(source)
+                    units.append((path, file_name, sheet, source))
+        
+        if job.mode == IngestMode.REPLACE and job.errors:
+            raise ValueError("Some uploads could not be read; the existing data was kept")
+        stats = await ingest_chunks(batch_chunks(units, job, batch_size), batch_size, job.mode, job)
+        record_ingest_stats(job, stats)
+        
+        if job.sources and all(source.error is not None for source in job.sources):
+            job.status = IngestJobStatus.FAILED
+        else:
+            job.status = IngestJobStatus.COMPLETED
+    except Exception as e:
+        logger.exception("Batch ingest job %s failed", job.id)
+        job.errors.append(str(e))
+        job.status = IngestJobStatus.FAILED
+    finally:
+        for path, _ in uploads:
+            os.remove(path)
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        await finish_ingest_job(job)
+
+async def ingest_worker():
+    """Run queued ingest jobs one at a time"""
+    while True:
+        run_job, args = await ingest_queue.get()
+        try:
+            await run_job(*args)
+        finally:
+            ingest_queue.task_done()
+
+# Aggregation pipelines
+def top_performers_ranking_stages() -> List[Dict[str, Any]]:
+    """Score agents from total_tickets and SLA met counts and keep the top five"""
+    return [
+        {
+            "$project": {
+                "agent_name": "$_id",
+                "total_tickets": 1,
+                "response_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$response_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                },
+                "resolution_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$resolution_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                }
+            }
+        },
+        {
+            "$addFields": {
+                # Performance Score: (Resolution SLA * 0.6) + (Response SLA * 0.4) + (Ticket Volume Bonus)
+                # Minimum 5 tickets to qualify, bonus points for higher volume
+                "performance_score": {
+                    "$cond": {
+                        "if": {"$gte": ["$total_tickets", 5]},
+                        "then": {
+                            "$add": [
+                                # SLA Score (60% resolution + 40% response)
+                                {
+                                    "$add": [
+                                        {"$multiply": ["$resolution_sla_percentage", 0.6]},
+                                        {"$multiply": ["$response_sla_percentage", 0.4]}
+                                    ]
+                                },
+                                # Volume bonus: 1 point per ticket above 5, capped at 20 bonus points
+                                {
+                                    "$min": [
+                                        {"$subtract": ["$total_tickets", 5]},
+                                        20
+                                    ]
+                                }
+                            ]
+                        },
+                        "else": 0
                     }
                 }
-            },
-            {
-                "$group": {
-                    "_id": "$team",
-                    "total_tickets": {"$sum": 1},
-                    "response_sla_met": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$response_sla_status", "Met"]}, 1, 0]
-                        }
-                    },
-                    "resolution_sla_met": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$resolution_sla_status", "Met"]}, 1, 0]
-                        }
-                    },
-                    "response_sla_breached": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$response_sla_status", "Breached"]}, 1, 0]
-                        }
-                    },
-                    "resolution_sla_breached": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$resolution_sla_status", "Breached"]}, 1, 0]
-                        }
-                    },
-                    "response_times": {"$push": "$response_time_hours"},
-                    "resolution_times": {"$push": "$resolution_time_hours"}
+            }
+        },
+        {"$match": {"performance_score": {"$gt": 0}}},  # Only include agents with 5+ tickets
+        {"$sort": {"performance_score": -1, "total_tickets": -1}},  # Primary: score, Tiebreaker: ticket volume
+        {"$limit": 5}
+    ]
+
+
+def team_sort_stages() -> List[Dict[str, Any]]:
+    """Sort teams as L1, L2, Business Team, then others by resolution SLA"""
+    return [
+        # Sort by team priority: L1, L2, Business Team, Others
+        {
+            "$addFields": {
+                "sort_priority": {
+                    "$switch": {
+                        "branches": [
+                            {"case": {"$eq": ["$team_name", "L1"]}, "then": 1},
+                            {"case": {"$eq": ["$team_name", "L2"]}, "then": 2},
+                            {"case": {"$eq": ["$team_name", "Business Team"]}, "then": 3}
+                        ],
+                        "default": 4
+                    }
                 }
-            },
-            {
-                "$project": {
-                    "team_name": "$_id",
-                    "total_tickets": 1,
-                    "response_sla_met": 1,
-                    "resolution_sla_met": 1,
-                    "response_sla_breached": 1,
-                    "resolution_sla_breached": 1,
-                    "response_sla_percentage": {
-                        "$multiply": [
-                            {"$divide": ["$response_sla_met", "$total_tickets"]},
-                            100
-                        ]
-                    },
-                    "resolution_sla_percentage": {
-                        "$multiply": [
-                            {"$divide": ["$resolution_sla_met", "$total_tickets"]},
-                            100
-                        ]
-                    },
-                    # Calculate averages by filtering out null values
-                    "avg_response_time": {
-                        "$cond": {
-                            "if": {"$gt": [{"$size": {"$filter": {"input": "$response_times", "cond": {"$ne": ["$$this", None]}}}}, 0]},
-                            "then": {
-                                "$avg": {
-                                    "$filter": {
-                                        "input": "$response_times",
-                                        "cond": {"$ne": ["$$this", None]}
-                                    }
-                                }
-                            },
-                            "else": 0
+            }
+        },
+        {"$sort": {"sort_priority": 1, "resolution_sla_percentage": -1}}
+    ]
+
+def _has_time(field: str) -> Dict[str, Any]:
+    """Aggregation test for a time value that is set and non-zero"""
+    return {"$ne": [{"$ifNull": [field, 0]}, 0]}
+
+def agent_performance_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Group the matching tickets by resolved_by into per-agent SLA counts and time sums"""
+    return [
+        {"$match": match},
+        {
+            "$project": {
+                "_id": 0,
+                "resolved_by": 1,
+                "response_sla_status": 1,
+                "resolution_sla_status": 1,
+                "response_time_hours": 1,
+                "resolution_time_hours": 1
+            }
+        },
+        {
+            "$group": {
+                "_id": "$resolved_by",
+                "total_tickets": {"$sum": 1},
+                "response_sla_met": {
+                    "$sum": {"$cond": [{"$eq": ["$response_sla_status", SLA_STATUS_CODES["Met"]]}, 1, 0]}
+                },
+                "response_sla_breached": {
+                    "$sum": {"$cond": [{"$eq": ["$response_sla_status", SLA_STATUS_CODES["Breached"]]}, 1, 0]}
+                },
+                "resolution_sla_met": {
+                    "$sum": {"$cond": [{"$eq": ["$resolution_sla_status", SLA_STATUS_CODES["Met"]]}, 1, 0]}
+                },
+                "resolution_sla_breached": {
+                    "$sum": {"$cond": [{"$eq": ["$resolution_sla_status", SLA_STATUS_CODES["Breached"]]}, 1, 0]}
+                },
+                # Averages only count tickets with a non-zero time
+                "response_time_sum": {
+                    "$sum": {"$cond": [_has_time("$response_time_hours"), "$response_time_hours", 0]}
+                },
+                "response_time_count": {
+                    "$sum": {"$cond": [_has_time("$response_time_hours"), 1, 0]}
+                },
+                "resolution_time_sum": {
+                    "$sum": {"$cond": [_has_time("$resolution_time_hours"), "$resolution_time_hours", 0]}
+                },
+                "resolution_time_count": {
+                    "$sum": {"$cond": [_has_time("$resolution_time_hours"), 1, 0]}
+                }
+            }
+        }
+    ]
+
+def format_agent_performance(agent_name: str, group: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the agent performance response from an agent_performance_pipeline group"""
+    group = group or {}
+    total_tickets = group.get("total_tickets", 0)
+    response_sla_met = group.get("response_sla_met", 0)
+    resolution_sla_met = group.get("resolution_sla_met", 0)
+    response_time_count = group.get("response_time_count", 0)
+    resolution_time_count = group.get("resolution_time_count", 0)
+    
+    # Calculate averages
+    avg_response_time = group["response_time_sum"] / response_time_count if response_time_count else 0
+    avg_resolution_time = group["resolution_time_sum"] / resolution_time_count if resolution_time_count else 0
+    
+    return {
+        "agent_name": agent_name,
+        "total_tickets": total_tickets,
+        "response_sla_met": response_sla_met,
+        "response_sla_breached": group.get("response_sla_breached", 0),
+        "resolution_sla_met": resolution_sla_met,
+        "resolution_sla_breached": group.get("resolution_sla_breached", 0),
+        "response_sla_percentage": round((response_sla_met / total_tickets * 100), 2) if total_tickets > 0 else 0,
+        "resolution_sla_percentage": round((resolution_sla_met / total_tickets * 100), 2) if total_tickets > 0 else 0,
+        "avg_response_time": round(avg_response_time, 2),
+        "avg_resolution_time": round(avg_resolution_time, 2)
+    }
+
+def dashboard_rollup_pipeline(match: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Compute totals, pending-by-team and top performers from sla_rollups in one $facet pass"""
+    return ([{"$match": match}] if match else []) + [
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_tickets": {"$sum": "$tickets"},
+                            "tickets_closed": {"$sum": "$resolved"},
+                            "response_sla_met": {"$sum": "$response_sla_met"},
+                            "resolution_sla_met": {"$sum": "$resolution_sla_met"},
+                            "sla_breaches": {"$sum": "$sla_breached"}
                         }
-                    },
-                    "avg_resolution_time": {
-                        "$cond": {
-                            "if": {"$gt": [{"$size": {"$filter": {"input": "$resolution_times", "cond": {"$ne": ["$$this", None]}}}}, 0]},
-                            "then": {
-                                "$avg": {
-                                    "$filter": {
-                                        "input": "$resolution_times", 
-                                        "cond": {"$ne": ["$$this", None]}
-                                    }
-                                }
-                            },
-                            "else": 0
+                    }
+                ],
+                "pending_by_team": [
+                    {
+                        "$group": {
+                            "_id": "$team",
+                            "pending_count": {"$sum": {"$subtract": ["$tickets", "$resolved"]}}
                         }
                     }
-                }
-            },
-            # Sort by team priority: L1, L2, Business Team, Others
-            {
-                "$addFields": {
-                    "sort_priority": {
-                        "$switch": {
-                            "branches": [
-                                {"case": {"$eq": ["$team_name", "L1"]}, "then": 1},
-                                {"case": {"$eq": ["$team_name", "L2"]}, "then": 2},
-                                {"case": {"$eq": ["$team_name", "Business Team"]}, "then": 3}
-                            ],
-                            "default": 4
+                ],
+                "top_performers": [
+                    {"$match": {"agent": {"$nin": [None, ""]}}},
+                    {
+                        "$group": {
+                            "_id": "$agent",
+                            "total_tickets": {"$sum": "$tickets"},
+                            "response_sla_met": {"$sum": "$response_sla_met"},
+                            "resolution_sla_met": {"$sum": "$resolution_sla_met"}
                         }
                     }
+                ] + top_performers_ranking_stages()
+            }
+        }
+    ]
+
+def team_rollup_pipeline(match: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Aggregate SLA metrics per team (L1, L2, Business Team, others) from sla_rollups"""
+    return ([{"$match": match}] if match else []) + [
+        {
+            "$group": {
+                "_id": "$team",
+                "total_tickets": {"$sum": "$tickets"},
+                "response_sla_met": {"$sum": "$response_sla_met"},
+                "resolution_sla_met": {"$sum": "$resolution_sla_met"},
+                "response_sla_breached": {"$sum": "$response_sla_breached"},
+                "resolution_sla_breached": {"$sum": "$resolution_sla_breached"},
+                "response_time_sum": {"$sum": "$response_time_sum"},
+                "response_time_count": {"$sum": "$response_time_count"},
+                "resolution_time_sum": {"$sum": "$resolution_time_sum"},
+                "resolution_time_count": {"$sum": "$resolution_time_count"}
+            }
+        },
+        {
+            "$project": {
+                "team_name": "$_id",
+                "total_tickets": 1,
+                "response_sla_met": 1,
+                "resolution_sla_met": 1,
+                "response_sla_breached": 1,
+                "resolution_sla_breached": 1,
+                "response_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$response_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                },
+                "resolution_sla_percentage": {
+                    "$multiply": [
+                        {"$divide": ["$resolution_sla_met", "$total_tickets"]},
+                        100
+                    ]
+                },
+                # Averages over tickets with a recorded time
+                "avg_response_time": {
+                    "$cond": {
+                        "if": {"$gt": ["$response_time_count", 0]},
+                        "then": {"$divide": ["$response_time_sum", "$response_time_count"]},
+                        "else": 0
+                    }
+                },
+                "avg_resolution_time": {
+                    "$cond": {
+                        "if": {"$gt": ["$resolution_time_count", 0]},
+                        "then": {"$divide": ["$resolution_time_sum", "$resolution_time_count"]},
+                        "else": 0
+                    }
+                }
+            }
+        }
+    ] + team_sort_stages()
+
+def time_distribution_pipeline(match: Optional[Dict[str, Any]] = None, group_by: TimeGrouping = TimeGrouping.OVERALL) -> List[Dict[str, Any]]:
+    """Merge the rollups' time sketches (and sums, for the mean) per agent, team or overall"""
+    group = None if group_by == TimeGrouping.OVERALL else f"${group_by.value}"
+    facets = {
+        "totals": [
+            {
+                "$group": {
+                    "_id": group,
+                    "response_time_sum": {"$sum": "$response_time_sum"},
+                    "response_time_count": {"$sum": "$response_time_count"},
+                    "resolution_time_sum": {"$sum": "$resolution_time_sum"},
+                    "resolution_time_count": {"$sum": "$resolution_time_count"}
                 }
-            },
-            {"$sort": {"sort_priority": 1, "resolution_sla_percentage": -1}}
+            }
+        ]
+    }
+    for field in SKETCH_FIELDS.values():
+        # Sum each bucket's count across the group's rollups
+        facets[field] = [
+            {"$project": {"group": group or {"$literal": None}, "bucket": {"$objectToArray": {"$ifNull": [f"${field}", {}]}}}},
+            {"$unwind": "$bucket"},
+            {"$group": {"_id": {"group": "$group", "key": "$bucket.k"}, "count": {"$sum": "$bucket.v"}}},
+            {"$group": {"_id": "$_id.group", "buckets": {"$push": {"k": "$_id.key", "v": "$count"}}}}
+        ]
+    return ([{"$match": match}] if match else []) + [{"$facet": facets}]
+
+# Indexes and query plans
+# Lower bound of every deadline range, so queries match the partial deadline index
+SLA_DEADLINE_FLOOR = datetime(1900, 1, 1)
+SR_NUMBER_INDEX = IndexModel([("sr_number", ASCENDING)], unique=True, name="sr_number_unique")
+AGENT_NAME_INDEX = IndexModel([("name", ASCENDING)], unique=True, name="agent_name_unique")
+
+TICKET_INDEXES = [
+    SR_NUMBER_INDEX,
+    IndexModel([("resolved_by", ASCENDING), ("updated_resolved_by_team", ASCENDING)], name="resolved_by_team"),
+    IndexModel([("status", ASCENDING), ("updated_team", ASCENDING)], name="status_updated_team"),
+    IndexModel([("updated_team", ASCENDING)], name="updated_team"),
+    # /api/tickets filters on one of these fields and pages by _id, so each
+    # index ends in _id to serve the keyset range without an in-memory sort
+    IndexModel([("resolved_by", ASCENDING), ("_id", ASCENDING)], name="resolved_by_id"),
+    IndexModel([("updated_resolved_by_team", ASCENDING), ("_id", ASCENDING)], name="updated_resolved_by_team_id"),
+    IndexModel([("response_sla_status", ASCENDING), ("_id", ASCENDING)], name="response_sla_status_id"),
+    IndexModel([("resolution_sla_status", ASCENDING), ("_id", ASCENDING)], name="resolution_sla_status_id"),
+    # from/to windows select tickets by created day; closed-today counts use resolved_date
+    IndexModel([("created", ASCENDING)], name="created"),
+    IndexModel([("resolved_by", ASCENDING), ("created", ASCENDING)], name="resolved_by_created"),
+    IndexModel([("resolved_date", ASCENDING)], name="resolved_date"),
+    # Only open tickets have a deadline, so the risk scheduler's ranges stay small
+    IndexModel(
+        [("sla_deadline", ASCENDING)],
+        name="sla_deadline_open",
+        partialFilterExpression={"sla_deadline": {"$gte": SLA_DEADLINE_FLOOR}}
+    ),
+    IndexModel([("sla_risk", ASCENDING), ("sla_deadline", ASCENDING)], name="sla_risk_deadline"),
+]
+
+AGENT_INDEXES = [
+    AGENT_NAME_INDEX,
+]
+
+ROLLUP_INDEXES = [
+    IndexModel([("agent", ASCENDING), ("team", ASCENDING), ("day", ASCENDING)], unique=True, name="agent_team_day"),
+    IndexModel([("day", ASCENDING)], name="day"),
+]
+
+async def ensure_indexes():
+    """Create the indexes the API queries rely on, logging any that can't be built"""
+    for collection, indexes in (
+        (db.tickets, TICKET_INDEXES),
+        (db.agents, AGENT_INDEXES),
+        (db.sla_rollups, ROLLUP_INDEXES),
+        (db.ticket_dictionary, DICTIONARY_INDEXES),
+    ):
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                # e.g. a unique index over data that already holds duplicates
+                logger.warning("Could not create index %s on %s: %s", index.document["name"], collection.name, e)
+
+def query_plan_catalog(sample_agent: str = "", sample_team: str = "L1") -> List[Dict[str, Any]]:
+    """List the queries and pipelines each endpoint runs, for explain() checks
+    
+    Queries that scan every ticket by design are marked allow_collscan.
+    """
+    breached = SLA_STATUS_CODES[SLAStatus.BREACHED.value]
+    sla_filter = {"$or": [{"response_sla_status": breached}, {"resolution_sla_status": breached}]}
+    week = DateWindow(date_type.today() - timedelta(days=6), date_type.today())
+    return [
+        {"name": "dashboard.summary", "collection": "sla_rollups", "aggregate": dashboard_rollup_pipeline(), "allow_collscan": True},
+        {"name": "dashboard.window", "collection": "sla_rollups", "aggregate": dashboard_rollup_pipeline(week.rollup_filter())},
+        {"name": "dashboard.closed_today", "collection": "tickets", "find": closed_today_filter(DateWindow())},
+        {"name": "agents.list", "collection": "agents", "find": {}, "allow_collscan": True},
+        {"name": "agents.by_name", "collection": "agents", "find": {"name": sample_agent}},
+        {"name": "agent_performance", "collection": "tickets", "aggregate": agent_performance_pipeline({"resolved_by": sample_agent})},
+        {"name": "agent_performance.all", "collection": "tickets", "aggregate": agent_performance_pipeline({"resolved_by": {"$nin": [None, ""]}})},
+        {"name": "agent_performance.window", "collection": "tickets", "aggregate": agent_performance_pipeline({"resolved_by": sample_agent, **week.ticket_filter()})},
+        {"name": "team_performance", "collection": "sla_rollups", "aggregate": team_rollup_pipeline(), "allow_collscan": True},
+        {"name": "team_performance.window", "collection": "sla_rollups", "aggregate": team_rollup_pipeline(week.rollup_filter())},
+        {"name": "time_distribution", "collection": "sla_rollups", "aggregate": time_distribution_pipeline(group_by=TimeGrouping.TEAM), "allow_collscan": True},
+        {"name": "time_distribution.window", "collection": "sla_rollups", "aggregate": time_distribution_pipeline(week.rollup_filter(), TimeGrouping.TEAM)},
+        {"name": "tickets.page", "collection": "tickets", "find": {}, "sort": TICKET_PAGE_SORT, "allow_collscan": True},
+        {"name": "tickets.by_agent", "collection": "tickets", "find": {"resolved_by": sample_agent}, "sort": TICKET_PAGE_SORT},
+        {"name": "tickets.by_team", "collection": "tickets", "find": {"updated_resolved_by_team": sample_team}, "sort": TICKET_PAGE_SORT},
+        {"name": "tickets.by_sla_status", "collection": "tickets", "find": sla_filter, "sort": TICKET_PAGE_SORT},
+        {"name": "tickets.by_created_window", "collection": "tickets", "find": week.ticket_filter(), "sort": TICKET_PAGE_SORT},
+        {"name": "sla_risk.tick", "collection": "tickets", "find": {"sla_deadline": sla_deadline_range(datetime.now() - timedelta(minutes=1), datetime.now())}},
+        {"name": "at_risk.list", "collection": "tickets", "find": {"sla_risk": {"$in": [SLA_STATUS_CODES[SLAStatus.AT_RISK.value]]}}, "sort": [("sla_deadline", ASCENDING)]},
+        {"name": "test_pending.by_team", "collection": "tickets", "find": {"updated_team": sample_team}},
+    ]
+
+def plan_stages(explain_output: Any, in_winning_plan: bool = False) -> List[str]:
+    """Collect every stage name from the winning plans in an explain() result"""
+    stages = []
+    if isinstance(explain_output, dict):
+        if in_winning_plan and isinstance(explain_output.get("stage"), str):
+            stages.append(explain_output["stage"])
+        for key, value in explain_output.items():
+            # Rejected plans never run, so only walk the winning ones
+            if key == "rejectedPlans":
+                continue
+            stages.extend(plan_stages(value, in_winning_plan or key == "winningPlan"))
+    elif isinstance(explain_output, list):
+        for value in explain_output:
+            stages.extend(plan_stages(value, in_winning_plan))
+    return stages
+
+def execution_totals(explain_output: Any) -> Optional[Dict[str, Any]]:
+    """Find the first executionStats block in an explain() result"""
+    if isinstance(explain_output, dict):
+        if isinstance(explain_output.get("executionStats"), dict):
+            return explain_output["executionStats"]
+        values = explain_output.values()
+    elif isinstance(explain_output, list):
+        values = explain_output
+    else:
+        return None
+    for value in values:
+        totals = execution_totals(value)
+        if totals is not None:
+            return totals
+    return None
+
+async def explain_query(query: Dict[str, Any], execution_stats: bool = False) -> Dict[str, Any]:
+    """Run explain() for one catalog entry and flag collection scans
+    
+    With execution_stats the query is run, and the documents it examined and
+    returned are reported and exported as metrics.
+    """
+    if "aggregate" in query:
+        command = {"aggregate": query["collection"], "pipeline": query["aggregate"], "cursor": {}}
+    else:
+        command = {"find": query["collection"], "filter": query["find"]}
+        if "sort" in query:
+            command["sort"] = dict(query["sort"])
+    
+    verbosity = "executionStats" if execution_stats else "queryPlanner"
+    explain_output = await db.command({"explain": command, "verbosity": verbosity})
+    stages = plan_stages(explain_output)
+    collscan = "COLLSCAN" in stages
+    allowed = query.get("allow_collscan", False)
+    plan = {
+        "name": query["name"],
+        "collection": query["collection"],
+        "stages": sorted(set(stages)),
+        "collscan": collscan,
+        "allow_collscan": allowed,
+        "flagged": collscan and not allowed,
+    }
+    
+    totals = execution_totals(explain_output) if execution_stats else None
+    if totals is not None:
+        plan["docs_examined"] = totals.get("totalDocsExamined", 0)
+        plan["keys_examined"] = totals.get("totalKeysExamined", 0)
+        plan["n_returned"] = totals.get("nReturned", 0)
+        metrics.set("sla_query_documents_examined", plan["docs_examined"], query=query["name"])
+        metrics.set("sla_query_keys_examined", plan["keys_examined"], query=query["name"])
+        metrics.set("sla_query_documents_returned", plan["n_returned"], query=query["name"])
+    return plan
+
+async def check_query_plans(execution_stats: bool = False) -> List[Dict[str, Any]]:
+    """Explain every catalog query against current data, logging unexpected COLLSCANs"""
+    sample_ticket = await db.tickets.find_one({"resolved_by": {"$nin": [None, ""]}}, {"resolved_by": 1, "updated_resolved_by_team": 1})
+    sample_ticket = sample_ticket or {}
+    catalog = query_plan_catalog(
+        sample_agent=sample_ticket.get("resolved_by") or "",
+        sample_team=sample_ticket.get("updated_resolved_by_team") or "L1"
+    )
+    
+    plans = []
+    for query in catalog:
+        plan = await explain_query(query, execution_stats)
+        if plan["flagged"]:
+            logger.warning("Query %s does a COLLSCAN on %s", plan["name"], plan["collection"])
+        plans.append(plan)
+    return plans
+
+STORAGE_COLLECTIONS = ["tickets", "sla_rollups", "agents", "ticket_dictionary"]
+
+async def collection_storage(name: str) -> Dict[str, Any]:
+    """Document count, average document size and data/index sizes of a collection, in bytes"""
+    stats = await db.command("collStats", name)
+    return {
+        "collection": name,
+        "documents": stats.get("count", 0),
+        "avg_document_bytes": stats.get("avgObjSize", 0),
+        "data_bytes": stats.get("size", 0),
+        "storage_bytes": stats.get("storageSize", 0),
+        "index_bytes": stats.get("totalIndexSize", 0),
+        "index_sizes": stats.get("indexSizes", {}),
+    }
+
+# Date windows
+class DateWindow:
+    """The inclusive range of created days chosen by an endpoint's from/to parameters
+    
+    Ticket queries use a created range, which the created indexes serve;
+    rollup queries use the same days, which is how rollups are keyed.
+    """
+    
+    def __init__(self, start: Optional[date_type] = None, end: Optional[date_type] = None):
+        if start and end and start > end:
+            raise HTTPException(status_code=400, detail="from must be on or before to")
+        self.start = start
+        self.end = end
+    
+    def ticket_filter(self, field: str = "created") -> Dict[str, Any]:
+        bounds = {}
+        if self.start:
+            bounds["$gte"] = datetime.combine(self.start, time.min)
+        if self.end:
+            bounds["$lt"] = datetime.combine(self.end + timedelta(days=1), time.min)
+        return {field: bounds} if bounds else {}
+    
+    def rollup_filter(self) -> Dict[str, Any]:
+        bounds = {}
+        if self.start:
+            bounds["$gte"] = self.start.isoformat()
+        if self.end:
+            bounds["$lte"] = self.end.isoformat()
+        return {"day": bounds} if bounds else {}
+
+def closed_today_filter(window: DateWindow) -> Dict[str, Any]:
+    """Tickets in the window whose resolved_date falls on today's date"""
+    return {**DateWindow(date_type.today(), date_type.today()).ticket_filter("resolved_date"), **window.ticket_filter()}
+
+async def migrate_ticket_dates(batch_size: int = 10000) -> int:
+    """Convert ticket dates stored as strings by earlier versions into datetimes"""
+    fields = list(TICKET_DATE_COLUMNS)
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    converted = 0
+    batch = []
+    
+    async def flush():
+        frame = pd.DataFrame(batch, columns=['_id'] + fields)
+        parsed = {field: datetime_series(frame[field]).tolist() for field in fields}
+        operations = [
+            UpdateOne({"_id": ticket_id}, {"$set": {field: parsed[field][index] for field in fields}})
+            for index, ticket_id in enumerate(frame['_id'])
+        ]
+        await db.tickets.bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    async for ticket in db.tickets.find(query, {field: 1 for field in fields}).batch_size(batch_size):
+        batch.append(ticket)
+        if len(batch) >= batch_size:
+            converted += await flush()
+            batch = []
+    if batch:
+        converted += await flush()
+    return converted
+
+# Live SLA risk
+CLOSED_TICKET_STATUSES = [TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value]
+
+def sla_deadline_series(frame: pd.DataFrame) -> pd.Series:
+    """Deadline (created + life cycle target) of each open ticket; None once closed or without a target"""
+    created = pd.to_datetime(frame['created'], errors='coerce', format='mixed')
+    target = pd.to_numeric(frame['life_cycle_target_hrs'], errors='coerce')
+    # Targets beyond a century are data errors and would overflow the timedelta
+    target = target.where(target.abs() < 1e6)
+    deadline = created + pd.to_timedelta(target, unit='h')
+    deadline = deadline.where(~frame['status'].isin(CLOSED_TICKET_STATUSES))
+    return datetime_objects(deadline)
+
+def sla_risk_series(deadlines: pd.Series, now: datetime) -> pd.Series:
+    """At Risk for deadlines within SLA_RISK_WINDOW_HOURS of now, Breached once passed, else None"""
+    deadline = pd.to_datetime(deadlines, errors='coerce')
+    risk = np.full(len(deadline), None, dtype=object)
+    risk[(deadline <= now + timedelta(hours=SLA_RISK_WINDOW_HOURS)).to_numpy()] = SLAStatus.AT_RISK.value
+    risk[(deadline <= now).to_numpy()] = SLAStatus.BREACHED.value
+    return pd.Series(risk, index=deadlines.index, dtype=object)
+
+def sla_deadline_range(after: Optional[datetime], until: datetime) -> Dict[str, Any]:
+    """Deadlines in (after, until], bounded below so the partial deadline index applies"""
+    if after is None or after < SLA_DEADLINE_FLOOR:
+        return {"$gte": SLA_DEADLINE_FLOOR, "$lte": until}
+    return {"$gt": after, "$lte": until}
+
+async def backfill_sla_deadlines(batch_size: int = 10000) -> int:
+    """Store deadlines and risk for tickets written before either existed"""
+    fields = ['created', 'life_cycle_target_hrs', 'status']
+    now = datetime.now()
+    updated = 0
+    batch = []
+    
+    async def flush():
+        frame = pd.DataFrame(batch, columns=['_id'] + fields)
+        frame['status'] = frame['status'].map(lambda value: enum_value('status', value))
+        deadlines = sla_deadline_series(frame)
+        risks = sla_risk_series(deadlines, now)
+        # Closed tickets have no deadline, and missing fields aren't stored
+        operations = [
+            UpdateOne({"_id": ticket_id}, {"$set": stored_ticket({"sla_deadline": deadline, "sla_risk": risk})})
+            for ticket_id, deadline, risk in zip(frame['_id'], deadlines, risks)
+            if deadline is not None
+        ]
+        if operations:
+            await db.tickets.bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    async for ticket in db.tickets.find({"sla_deadline": {"$exists": False}}, {field: 1 for field in fields}).batch_size(batch_size):
+        batch.append(ticket)
+        if len(batch) >= batch_size:
+            updated += await flush()
+            batch = []
+    if batch:
+        updated += await flush()
+    return updated
+
+async def flag_sla_risk(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Flag open tickets whose deadline entered the risk window or passed since the last tick
+    
+    Each tick claims the interval since the previous one (across workers too)
+    and only touches deadlines inside it, so its cost follows the number of
+    tickets crossing a threshold rather than the size of the collection.
+    Tickets are flagged at ingest for deadlines that were already close.
+    """
+    now = now or datetime.now()
+    window = timedelta(hours=SLA_RISK_WINDOW_HOURS)
+    previous = await db.scheduler_meta.find_one_and_update(
+        {"_id": "sla_risk"}, {"$set": {"last_tick": now}}, upsert=True
+    )
+    if previous is None:
+        # First tick ever: give existing tickets deadlines, then sweep every deadline so far
+        await backfill_sla_deadlines()
+    last_tick = previous.get("last_tick") if previous else None
+    if last_tick is not None and last_tick >= now:
+        return {"at_risk": 0, "breached": 0}
+    
+    # Deadlines already passed are left to the breach update, even after a long gap between ticks
+    at_risk_after = max(last_tick + window, now) if last_tick else now
+    at_risk = await db.tickets.update_many(
+        {"sla_deadline": sla_deadline_range(at_risk_after, now + window)},
+        {"$set": {"sla_risk": stored_code('sla_risk', SLAStatus.AT_RISK.value)}}
+    )
+    breached = await db.tickets.update_many(
+        {"sla_deadline": sla_deadline_range(last_tick, now)},
+        {"$set": {"sla_risk": stored_code('sla_risk', SLAStatus.BREACHED.value)}}
+    )
+    # No cached endpoint reads sla_risk (/api/at-risk is uncached), so the response cache is left alone
+    return {"at_risk": at_risk.modified_count, "breached": breached.modified_count}
+
+async def sla_risk_scheduler():
+    """Run flag_sla_risk every SLA_RISK_INTERVAL seconds"""
+    while True:
+        try:
+            await flag_sla_risk()
+        except Exception:
+            logger.exception("SLA risk tick failed")
+        await asyncio.sleep(SLA_RISK_INTERVAL)
+
+sla_risk_task: Optional[asyncio.Task] = None
+
+# Ticket paging and export
+AGENT_RESPONSE_FIELDS = list(Agent.model_fields)
+TICKET_RESPONSE_FIELDS = list(Ticket.model_fields)
+TICKET_PAGE_SORT = [("_id", ASCENDING)]
+
+def ticket_filter(
+    agent_name: Optional[str],
+    team: Optional[str],
+    sla_status: Optional[str],
+    window: Optional["DateWindow"] = None
+) -> Dict[str, Any]:
+    """Build the tickets query shared by listing and export"""
+    filter_query = window.ticket_filter() if window else {}
+    if agent_name:
+        filter_query["resolved_by"] = agent_name
+    if team:
+        filter_query["updated_resolved_by_team"] = team
+    if sla_status:
+        filter_query["$or"] = [
+            {"response_sla_status": stored_code("response_sla_status", sla_status)},
+            {"resolution_sla_status": stored_code("resolution_sla_status", sla_status)}
+        ]
+    return filter_query
+
+def decode_ticket_cursor(cursor: str) -> ObjectId:
+    """Turn a next_cursor value back into the _id to resume after"""
+    try:
+        return ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+def ticket_fields(fields: Optional[List[str]]) -> List[str]:
+    """Validate the requested Ticket field names, defaulting to all of them"""
+    if not fields:
+        return TICKET_RESPONSE_FIELDS
+    names = [name.strip() for value in fields for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in Ticket.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown ticket fields: {', '.join(unknown)}")
+    return names
+
+async def count_tickets(filter_query: Dict[str, Any], mode: TicketCountMode) -> Optional[int]:
+    """Count matching tickets exactly, from collection metadata, or not at all"""
+    if mode == TicketCountMode.NONE:
+        return None
+    if mode == TicketCountMode.ESTIMATED and not filter_query:
+        return await db.tickets.estimated_document_count()
+    # Metadata only knows the collection size, so filtered estimates stay exact
+    return await db.tickets.count_documents(filter_query)
+
+def export_value(value: Any) -> Any:
+    """Flatten a stored ticket value for CSV and Parquet columns"""
+    if value is None or isinstance(value, (str, float, int)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def iter_ticket_batches(filter_query: Dict[str, Any], columns: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Walk the matching tickets in _id order, yielding lists of EXPORT_BATCH_SIZE rows"""
+    cursor = db.tickets.find(filter_query, ticket_projection(columns), comment="tickets.export").sort(TICKET_PAGE_SORT).batch_size(EXPORT_BATCH_SIZE)
+    batch = []
+    async for ticket in cursor:
+        batch.append(ticket)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield await ticket_dictionary.decode(batch)
+            batch = []
+    if batch:
+        yield await ticket_dictionary.decode(batch)
+
+async def ndjson_chunks(batches, columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode ticket batches as newline-delimited JSON, one /api/tickets row per line"""
+    async for batch in batches:
+        yield b"".join(orjson.dumps(row, option=orjson.OPT_UTC_Z) + b"\n" for row in response_rows(batch, columns))
+
+async def csv_chunks(batches, columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode ticket batches as CSV after a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    async for batch in batches:
+        writer.writerows({name: export_value(ticket.get(name)) for name in columns} for ticket in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def parquet_schema(columns: List[str]):
+    """Arrow schema for the exported Ticket columns"""
+    return pa.schema([
+        (name, pa.float64() if Ticket.model_fields[name].annotation == Optional[float] else pa.string())
+        for name in columns
+    ])
+
+async def parquet_chunks(batches, columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode ticket batches as a Parquet file, one row group per batch"""
+    schema = parquet_schema(columns)
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # Every batch becomes one row group, flushed to the client as it is written
+        async for batch in batches:
+            table = pa.Table.from_pydict({
+                name: [export_value(ticket.get(name)) for ticket in batch]
+                for name in columns
+            }, schema=schema)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+EXPORT_MEDIA_TYPES = {
+    TicketExportFormat.NDJSON: "application/x-ndjson",
+    TicketExportFormat.CSV: "text/csv",
+    TicketExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+# Response cache
+class MemoryCacheBackend:
+    """Per-process LRU cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+    
+    async def ensure_indexes(self):
+        pass
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Dict[str, Any]):
+        self.entries[key] = (monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    async def clear(self):
+        self.entries.clear()
+
+class MongoCacheBackend:
+    """Cache shared by every worker, stored in MongoDB with a TTL index"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+    
+    async def ensure_indexes(self):
+        await db.response_cache.create_index("expires_at", expireAfterSeconds=0, name="expires_at_ttl")
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = await db.response_cache.find_one({"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}})
+        if entry is None:
+            return None
+        return {"etag": entry["etag"], "body": entry["body"]}
+    
+    async def set(self, key: str, value: Dict[str, Any]):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        await db.response_cache.replace_one({"_id": key}, {**value, "expires_at": expires_at}, upsert=True)
+    
+    async def clear(self):
+        await db.response_cache.delete_many({})
+
+class ResponseCache:
+    """Caches read endpoint responses per dataset version
+    
+    Any change to tickets or agents bumps the version, so earlier entries are
+    never served again. With a shared backend the version lives in MongoDB so
+    every worker sees the bump.
+    """
+    
+    def __init__(self, backend, shared: bool):
+        self.backend = backend
+        self.shared = shared
+        self.local_version = 0
+    
+    async def version(self) -> int:
+        if not self.shared:
+            return self.local_version
+        meta = await db.cache_meta.find_one({"_id": "dataset_version"})
+        return meta["version"] if meta else 0
+    
+    async def bump(self):
+        self.local_version += 1
+        if self.shared:
+            await db.cache_meta.update_one({"_id": "dataset_version"}, {"$inc": {"version": 1}}, upsert=True)
+        await self.backend.clear()
+        dashboard_feed.mark_changed()
+
+if RESPONSE_CACHE_BACKEND == 'mongo':
+    response_cache = ResponseCache(MongoCacheBackend(RESPONSE_CACHE_TTL), shared=True)
+else:
+    response_cache = ResponseCache(MemoryCacheBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL), shared=False)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def cached_response(request: Request, compute: Callable[[], Awaitable[Any]]) -> Response:
+    """Serve a read endpoint from the response cache, answering 304 when the ETag still matches"""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = f"{await response_cache.version()}:{request.url.path}?{query}"
+    
+    entry = await response_cache.backend.get(key) if RESPONSE_CACHE_TTL > 0 else None
+    cache_status = "hit"
+    if entry is None:
+        cache_status = "miss"
+        body = FastJSONResponse(content=await compute()).body
+        entry = {"etag": f'"{hashlib.sha1(body).hexdigest()}"', "body": body}
+        if RESPONSE_CACHE_TTL > 0:
+            await response_cache.backend.set(key, entry)
+    
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+# Dashboard stream
+def sse_frame(event: str, version: int, payload: Dict[str, Any]) -> bytes:
+    """Render one server-sent event"""
+    data = orjson.dumps(payload, default=jsonable_encoder, option=orjson.OPT_UTC_Z)
+    return b"event: " + event.encode() + b"\nid: " + str(version).encode() + b"\ndata: " + data + b"\n\n"
+
+def dashboard_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Summary fields and teams that differ between two dashboard states, or None if nothing changed"""
+    summary = {key: value for key, value in new["summary"].items() if old["summary"].get(key) != value}
+    changed = [team for name, team in new["teams"].items() if old["teams"].get(name) != team]
+    removed = [name for name in old["teams"] if name not in new["teams"]]
+    if not (summary or changed or removed):
+        return None
+    return {"summary": summary, "teams": {"changed": changed, "removed": removed}}
+
+class DashboardFeed:
+    """Pushes the dashboard summary and team metrics to every connected stream client
+    
+    A single refresher recomputes the metrics after each data change and
+    renders the diff and snapshot frames once; every client is sent the same
+    bytes, so the compute cost does not depend on the number of viewers.
+    A client that falls behind has its backlog replaced by the latest snapshot.
+    """
+    
+    def __init__(self):
+        self.clients: set = set()
+        self.changed = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.version: Optional[int] = None
+        self.day: Optional[date_type] = None
+        self.state: Optional[Dict[str, Any]] = None
+        self.snapshot_frame: Optional[bytes] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def mark_changed(self):
+        self.changed.set()
+    
+    async def refresh(self):
+        """Recompute the metrics if the dataset version moved and send the diff to every client"""
+        async with self.lock:
+            version = await response_cache.version()
+            # Closed-today counts move at midnight even without a data change
+            today = date_type.today()
+            if version == self.version and today == self.day and self.snapshot_frame is not None:
+                return
+            summary = jsonable_encoder(await compute_dashboard_summary())
+            teams = {team["team_name"]: jsonable_encoder(team) for team in await compute_team_performance()}
+            state = {"summary": summary, "teams": teams}
+            diff = dashboard_diff(self.state, state) if self.state is not None else None
+            
+            self.version = version
+            self.day = today
+            self.state = state
+            self.snapshot_frame = sse_frame("snapshot", version, {"version": version, "summary": summary, "teams": list(teams.values())})
+            if diff is not None:
+                self.broadcast(sse_frame("diff", version, {"version": version, **diff}))
+    
+    def broadcast(self, frame: bytes):
+        for client in self.clients:
+            try:
+                client.put_nowait(frame)
+            except asyncio.QueueFull:
+                while not client.empty():
+                    client.get_nowait()
+                client.put_nowait(self.snapshot_frame)
+    
+    async def run(self):
+        """Refresh after every data change while anyone is connected"""
+        # Other workers only bump the shared version, so poll it when the cache is shared;
+        # otherwise wake up once a minute to notice the day rolling over
+        poll = DASHBOARD_STREAM_POLL if response_cache.shared else 60
+        while True:
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=poll)
+            except asyncio.TimeoutError:
+                pass
+            self.changed.clear()
+            if not self.clients:
+                continue
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Dashboard stream refresh failed")
+    
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """Yield the current snapshot, then every diff, with keepalive comments in between"""
+        client = asyncio.Queue(maxsize=DASHBOARD_STREAM_BUFFER)
+        self.clients.add(client)
+        try:
+            yield self.snapshot_frame
+            while True:
+                try:
+                    yield await asyncio.wait_for(client.get(), timeout=DASHBOARD_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self.clients.discard(client)
+
+dashboard_feed = DashboardFeed()
+
+# API Routes
+@api_router.post("/upload-excel", response_model=IngestJob, status_code=202)
+async def upload_excel_file(
+    file: UploadFile = File(...),
+    batch_size: int = Query(INGEST_BATCH_SIZE, ge=1, le=100000),
+    stream: bool = Query(False),
+    mode: IngestMode = Query(IngestMode.APPEND)
+):
+    """Upload an Excel file and queue it for background processing"""
+    if not file.filename.lower().endswith(('.xlsx', '.xls', '.csv')):
+        raise HTTPException(status_code=400, detail="File must be an Excel or CSV file (.xlsx, .xls or .csv)")
+    
+    # Spool to disk so the request can return before the rows are processed
+    spool_path = await spool_upload(file)
+    
+    job = IngestJob(file_name=file.filename, mode=mode)
+    await register_ingest_job(job)
+    await ingest_queue.put((run_ingest_job, (job, spool_path, batch_size, stream)))
+    
+    return job
+
+@api_router.post("/upload-batch", response_model=IngestJob, status_code=202)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    batch_size: int = Query(INGEST_BATCH_SIZE, ge=1, le=100000),
+    mode: IngestMode = Query(IngestMode.APPEND)
+):
+    """Upload several Excel/CSV files or zip archives and ingest every sheet as one background job"""
+    for file in files:
+        if not file.filename.lower().endswith(BATCH_UPLOAD_EXTENSIONS + ('.zip',)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{file.filename}: files must be Excel, CSV or zip archives (.xlsx, .xls, .csv or .zip)"
+            )
+    
+    uploads = [(await spool_upload(file), file.filename) for file in files]
+    
+    job = IngestJob(file_name=", ".join(file.filename for file in files), mode=mode)
+    await register_ingest_job(job)
+    await ingest_queue.put((run_batch_ingest_job, (job, uploads, batch_size)))
+    
+    return job
+
+@api_router.get("/ingest-jobs/{job_id}", response_model=IngestJob)
+async def get_ingest_job(job_id: str):
+    """Get progress for a background ingestion job, from whichever worker is running it"""
+    job = await load_ingest_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    if job.status == IngestJobStatus.RUNNING:
+        update_job_throughput(job)
+    return job
+
+@api_router.get("/dashboard-summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    request: Request,
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Get overall dashboard summary with key metrics"""
+    window = DateWindow(from_date, to_date)
+    return await cached_response(request, lambda: compute_dashboard_summary(window))
+
+@api_router.get("/stream/dashboard")
+async def stream_dashboard():
+    """Server-sent events: a snapshot of the dashboard summary and team metrics, then a diff after each data change"""
+    try:
+        await dashboard_feed.refresh()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing dashboard stream: {str(e)}")
+    return StreamingResponse(
+        dashboard_feed.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def compute_dashboard_summary(window: Optional[DateWindow] = None) -> DashboardSummary:
+    """Compute the dashboard summary from the SLA rollups, for tickets created in the window"""
+    window = window or DateWindow()
+    try:
+        # Compute every summary figure in a single pass over the SLA rollups
+        facets = await db.sla_rollups.aggregate(
+            dashboard_rollup_pipeline(window.rollup_filter()),
+            comment="dashboard.window" if window.rollup_filter() else "dashboard.summary"
+        ).to_list(1)
+        facets = facets[0] if facets else {}
+        totals = facets.get("totals") or [{}]
+        totals = totals[0]
+        
+        # Get tickets by status
+        total_tickets = totals.get("total_tickets", 0)
+        tickets_open = total_tickets - totals.get("tickets_closed", 0)
+        # Only tickets resolved today, read through the resolved_date index
+        tickets_closed_today = await db.tickets.count_documents(closed_today_filter(window), comment="dashboard.closed_today")
+        
+        # Get pending tickets by team (L1, L2, Business Team) - any non-resolved status
+        pending_by_team = {}
+        for result in facets.get("pending_by_team", []):
+            pending_by_team[result["_id"]] = result["pending_count"]
+        
+        # Extract counts for each team (default to 0 if not found)
+        l1_pending = pending_by_team.get("L1", 0)
+        l2_pending = pending_by_team.get("L2", 0)  
+        business_pending = pending_by_team.get("Business Team", 0)
+        
+        # Calculate overall SLA percentages
+        response_sla_met = totals.get("response_sla_met", 0)
+        resolution_sla_met = totals.get("resolution_sla_met", 0)
+        
+        overall_response_sla = (response_sla_met / total_tickets * 100) if total_tickets > 0 else 0
+        overall_resolution_sla = (resolution_sla_met / total_tickets * 100) if total_tickets > 0 else 0
+        
+        # Get SLA breaches today
+        sla_breaches_today = totals.get("sla_breaches", 0)
+        
+        # Get top performers (balanced score: ticket volume + SLA performance)
+        top_performers = []
+        for performer in facets.get("top_performers", []):
+            # Calculate overall SLA (average of response and resolution)
+            overall_sla = (performer["response_sla_percentage"] + performer["resolution_sla_percentage"]) / 2
+            
+            top_performers.append({
+                "agent_name": performer["agent_name"],
+                "total_tickets": performer["total_tickets"],
+                "response_sla_percentage": round(performer["response_sla_percentage"], 2),
+                "resolution_sla_percentage": round(performer["resolution_sla_percentage"], 2),
+                "overall_sla_percentage": round(overall_sla, 2),
+                "performance_score": round(performer["performance_score"], 2)
+            })
+        
+        return DashboardSummary(
+            total_tickets=total_tickets,
+            tickets_closed_today=tickets_closed_today,
+            tickets_open=tickets_open,
+            l1_pending=l1_pending,
+            l2_pending=l2_pending,
+            business_pending=business_pending,
+            overall_response_sla=round(overall_response_sla, 2),
+            overall_resolution_sla=round(overall_resolution_sla, 2),
+            top_performers=top_performers,
+            sla_breaches_today=sla_breaches_today
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting dashboard summary: {str(e)}")
+
+@api_router.get("/agents", response_model=List[Agent])
+async def get_agents(request: Request):
+    """Get all agents"""
+    return await cached_response(request, compute_agents)
+
+async def compute_agents() -> List[Dict[str, Any]]:
+    """Load all agents, shaped like the Agent model"""
+    agents = await db.agents.find({}, response_projection(AGENT_RESPONSE_FIELDS), comment="agents.list").to_list(1000)
+    return response_rows(agents, AGENT_RESPONSE_FIELDS)
+
+@api_router.get("/agent-performance")
+async def get_all_agent_performance(
+    request: Request,
+    agent_name: Optional[List[str]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Get performance metrics for every agent, or the named agents, in one aggregation"""
+    window = DateWindow(from_date, to_date)
+    return await cached_response(request, lambda: compute_all_agent_performance(agent_name, skip, limit, window))
+
+async def compute_all_agent_performance(
+    agent_name: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    window: Optional[DateWindow] = None
+) -> Dict[str, Any]:
+    """Group tickets by resolved_by into per-agent metrics, optionally filtered and paginated"""
+    window = window or DateWindow()
+    try:
+        match = {"resolved_by": {"$nin": [None, ""]}}
+        if agent_name:
+            match = {"resolved_by": {"$in": agent_name}}
+        match.update(window.ticket_filter())
+        
+        page = [{"$skip": skip}]
+        if limit:
+            page.append({"$limit": limit})
+        pipeline = agent_performance_pipeline(match) + [
+            {"$sort": {"_id": 1}},
+            {"$facet": {"agents": page, "total": [{"$count": "count"}]}}
         ]
         
-        team_performance_cursor = db.tickets.aggregate(pipeline)
+        result = await db.tickets.aggregate(pipeline, comment="agent_performance.all").to_list(1)
+        result = result[0] if result else {}
+        total = result.get("total") or [{}]
+        
+        return {
+            "agents": [format_agent_performance(group["_id"], group) for group in result.get("agents", [])],
+            "total_count": total[0].get("count", 0),
+            "skip": skip,
+            "limit": limit
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting agent performance: {str(e)}")
+
+@api_router.get("/agent-performance/{agent_name}")
+async def get_agent_performance(
+    request: Request,
+    agent_name: str,
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Get detailed performance metrics for a specific agent"""
+    window = DateWindow(from_date, to_date)
+    return await cached_response(request, lambda: compute_agent_performance(agent_name, window))
+
+async def compute_agent_performance(agent_name: str, window: Optional[DateWindow] = None) -> Dict[str, Any]:
+    """Aggregate one agent's tickets created in the window into performance metrics"""
+    window = window or DateWindow()
+    try:
+        # Aggregate the agent's tickets in the database, projecting only SLA and time fields
+        groups = await db.tickets.aggregate(
+            agent_performance_pipeline({"resolved_by": agent_name, **window.ticket_filter()}),
+            comment="agent_performance"
+        ).to_list(1)
+        
+        return format_agent_performance(agent_name, groups[0] if groups else None)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting agent performance: {str(e)}")
+
+@api_router.get("/team-performance")
+async def get_team_performance(
+    request: Request,
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Get performance metrics grouped by team (L1, L2, Business Team)"""
+    window = DateWindow(from_date, to_date)
+    return await cached_response(request, lambda: compute_team_performance(window))
+
+async def compute_team_performance(window: Optional[DateWindow] = None) -> List[Dict[str, Any]]:
+    """Aggregate the SLA rollups into per-team metrics, for tickets created in the window"""
+    window = window or DateWindow()
+    try:
+        # Aggregate the per-team SLA rollups
+        pipeline = team_rollup_pipeline(window.rollup_filter())
+        
+        team_performance_cursor = db.sla_rollups.aggregate(
+            pipeline,
+            comment="team_performance.window" if window.rollup_filter() else "team_performance"
+        )
         team_performance = []
         async for team in team_performance_cursor:
             team_performance.append({
@@ -699,55 +3197,249 @@ async def get_team_performance():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting team performance: {str(e)}")
 
+@api_router.get("/time-distribution")
+async def get_time_distribution(
+    request: Request,
+    group_by: TimeGrouping = Query(TimeGrouping.OVERALL),
+    agent_name: Optional[List[str]] = Query(None, description="Only these agents; repeat for several"),
+    team: Optional[List[str]] = Query(None, description="Only these teams; repeat for several"),
+    percentiles: List[float] = Query([50, 90, 99], description="Percentiles between 0 and 100"),
+    histogram: List[float] = Query(DEFAULT_HISTOGRAM_HOURS, description="Histogram bin edges in hours"),
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Response and resolution time percentiles and histograms per agent, per team or overall
+    
+    Read from the time sketches kept in the SLA rollups, so any mix of agents,
+    teams and days is answered without reading tickets.
+    """
+    if any(not 0 <= percentile <= 100 for percentile in percentiles):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+    if any(edge <= 0 for edge in histogram):
+        raise HTTPException(status_code=400, detail="histogram edges must be positive")
+    window = DateWindow(from_date, to_date)
+    match = window.rollup_filter()
+    for key, names in (("agent", agent_name), ("team", team)):
+        if names:
+            match[key] = {"$in": names}
+    edges = sorted(set(histogram))
+    return await cached_response(
+        request, lambda: compute_time_distribution(match, group_by, percentiles, edges)
+    )
+
+async def compute_time_distribution(
+    match: Dict[str, Any],
+    group_by: TimeGrouping,
+    percentiles: List[float],
+    edges: List[float]
+) -> Dict[str, Any]:
+    """Merge the rollup time sketches for the matching groups and summarize them"""
+    try:
+        facets = await db.sla_rollups.aggregate(
+            time_distribution_pipeline(match, group_by),
+            comment="time_distribution.window" if "day" in match else "time_distribution"
+        ).to_list(1)
+        facets = facets[0] if facets else {}
+        
+        groups = []
+        for totals in facets.get("totals", []):
+            group = {"group": totals["_id"] if group_by != TimeGrouping.OVERALL else "all"}
+            for source, field in SKETCH_FIELDS.items():
+                metric = source.replace("_hours", "")
+                buckets = next(
+                    ({bucket["k"]: bucket["v"] for bucket in sketch["buckets"]}
+                     for sketch in facets.get(field, []) if sketch["_id"] == totals["_id"]),
+                    {}
+                )
+                summary = summarize_sketch(buckets, percentiles, edges)
+                count = totals[f"{metric}_count"]
+                summary["mean"] = round(totals[f"{metric}_sum"] / count, 2) if count else None
+                group[metric] = summary
+            groups.append(group)
+        groups.sort(key=lambda group: (group["group"] is None, str(group["group"])))
+        
+        return {
+            "group_by": group_by.value,
+            "relative_accuracy": SKETCH_RELATIVE_ACCURACY,
+            "groups": groups
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting time distribution: {str(e)}")
+
 @api_router.get("/tickets")
 async def get_tickets(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page; replaces skip"),
+    fields: Optional[List[str]] = Query(None, description="Ticket fields to return, repeated or comma-separated"),
+    count: TicketCountMode = Query(TicketCountMode.EXACT),
     agent_name: Optional[str] = Query(None),
     team: Optional[str] = Query(None),
-    sla_status: Optional[str] = Query(None)
+    sla_status: Optional[str] = Query(None),
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
 ):
-    """Get tickets with filtering and pagination"""
+    """Get tickets with filtering and pagination
+    
+    Pages are ordered by _id. Passing the previous page's next_cursor as
+    after seeks straight to the next page through the index, so deep pages
+    cost the same as the first one; skip is kept for offset paging.
+    """
+    if after is not None and skip:
+        raise HTTPException(status_code=400, detail="Use either skip or after, not both")
+    names = ticket_fields(fields)
+    window = DateWindow(from_date, to_date)
+    
     try:
-        # Build filter query
-        filter_query = {}
-        if agent_name:
-            filter_query["resolved_by"] = agent_name
-        if team:
-            filter_query["updated_resolved_by_team"] = team
-        if sla_status:
-            filter_query["$or"] = [
-                {"response_sla_status": sla_status},
-                {"resolution_sla_status": sla_status}
-            ]
-        
-        # Get total count
-        total_count = await db.tickets.count_documents(filter_query)
+        filter_query = ticket_filter(agent_name, team, sla_status, window)
+        total_count = await count_tickets(filter_query, count)
         
-        # Get tickets
-        tickets = await db.tickets.find(filter_query).skip(skip).limit(limit).to_list(limit)
+        page_query = dict(filter_query)
+        if after is not None:
+            page_query["_id"] = {"$gt": decode_ticket_cursor(after)}
         
-        return {
-            "tickets": [Ticket(**parse_from_mongo(ticket)) for ticket in tickets],
+        # Fetch one extra row to know whether another page follows
+        # _id stays in the projection because it is the paging key
+        cursor = db.tickets.find(page_query, {**ticket_projection(names), "_id": 1}, comment="tickets.page").sort(TICKET_PAGE_SORT)
+        if after is None:
+            cursor = cursor.skip(skip)
+        tickets = await cursor.limit(limit + 1).to_list(limit + 1)
+        next_cursor = str(tickets[limit - 1]["_id"]) if len(tickets) > limit else None
+        tickets = await ticket_dictionary.decode(tickets[:limit])
+        
+        return FastJSONResponse({
+            "tickets": response_rows(tickets, names),
             "total_count": total_count,
             "skip": skip,
-            "limit": limit
-        }
+            "limit": limit,
+            "next_cursor": next_cursor
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting tickets: {str(e)}")
 
+@api_router.get("/at-risk")
+async def get_at_risk_tickets(
+    include_breached: bool = Query(False, description="Also list open tickets already past their deadline"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[List[str]] = Query(None, description="Ticket fields to return, repeated or comma-separated"),
+    agent_name: Optional[str] = Query(None),
+    team: Optional[str] = Query(None)
+):
+    """Open tickets flagged by the SLA risk scheduler, soonest deadline first"""
+    names = ticket_fields(fields)
+    
+    try:
+        statuses = [SLAStatus.AT_RISK.value] + ([SLAStatus.BREACHED.value] if include_breached else [])
+        filter_query = {"sla_risk": {"$in": [stored_code('sla_risk', status) for status in statuses]}, **ticket_filter(agent_name, team, None)}
+        total_count = await db.tickets.count_documents(filter_query)
+        tickets = await db.tickets.find(filter_query, ticket_projection(names), comment="at_risk.list").sort(
+            "sla_deadline", ASCENDING
+        ).limit(limit).to_list(limit)
+        tickets = await ticket_dictionary.decode(tickets)
+        meta = await db.scheduler_meta.find_one({"_id": "sla_risk"})
+        
+        return FastJSONResponse({
+            "tickets": response_rows(tickets, names),
+            "total_count": total_count,
+            "as_of": meta.get("last_tick") if meta else None,
+            "risk_window_hours": SLA_RISK_WINDOW_HOURS
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting at-risk tickets: {str(e)}")
+
+@api_router.get("/tickets/export")
+async def export_tickets(
+    format: TicketExportFormat = Query(TicketExportFormat.NDJSON),
+    fields: Optional[List[str]] = Query(None, description="Ticket fields to export, repeated or comma-separated"),
+    agent_name: Optional[str] = Query(None),
+    team: Optional[str] = Query(None),
+    sla_status: Optional[str] = Query(None),
+    from_date: Optional[date_type] = Query(None, alias="from", description="First created day to include"),
+    to_date: Optional[date_type] = Query(None, alias="to", description="Last created day to include")
+):
+    """Stream every matching ticket as NDJSON, CSV or Parquet without a row cap"""
+    if format == TicketExportFormat.PARQUET and pa is None:
+        raise HTTPException(status_code=400, detail="Parquet export requires the pyarrow package")
+    columns = ticket_fields(fields)
+    
+    batches = iter_ticket_batches(ticket_filter(agent_name, team, sla_status, DateWindow(from_date, to_date)), columns)
+    if format == TicketExportFormat.CSV:
+        chunks = csv_chunks(batches, columns)
+    elif format == TicketExportFormat.PARQUET:
+        chunks = parquet_chunks(batches, columns)
+    else:
+        chunks = ndjson_chunks(batches, columns)
+    
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format.value}"'}
+    )
+
+@api_router.get("/admin/query-plans")
+async def get_query_plans(execution_stats: bool = Query(False)):
+    """Explain every endpoint query and flag the ones doing collection scans"""
+    try:
+        plans = await check_query_plans(execution_stats)
+        return {
+            "plans": plans,
+            "flagged": [plan["name"] for plan in plans if plan["flagged"]]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error checking query plans: {str(e)}")
+
+@api_router.get("/admin/storage")
+async def get_storage():
+    """Per-collection document and index sizes, for checking the working set against RAM"""
+    try:
+        collections = [await collection_storage(name) for name in STORAGE_COLLECTIONS]
+        return {
+            "collections": collections,
+            "total_data_bytes": sum(collection["data_bytes"] for collection in collections),
+            "total_index_bytes": sum(collection["index_bytes"] for collection in collections)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading storage sizes: {str(e)}")
+
+@api_router.post("/admin/rebuild-rollups")
+async def rebuild_rollups():
+    """Recompute the SLA rollups from the stored tickets"""
+    try:
+        groups = await rebuild_sla_rollups()
+        if groups is None:
+            raise HTTPException(status_code=409, detail="A rollup rebuild or an ingest job is already running; try again when it finishes")
+        await response_cache.bump()
+        return {"message": "SLA rollups rebuilt successfully", "groups": groups}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding SLA rollups: {str(e)}")
+
 @api_router.delete("/clear-data")
 async def clear_all_data():
-    """Clear all tickets and agents data - useful for testing"""
+    """Clear all tickets and agents data - useful for testing
+    
+    Drops the collections (and any leftover replace-upload staging copies)
+    rather than deleting document by document, then recreates their indexes.
+    """
     try:
-        tickets_deleted = await db.tickets.delete_many({})
-        agents_deleted = await db.agents.delete_many({})
+        tickets_deleted = await db.tickets.estimated_document_count()
+        agents_deleted = await db.agents.estimated_document_count()
+        staging = await db.list_collection_names(filter={"name": {"$regex": STAGING_MARKER}})
+        for name in ["tickets", "agents", "sla_rollups"] + staging:
+            await db.drop_collection(name)
+        await ensure_indexes()
+        await response_cache.bump()
         
         return {
             "message": "All data cleared successfully",
-            "tickets_deleted": tickets_deleted.deleted_count,
-            "agents_deleted": agents_deleted.deleted_count
+            "tickets_deleted": tickets_deleted,
+            "agents_deleted": agents_deleted
         }
         
     except Exception as e:
@@ -762,23 +3454,31 @@ async def create_test_pending_tickets():
         l1_ids = [t["_id"] for t in l1_tickets]
         result = await db.tickets.update_many(
             {"_id": {"$in": l1_ids}}, 
-            {"$set": {"status": "Open"}}
+            {"$set": {"status": stored_code("status", "Open")}}
         )
         
         l2_tickets = await db.tickets.find({"updated_team": "L2"}).limit(3).to_list(3)
         l2_ids = [t["_id"] for t in l2_tickets]
         result2 = await db.tickets.update_many(
             {"_id": {"$in": l2_ids}}, 
-            {"$set": {"status": "Pending"}}
+            {"$set": {"status": stored_code("status", "Pending")}}
         )
         
         business_tickets = await db.tickets.find({"updated_team": "Business Team"}).limit(2).to_list(2)
         business_ids = [t["_id"] for t in business_tickets]
         result3 = await db.tickets.update_many(
             {"_id": {"$in": business_ids}}, 
-            {"$set": {"status": "In Progress"}}
+            {"$set": {"status": stored_code("status", "In Progress")}}
         )
         
+        # Move the updated tickets to their new status in the SLA rollups
+        rollups = SLARollupDelta()
+        for tickets, status in ((l1_tickets, "Open"), (l2_tickets, "Pending"), (business_tickets, "In Progress")):
+            rollups.add(tickets, sign=-1)
+            rollups.add([{**ticket, "status": stored_code("status", status)} for ticket in tickets])
+        await rollups.flush()
+        await response_cache.bump()
+        
         return {
             "message": "Test pending tickets created successfully",
             "l1_updated": result.modified_count if hasattr(result, 'modified_count') else 0,
@@ -789,9 +3489,54 @@ async def create_test_pending_tickets():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating test data: {str(e)}")
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """Request, MongoDB and ingest metrics for this worker process, in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include the router in the main app
 app.include_router(api_router)
 
+class RequestMetricsMiddleware:
+    """Records per-route request latency, up to the last byte of the response
+    
+    Server-sent event streams stay open for as long as a client watches, so
+    they are left out of the latency histogram.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = perf_counter()
+        response = {"status": 500, "stream": False}
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = dict(message.get("headers", []))
+                response["stream"] = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if not response["stream"]:
+                route = scope.get("route")
+                metrics.observe(
+                    "sla_http_request_duration_seconds",
+                    perf_counter() - started,
+                    route=route.path if route is not None else "unmatched",
+                    method=scope["method"],
+                    status=str(response["status"])
+                )
+
+app.add_middleware(RequestMetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -807,6 +3552,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def bootstrap_indexes():
+    await ensure_indexes()
+    await response_cache.backend.ensure_indexes()
+    # Convert dates stored as text before they were typed; both fields are indexed, so the check is cheap
+    if await db.tickets.find_one({"$or": [{"created": {"$type": "string"}}, {"resolved_date": {"$type": "string"}}]}, {"_id": 1}):
+        logger.info("Converting ticket dates stored as strings")
+        await migrate_ticket_dates()
+    if not await db.migrations.find_one({"_id": "compact_tickets"}):
+        logger.info("Converting tickets to the compact storage format")
+        await migrate_compact_tickets()
+        await db.migrations.update_one(
+            {"_id": "compact_tickets"}, {"$setOnInsert": {"finished_at": datetime.now(timezone.utc)}}, upsert=True
+        )
+    # Backfill rollups for tickets loaded before sla_rollups existed
+    if await db.sla_rollups.estimated_document_count() == 0 and await db.tickets.estimated_document_count() > 0:
+        logger.info("Building SLA rollups from existing tickets")
+        if await rebuild_sla_rollups() is None:
+            logger.info("Another worker is rebuilding the SLA rollups")
+    elif await db.sla_rollups.find_one({"response_time_count": {"$gt": 0}, "response_time_sketch": {"$exists": False}}, {"_id": 1}):
+        logger.info("Adding time sketches to the SLA rollups")
+        if await rebuild_sla_rollups() is None:
+            logger.info("Another worker is rebuilding the SLA rollups")
+    if CHECK_QUERY_PLANS:
+        await check_query_plans()
+
+@app.on_event("startup")
+async def start_ingest_workers():
+    start_parse_pool()
+    for _ in range(INGEST_CONCURRENCY):
+        ingest_workers.append(asyncio.create_task(ingest_worker()))
+
+@app.on_event("startup")
+async def start_dashboard_feed():
+    dashboard_feed.task = asyncio.create_task(dashboard_feed.run())
+
+@app.on_event("startup")
+async def start_sla_risk_scheduler():
+    global sla_risk_task
+    if SLA_RISK_INTERVAL > 0:
+        sla_risk_task = asyncio.create_task(sla_risk_scheduler())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if sla_risk_task is not None:
+        sla_risk_task.cancel()
+    if dashboard_feed.task is not None:
+        dashboard_feed.task.cancel()
+    for worker in ingest_workers:
+        worker.cancel()
+    stop_parse_pool()
     client.close()
@@ -19,6 +19,7 @@ axios.defaults.baseURL = API;
 function App() {
   const [currentView, setCurrentView] = useState('dashboard');
   const [dashboardData, setDashboardData] = useState(null);
+  const [teamData, setTeamData] = useState(null);
   const [loading, setLoading] = useState(false);
 
   const fetchDashboardData = async () => {
@@ -35,6 +36,35 @@ function App() {
 
   useEffect(() => {
     fetchDashboardData();
+
+    // The server pushes a snapshot on connect and a diff after every data change
+    if (!window.EventSource) {
+      return undefined;
+    }
+    const stream = new EventSource(`${API}/stream/dashboard`);
+    stream.addEventListener('snapshot', (event) => {
+      const snapshot = JSON.parse(event.data);
+      setDashboardData(snapshot.summary);
+      setTeamData(snapshot.teams);
+      setLoading(false);
+    });
+    stream.addEventListener('diff', (event) => {
+      const diff = JSON.parse(event.data);
+      setDashboardData((current) => ({ ...current, ...diff.summary }));
+      setTeamData((current) => {
+        const teams = (current || []).filter((team) => !diff.teams.removed.includes(team.team_name));
+        diff.teams.changed.forEach((changed) => {
+          const index = teams.findIndex((team) => team.team_name === changed.team_name);
+          if (index === -1) {
+            teams.push(changed);
+          } else {
+            teams[index] = changed;
+          }
+        });
+        return teams;
+      });
+    });
+    return () => stream.close();
   }, []);
 
   const handleFileUploaded = () => {
@@ -52,7 +82,7 @@ function App() {
       case 'agents':
         return <AgentPerformance />;
       case 'teams':
-        return <TeamPerformance />;
+        return <TeamPerformance data={teamData} />;
       default:
         return <Dashboard data={dashboardData} loading={loading} />;
     }
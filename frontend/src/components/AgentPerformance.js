@@ -19,18 +19,23 @@ const AgentPerformance = () => {
   const fetchAgents = async () => {
     try {
       setLoading(true);
-      const response = await axios.get('/agents');
-      setAgents(response.data);
+      // Fetch the agent list and every agent's performance in two requests
+      const [agentsResponse, performanceResponse] = await Promise.all([
+        axios.get('/agents'),
+        axios.get('/agent-performance'),
+      ]);
+      setAgents(agentsResponse.data);
       
-      // Fetch performance data for each agent
-      const performancePromises = response.data.map(agent => 
-        fetchAgentPerformance(agent.name)
-      );
-      
-      const performanceResults = await Promise.all(performancePromises);
       const performanceMap = {};
-      response.data.forEach((agent, index) => {
-        performanceMap[agent.name] = performanceResults[index];
+      performanceResponse.data.agents.forEach(performance => {
+        performanceMap[performance.agent_name] = performance;
+      });
+      
+      // Agents without resolved tickets get zeroed metrics
+      agentsResponse.data.forEach(agent => {
+        if (!performanceMap[agent.name]) {
+          performanceMap[agent.name] = emptyPerformance(agent.name);
+        }
       });
       
       setAgentPerformance(performanceMap);
@@ -41,22 +46,18 @@ const AgentPerformance = () => {
     }
   };
 
-  const fetchAgentPerformance = async (agentName) => {
-    try {
-      const response = await axios.get(`/agent-performance/${encodeURIComponent(agentName)}`);
-      return response.data;
-    } catch (error) {
-      console.error(`Error fetching performance for ${agentName}:`, error);
-      return {
-        agent_name: agentName,
-        total_tickets: 0,
-        response_sla_percentage: 0,
-        resolution_sla_percentage: 0,
-        avg_response_time: 0,
-        avg_resolution_time: 0
-      };
-    }
-  };
+  const emptyPerformance = (agentName) => ({
+    agent_name: agentName,
+    total_tickets: 0,
+    response_sla_met: 0,
+    response_sla_breached: 0,
+    resolution_sla_met: 0,
+    resolution_sla_breached: 0,
+    response_sla_percentage: 0,
+    resolution_sla_percentage: 0,
+    avg_response_time: 0,
+    avg_resolution_time: 0
+  });
 
   const getSLAStatusColor = (percentage) => {
     if (percentage >= 95) return 'excellent';
@@ -1,18 +1,27 @@
 import React, { useState, useRef } from 'react';
 import axios from 'axios';
 
+// Files above this size are streamed to the server in row batches
+const STREAM_THRESHOLD_BYTES = 20 * 1024 * 1024;
+const JOB_POLL_INTERVAL_MS = 1000;
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const FileUpload = ({ onFileUploaded }) => {
   const [uploading, setUploading] = useState(false);
   const [dragOver, setDragOver] = useState(false);
   const [uploadResult, setUploadResult] = useState(null);
+  const [jobProgress, setJobProgress] = useState(null);
+  const [mergeUpload, setMergeUpload] = useState(false);
+  const [replaceUpload, setReplaceUpload] = useState(false);
   const [error, setError] = useState(null);
   const fileInputRef = useRef(null);
 
   const handleFileSelect = (file) => {
     if (!file) return;
     
-    if (!file.name.match(/\.(xlsx|xls)$/i)) {
-      setError('Please select an Excel file (.xlsx or .xls)');
+    if (!file.name.match(/\.(xlsx|xls|csv)$/i)) {
+      setError('Please select an Excel or CSV file (.xlsx, .xls or .csv)');
       return;
     }
     
@@ -24,11 +33,16 @@ const FileUpload = ({ onFileUploaded }) => {
       setUploading(true);
       setError(null);
       setUploadResult(null);
+      setJobProgress(null);
       
       const formData = new FormData();
       formData.append('file', file);
       
       const response = await axios.post('/upload-excel', formData, {
+        params: {
+          stream: file.size > STREAM_THRESHOLD_BYTES,
+          mode: replaceUpload ? 'replace' : mergeUpload ? 'merge' : 'append',
+        },
         headers: {
           'Content-Type': 'multipart/form-data',
         },
@@ -40,7 +54,20 @@ const FileUpload = ({ onFileUploaded }) => {
         },
       });
       
-      setUploadResult(response.data);
+      // The upload returns a background job; poll it until ingestion finishes
+      let job = response.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        setJobProgress(job);
+        await wait(JOB_POLL_INTERVAL_MS);
+        job = (await axios.get(`/ingest-jobs/${job.id}`)).data;
+      }
+      
+      if (job.status === 'failed') {
+        setError(job.errors?.join(', ') || 'Failed to process file. Please try again.');
+        return;
+      }
+      
+      setUploadResult(job);
       
       // Call the callback to refresh dashboard
       if (onFileUploaded) {
@@ -57,6 +84,7 @@ const FileUpload = ({ onFileUploaded }) => {
       );
     } finally {
       setUploading(false);
+      setJobProgress(null);
     }
   };
 
@@ -130,7 +158,7 @@ const FileUpload = ({ onFileUploaded }) => {
           <input
             ref={fileInputRef}
             type="file"
-            accept=".xlsx,.xls"
+            accept=".xlsx,.xls,.csv"
             onChange={handleInputChange}
             className="hidden"
             data-testid="file-input"
@@ -142,8 +170,11 @@ const FileUpload = ({ onFileUploaded }) => {
               <div className="text-lg font-medium text-gray-700">
                 Processing your Excel file...
               </div>
-              <div className="text-sm text-gray-500">
-                This may take a few moments
+              <div className="text-sm text-gray-500" data-testid="upload-progress">
+                {jobProgress?.rows_parsed
+                  ? `${jobProgress.rows_written.toLocaleString()} of ${jobProgress.rows_parsed.toLocaleString()} rows written` +
+                    (jobProgress.rows_per_second ? ` (${Math.round(jobProgress.rows_per_second).toLocaleString()} rows/sec)` : '')
+                  : 'This may take a few moments'}
               </div>
             </div>
           ) : (
@@ -156,7 +187,7 @@ const FileUpload = ({ onFileUploaded }) => {
                 or click to browse and select a file
               </div>
               <div className="text-sm text-gray-400">
-                Supports .xlsx and .xls formats
+                Supports .xlsx, .xls and .csv formats
               </div>
             </div>
           )}
@@ -197,9 +228,24 @@ const FileUpload = ({ onFileUploaded }) => {
             <div className="grid grid-cols-2 gap-4 mt-4">
               <div className="bg-white rounded-lg p-4 border border-green-200">
                 <div className="text-2xl font-bold text-green-600">
-                  {uploadResult.tickets_processed?.toLocaleString()}
+                  {uploadResult.rows_written?.toLocaleString()}
                 </div>
                 <div className="text-sm text-green-700">Tickets Processed</div>
+                {uploadResult.mode === 'merge' && (
+                  <div className="text-xs text-green-600 mt-1" data-testid="merge-counts">
+                    {uploadResult.tickets_inserted?.toLocaleString()} new · {uploadResult.tickets_updated?.toLocaleString()} updated · {uploadResult.tickets_unchanged?.toLocaleString()} unchanged
+                  </div>
+                )}
+                {uploadResult.tickets_duplicate > 0 && (
+                  <div className="text-xs text-amber-600 mt-1" data-testid="duplicate-count">
+                    {uploadResult.tickets_duplicate.toLocaleString()} rows skipped because their SR Number was already loaded
+                  </div>
+                )}
+                {uploadResult.tickets_rejected > 0 && (
+                  <div className="text-xs text-amber-600 mt-1" data-testid="rejected-count">
+                    {uploadResult.tickets_rejected.toLocaleString()} rows skipped without an SR Number
+                  </div>
+                )}
               </div>
               <div className="bg-white rounded-lg p-4 border border-green-200">
                 <div className="text-2xl font-bold text-green-600">
@@ -226,6 +272,32 @@ const FileUpload = ({ onFileUploaded }) => {
             <div className="text-sm text-gray-600">
               Upload multiple files to combine data or clear existing data to start fresh.
             </div>
+            <label className="flex items-center gap-2 text-sm text-gray-700">
+              <input
+                type="checkbox"
+                checked={mergeUpload}
+                onChange={(e) => {
+                  setMergeUpload(e.target.checked);
+                  if (e.target.checked) setReplaceUpload(false);
+                }}
+                disabled={uploading}
+                data-testid="merge-upload-checkbox"
+              />
+              Merge by SR Number (update changed tickets, skip unchanged ones)
+            </label>
+            <label className="flex items-center gap-2 text-sm text-gray-700">
+              <input
+                type="checkbox"
+                checked={replaceUpload}
+                onChange={(e) => {
+                  setReplaceUpload(e.target.checked);
+                  if (e.target.checked) setMergeUpload(false);
+                }}
+                disabled={uploading}
+                data-testid="replace-upload-checkbox"
+              />
+              Replace all data (the current data stays visible until the new file has fully loaded)
+            </label>
             <div className="flex gap-4">
               <button
                 onClick={() => fileInputRef.current?.click()}
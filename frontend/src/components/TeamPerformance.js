@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 
-const TeamPerformance = () => {
+const TeamPerformance = ({ data }) => {
   const [teamData, setTeamData] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selectedTeam, setSelectedTeam] = useState(null);
@@ -9,8 +9,14 @@ const TeamPerformance = () => {
   const [sortOrder, setSortOrder] = useState('desc');
 
   useEffect(() => {
-    fetchTeamPerformance();
-  }, []);
+    // Team metrics pushed over the dashboard stream replace fetching them here
+    if (data) {
+      setTeamData(data);
+      setLoading(false);
+    } else {
+      fetchTeamPerformance();
+    }
+  }, [data]);
 
   const fetchTeamPerformance = async () => {
     try {
@@ -0,0 +1,57 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = 'sla_tracker_test'
+# Parse uploads in a thread and keep the SLA risk scheduler off
+os.environ['INGEST_PARSE_WORKERS'] = '0'
+os.environ['SLA_RISK_INTERVAL'] = '0'
+os.environ['RESPONSE_CACHE_TTL'] = '0'
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Point the server at a fresh in-process mongomock database"""
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    # mongomock rejects the comment option the endpoint queries are tagged with
+    for name in ('find', 'aggregate', 'count_documents'):
+        method = getattr(mongomock.collection.Collection, name)
+
+        def without_comment(self, *args, _method=method, **kwargs):
+            kwargs.pop('comment', None)
+            return _method(self, *args, **kwargs)
+        monkeypatch.setattr(mongomock.collection.Collection, name, without_comment)
+
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(server, 'client', client)
+    monkeypatch.setattr(server, 'db', client[os.environ['DB_NAME']])
+    # Codes cached by an earlier test's dictionary would not exist in this database
+    monkeypatch.setattr(server, 'ticket_dictionary', server.TicketDictionary())
+    return server.db
+
+
+@pytest.fixture
+def ingest(db):
+    """Store upload rows (dicts keyed by upload column) through ingest_chunks, as one parsed chunk"""
+    async def run(rows, mode=server.IngestMode.APPEND, job=None):
+        async def chunks():
+            chunk = server.transform_frame(pd.DataFrame(rows))
+            chunk['parse'] = 0.0
+            yield chunk
+        await server.ensure_indexes()
+        return await server.ingest_chunks(chunks(), mode=mode, job=job)
+    return run
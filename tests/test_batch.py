@@ -0,0 +1,51 @@
+"""Batch uploads: every file and sheet is reported on its own source"""
+import pandas as pd
+import pytest
+
+import server
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows
+
+pytestmark = pytest.mark.anyio
+
+
+def write_csv(path, count, seed):
+    rows = synthetic_upload_rows(count, agents=2, teams=1, seed=seed)
+    pd.DataFrame(list(rows), columns=UPLOAD_COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+async def run_batch(uploads, mode=server.IngestMode.APPEND):
+    job = server.IngestJob(file_name=', '.join(name for _, name in uploads), mode=mode)
+    await server.ensure_indexes()
+    await server.run_batch_ingest_job(job, uploads, server.INGEST_BATCH_SIZE)
+    return job
+
+
+async def test_failed_file_does_not_shift_later_sources(db, tmp_path):
+    bad = tmp_path / 'bad.xlsx'
+    bad.write_bytes(b'not a workbook')
+    uploads = [(str(bad), 'bad.xlsx'), (write_csv(tmp_path / 'good.csv', 2, seed=1), 'good.csv')]
+
+    job = await run_batch(uploads)
+
+    assert job.status == server.IngestJobStatus.COMPLETED
+    sources = {source.file_name: source for source in job.sources}
+    assert sources['bad.xlsx'].error is not None
+    assert sources['bad.xlsx'].rows_parsed == 0
+    assert sources['good.csv'].error is None
+    assert sources['good.csv'].rows_parsed == 2
+    assert await db.tickets.count_documents({}) == 2
+
+
+async def test_job_fails_when_every_source_fails(db, tmp_path):
+    bad = tmp_path / 'bad.xlsx'
+    bad.write_bytes(b'not a workbook')
+    broken = tmp_path / 'broken.csv'
+    broken.write_bytes(b'')
+    uploads = [(str(bad), 'bad.xlsx'), (str(broken), 'broken.csv')]
+
+    job = await run_batch(uploads)
+
+    assert job.status == server.IngestJobStatus.FAILED
+    assert all(source.error is not None for source in job.sources)
+    assert len(job.sources) == 2
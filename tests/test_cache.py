@@ -0,0 +1,38 @@
+"""Ingests invalidate cached responses whenever live data changed, even if they then fail"""
+import pandas as pd
+import pytest
+
+import server
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows
+
+pytestmark = pytest.mark.anyio
+
+
+async def failing_after_one_chunk():
+    rows = synthetic_upload_rows(10, agents=2, teams=1, seed=1)
+    chunk = server.transform_frame(pd.DataFrame(list(rows), columns=UPLOAD_COLUMNS))
+    chunk['parse'] = 0.0
+    yield chunk
+    raise ValueError("corrupt sheet")
+
+
+async def test_failed_append_still_invalidates_stored_chunks(db):
+    await server.ensure_indexes()
+    version = server.response_cache.local_version
+
+    with pytest.raises(ValueError, match="corrupt sheet"):
+        await server.ingest_chunks(failing_after_one_chunk())
+
+    assert await db.tickets.count_documents({}) == 10
+    assert server.response_cache.local_version == version + 1
+
+
+async def test_failed_replace_keeps_the_cache(db):
+    await server.ensure_indexes()
+    version = server.response_cache.local_version
+
+    with pytest.raises(ValueError, match="corrupt sheet"):
+        await server.ingest_chunks(failing_after_one_chunk(), mode=server.IngestMode.REPLACE)
+
+    assert await db.tickets.count_documents({}) == 0
+    assert server.response_cache.local_version == version
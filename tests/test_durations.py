@@ -0,0 +1,76 @@
+"""time_series_to_hours must agree with parse_time_to_hours cell by cell"""
+import math
+import random
+from datetime import time, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import server
+
+# Every cell shape the Response/Resolution Time columns have produced, plus malformed ones
+GOLDEN_CORPUS = [
+    # Missing
+    None, float('nan'), pd.NaT, '', '   ',
+    # Excel day fractions
+    0, 1, 0.5, 0.0416666, 1.25, 2.675 / 24, -0.5, True, False, np.float64(0.75), np.int64(3), np.float32(0.1),
+    '0.5', ' 1.25 ', '1e-3', '1_0', '-0.25', 'nan', 'inf', '.5', '5.',
+    # HH:MM and HH:MM:SS
+    '01:30', '1:30', '00:00', '23:59:59', '100:05', '10:00:30', ' 02:15 ', '-1:30', '+01:30', '1:2:3:4',
+    '01:30:00.5', '1: 30', '٣:30', '01:', ':30', 'hh:mm',
+    # Pandas timedelta strings
+    '0 days 00:01:00', '1 days 05:28:00', '2 days 00:00', '-1 days +05:00:00', '1 days  02:00:00',
+    '1 day 02:00:00', '1days 02:00', '1 days 05:28:00.500000', 'x days 01:00', '12:00 1 days', '1 days',
+    # Timedeltas, times and dates
+    timedelta(hours=1, minutes=30), timedelta(days=200, microseconds=7), pd.Timedelta('3h'),
+    time(3, 15), time(0, 0), time(23, 59, 59), time(1, 2, 3, 500),
+    pd.Timestamp('2024-01-01 10:00'), np.timedelta64(5, 'h'),
+    # Garbage
+    'bad', 'N/A', '-', '1.2.3', 'days',
+]
+
+
+def same(expected, actual) -> bool:
+    """Scalar and column results agree; NaN and None both mean no value once stored"""
+    expected_missing = expected is None or (isinstance(expected, float) and math.isnan(expected))
+    actual_missing = actual is None or (isinstance(actual, float) and math.isnan(actual))
+    if expected_missing or actual_missing:
+        return expected_missing and actual_missing
+    return expected == actual
+
+
+def shuffled_corpus() -> pd.Series:
+    values = GOLDEN_CORPUS * 3
+    random.Random(42).shuffle(values)
+    return pd.Series(values, index=[index % 7 for index in range(len(values))], dtype=object)
+
+
+COLUMNS = {
+    'mixed': lambda: pd.Series(GOLDEN_CORPUS, dtype=object),
+    'strings': lambda: pd.Series([value for value in GOLDEN_CORPUS if isinstance(value, str)], dtype='string'),
+    'floats': lambda: pd.Series([0.5, 1.25, np.nan, 2.675 / 24, -3.0]),
+    'ints': lambda: pd.Series([0, 1, 2, 48]),
+    'timedeltas': lambda: pd.Series(pd.to_timedelta(['1h', '90min', None, '2 days 3h'])),
+    'datetimes': lambda: pd.Series(pd.to_datetime(['2024-01-01 10:00', None])),
+    # Duplicate index labels
+    'shuffled': shuffled_corpus,
+    # Every representable hh:mm value, which exercises round() half-way cases
+    'clock': lambda: pd.Series([f"{hours:02d}:{minutes:02d}" for hours in range(100) for minutes in range(60)], dtype=object),
+    'fractions': lambda: pd.Series([index / 1440 for index in range(1440 * 3)], dtype=object),
+}
+
+
+@pytest.mark.parametrize('label', list(COLUMNS))
+def test_matches_parse_time_to_hours(label):
+    series = COLUMNS[label]()
+    expected = [server.parse_time_to_hours(value) for value in series]
+    actual = server.time_series_to_hours(series)
+
+    assert actual.index.equals(series.index)
+    mismatches = [
+        (value, want, got)
+        for value, want, got in zip(series, expected, actual)
+        if not same(want, got)
+    ]
+    assert mismatches == []
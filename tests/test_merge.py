@@ -0,0 +1,53 @@
+"""Merge uploads: content-hash skipping, cleared fields and SR Number keying"""
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+MERGE = server.IngestMode.MERGE
+
+
+def ticket(sr_number, **columns):
+    return {'SR Number': sr_number, 'Resolved By': 'Ann', 'Updated Team': 'L1', 'Status': 'Open', **columns}
+
+
+async def test_unchanged_rows_are_skipped(db, ingest):
+    rows = [ticket(f"SR{index}", **{'Response SLA Status': 'Met'}) for index in range(5)]
+    first = await ingest(rows, MERGE)
+    again = await ingest(rows, MERGE)
+
+    assert (first['tickets_inserted'], first['tickets_unchanged']) == (5, 0)
+    assert (again['tickets_inserted'], again['tickets_updated'], again['tickets_unchanged']) == (0, 0, 5)
+
+
+async def test_changed_row_is_updated_and_cleared_fields_are_unset(db, ingest):
+    await ingest([ticket('SR1', Area='Billing', **{'Response Time (hh:mm)': '01:30'}), ticket('SR2')], MERGE)
+    stats = await ingest([ticket('SR1', **{'Response SLA Status': 'Breached'}), ticket('SR2')], MERGE)
+
+    assert (stats['tickets_updated'], stats['tickets_unchanged']) == (1, 1)
+    stored = await db.tickets.find_one({"sr_number": "SR1"})
+    assert 'area' not in stored
+    assert 'response_time_hours' not in stored
+    assert stored['response_sla_status'] == server.SLA_STATUS_CODES['Breached']
+    assert await db.tickets.count_documents({}) == 2
+
+
+async def test_rows_without_sr_number_are_rejected(db, ingest):
+    rows = [ticket(None)] * 5 + [ticket(1001.0), ticket('   ')]
+    stats = await ingest(rows)
+    again = await ingest(rows, MERGE)
+
+    assert (stats['tickets_inserted'], stats['tickets_rejected']) == (1, 6)
+    assert (again['tickets_unchanged'], again['tickets_rejected']) == (1, 6)
+    assert await db.tickets.distinct('sr_number') == ['1001']
+
+
+async def test_append_counts_stored_sr_numbers_as_duplicates(db, ingest):
+    await ingest([ticket('SR1'), ticket('SR2')])
+    stats = await ingest([ticket('SR1', Status='Resolved'), ticket('SR3')])
+    merged = await ingest([ticket('SR4'), ticket('SR4', Status='Resolved')], MERGE)
+
+    assert (stats['tickets_inserted'], stats['tickets_unchanged'], stats['tickets_duplicate']) == (1, 0, 1)
+    assert (merged['tickets_inserted'], merged['tickets_duplicate']) == (1, 1)
+    assert (await db.tickets.find_one({"sr_number": "SR1"}))['status'] == server.STATUS_CODES['Open']
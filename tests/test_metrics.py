@@ -0,0 +1,23 @@
+"""MongoDB command metrics are labelled by collection and query name"""
+from types import SimpleNamespace
+
+import server
+
+
+def command_labels(command_name, command):
+    listener = server.CommandMetricsListener()
+    event = SimpleNamespace(connection_id=('localhost', 27017), request_id=1, command_name=command_name, command=command)
+    listener.started(event)
+    return listener.finished(SimpleNamespace(**vars(event), duration_micros=1000))
+
+
+def test_labels_endpoint_queries_by_comment():
+    labels = command_labels('aggregate', {'aggregate': 'tickets', 'pipeline': [], 'comment': 'team_summary'})
+    assert labels == {'command': 'aggregate', 'collection': 'tickets', 'query': 'team_summary'}
+
+
+def test_staging_collections_share_their_target_label():
+    for name in (f"tickets{server.STAGING_MARKER}0f3a", f"sla_rollups_rebuild{server.STAGING_MARKER}9c1d"):
+        labels = command_labels('insert', {'insert': name, 'documents': [{}]})
+        assert labels['collection'] == name.split(server.STAGING_MARKER)[0]
+    assert command_labels('insert', {'insert': f"agents{server.STAGING_MARKER}77aa"})['collection'] == 'agents'
@@ -0,0 +1,37 @@
+"""Uploads are parsed into chunks of at most chunk_rows rows, whether streamed or read whole"""
+import io
+import queue
+import threading
+
+import pandas as pd
+import pytest
+
+import server
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows
+
+
+def upload_csv(count):
+    buffer = io.StringIO()
+    pd.DataFrame(list(synthetic_upload_rows(count, agents=2, teams=1, seed=1)), columns=UPLOAD_COLUMNS).to_csv(buffer, index=False)
+    return buffer.getvalue().encode()
+
+
+def parsed_rows(source, stream):
+    chunks = queue.Queue()
+    server.parse_upload(chunks, threading.Event(), source, 'upload.csv', 4, stream)
+    rows = []
+    while (chunk := chunks.get_nowait()) is not None:
+        rows.append(chunk['rows'])
+    return rows
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_chunks_respect_chunk_rows(tmp_path, stream):
+    path = tmp_path / 'upload.csv'
+    path.write_bytes(upload_csv(10))
+
+    assert parsed_rows(str(path), stream) == [4, 4, 2]
+
+
+def test_buffered_upload_from_bytes():
+    assert parsed_rows(upload_csv(10), stream=False) == [4, 4, 2]
@@ -0,0 +1,84 @@
+"""Replace uploads: staged loads swap in whole, and failures leave the live data alone"""
+import pandas as pd
+import pytest
+
+import server
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows
+from tests.test_rollups import rollup_state
+
+pytestmark = pytest.mark.anyio
+
+REPLACE = server.IngestMode.REPLACE
+
+
+def upload_rows(count, seed):
+    return [dict(zip(UPLOAD_COLUMNS, row)) for row in synthetic_upload_rows(count, agents=5, teams=3, seed=seed)]
+
+
+async def live_state(db):
+    return {
+        'tickets': sorted(await db.tickets.distinct('sr_number')),
+        'rollups': await rollup_state(db),
+        'agents': sorted(await db.agents.distinct('name')),
+    }
+
+
+async def staging_collections(db):
+    return [name for name in await db.list_collection_names() if server.STAGING_MARKER in name]
+
+
+async def test_replace_swaps_in_the_new_data(db, ingest):
+    await ingest(upload_rows(50, seed=1))
+    rows = upload_rows(20, seed=2)
+    stats = await ingest(rows, REPLACE)
+
+    assert stats['tickets_inserted'] == 20
+    assert await db.tickets.count_documents({}) == 20
+    incremental = await rollup_state(db)
+    await server.rebuild_sla_rollups()
+    assert await rollup_state(db) == incremental
+    assert await staging_collections(db) == []
+
+
+async def test_failed_load_leaves_the_live_data_unchanged(db, ingest):
+    await ingest(upload_rows(50, seed=1))
+    before = await live_state(db)
+
+    async def failing_chunks():
+        chunk = server.transform_frame(pd.DataFrame(upload_rows(20, seed=2)))
+        chunk['parse'] = 0.0
+        yield chunk
+        raise ValueError("corrupt sheet")
+
+    with pytest.raises(ValueError, match="corrupt sheet"):
+        await server.ingest_chunks(failing_chunks(), mode=REPLACE)
+    with pytest.raises(ValueError, match="no tickets"):
+        await ingest([{'SR Number': None, 'Resolved By': 'Ann'}], REPLACE)
+
+    assert await live_state(db) == before
+    assert await staging_collections(db) == []
+
+
+@pytest.mark.parametrize('collection', ['rollups', 'agents'])
+async def test_swap_is_finished_when_a_later_rename_fails(db, ingest, monkeypatch, collection):
+    await ingest(upload_rows(50, seed=1))
+    prepare = server.StagedLoad.prepare
+
+    async def prepare_with_failing_rename(self):
+        await prepare(self)
+        staged = getattr(self, collection)
+
+        async def rename(*args, **kwargs):
+            raise RuntimeError("rename failed")
+        object.__setattr__(staged, 'rename', rename)
+    monkeypatch.setattr(server.StagedLoad, 'prepare', prepare_with_failing_rename)
+
+    await ingest(upload_rows(20, seed=2), REPLACE)
+
+    # The new tickets stay live and the rollups and agents describe them
+    swapped = await live_state(db)
+    assert len(swapped['tickets']) == 20
+    await server.rebuild_sla_rollups()
+    assert await rollup_state(db) == swapped['rollups']
+    assert set(swapped['agents']) >= {row['Resolved By'] for row in upload_rows(20, seed=2) if row['Resolved By']}
+    assert await staging_collections(db) == []
@@ -0,0 +1,94 @@
+"""Incrementally maintained SLA rollups must equal a rebuild from the stored tickets"""
+import pytest
+
+import server
+from benchmarks.synthetic import UPLOAD_COLUMNS, synthetic_upload_rows
+
+pytestmark = pytest.mark.anyio
+
+
+def upload_rows(count, seed):
+    return [dict(zip(UPLOAD_COLUMNS, row)) for row in synthetic_upload_rows(count, agents=8, teams=3, seed=seed)]
+
+
+async def rollup_state(db):
+    """Rollup groups keyed by (agent, team, day), without zero sketch buckets or float summation noise"""
+    state = {}
+    async for group in db.sla_rollups.find({}, {"_id": 0}):
+        key = tuple(group.pop(name) for name in server.ROLLUP_KEYS)
+        for name, value in list(group.items()):
+            if isinstance(value, dict):
+                # A sketch whose buckets were all subtracted again matches one never created
+                buckets = {bucket: count for bucket, count in value.items() if count}
+                if buckets:
+                    group[name] = buckets
+                else:
+                    del group[name]
+            elif isinstance(value, float):
+                group[name] = round(value, 6)
+        state[key] = group
+    return state
+
+
+async def test_incremental_rollups_match_rebuild(db, ingest):
+    await ingest(upload_rows(300, seed=1))
+    # Same SR Numbers with different content: every row replaces a stored ticket
+    await ingest(upload_rows(200, seed=2), server.IngestMode.MERGE)
+    await server.create_test_pending_tickets()
+    incremental = await rollup_state(db)
+
+    assert await server.rebuild_sla_rollups() == len(incremental)
+    assert await rollup_state(db) == incremental
+
+
+async def test_replaced_ticket_moves_between_groups(db, ingest):
+    row = {'SR Number': 'SR1', 'Created': '2024-03-01 10:00', 'Resolved By': 'Ann', 'Updated Resolved By Team': 'L1',
+           'Response SLA Status': 'Met', 'Response Time (hh:mm)': '01:00'}
+    await ingest([row], server.IngestMode.MERGE)
+    await ingest([{**row, 'Resolved By': 'Bob', 'Response SLA Status': 'Breached'}], server.IngestMode.MERGE)
+
+    groups = await db.sla_rollups.find({}, {"_id": 0}).to_list(None)
+    assert [group['agent'] for group in groups] == ['Bob']
+    assert groups[0]['tickets'] == 1
+    assert groups[0]['response_sla_met'] == 0 and groups[0]['response_sla_breached'] == 1
+
+
+async def test_rebuild_is_skipped_while_another_holds_the_lease(db, ingest):
+    await ingest(upload_rows(20, seed=3))
+    token = await server.claim_rollup_rebuild()
+
+    assert await server.claim_rollup_rebuild() is None
+    assert await server.rebuild_sla_rollups() is None
+    await server.release_rollup_rebuild(token)
+    assert await server.rebuild_sla_rollups() > 0
+
+
+async def test_rebuild_is_skipped_while_an_ingest_runs(db, ingest):
+    await ingest(upload_rows(20, seed=3))
+    await server.save_ingest_job(server.IngestJob(file_name='upload.xlsx', status=server.IngestJobStatus.RUNNING))
+
+    assert await server.rebuild_sla_rollups() is None
+    assert not await server.rollup_rebuild_running()
+
+
+async def test_flush_only_deletes_groups_it_emptied(db, ingest, monkeypatch):
+    row = {'SR Number': 'SR1', 'Created': '2024-03-01 10:00', 'Resolved By': 'Ann', 'Updated Resolved By Team': 'L1'}
+    await ingest([row], server.IngestMode.MERGE)
+    await db.sla_rollups.insert_one({'agent': 'Zed', 'team': 'L2', 'day': '2024-01-01', 'tickets': 0})
+    deletes = []
+    collection_type = type(db.sla_rollups)
+    delete_many = collection_type.delete_many
+
+    def recording_delete_many(self, query, *args, **kwargs):
+        deletes.append(query)
+        return delete_many(self, query, *args, **kwargs)
+    monkeypatch.setattr(collection_type, 'delete_many', recording_delete_many)
+
+    # Appends only add tickets, so nothing can have emptied
+    await ingest([{**row, 'SR Number': 'SR2'}])
+    assert deletes == []
+    await ingest([{**row, 'Resolved By': 'Bob'}], server.IngestMode.MERGE)
+
+    assert len(deletes) == 1
+    agents = sorted(group['agent'] for group in await db.sla_rollups.find({}, {"_id": 0}).to_list(None))
+    assert agents == ['Ann', 'Bob', 'Zed']
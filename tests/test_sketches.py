@@ -0,0 +1,65 @@
+"""DDSketch time percentiles: accuracy and merging across rollup groups"""
+import math
+import random
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import server
+
+
+def sketch(values):
+    return dict(Counter(server.sketch_buckets(pd.Series(values)).dropna()))
+
+
+def test_percentiles_are_within_the_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(1, 1.5) + 0.1 for _ in range(5000))
+    percentiles = [1, 25, 50, 75, 90, 99, 100]
+    summary = server.summarize_sketch(sketch(values), percentiles, [])
+
+    assert summary['count'] == len(values)
+    for percentile in percentiles:
+        exact = values[math.floor(percentile / 100 * (len(values) - 1))]
+        estimate = summary['percentiles'][f"p{percentile}"]
+        # Plus the rounding to 2 decimals
+        assert abs(estimate - exact) <= exact * server.SKETCH_RELATIVE_ACCURACY + 0.005
+
+
+def test_merged_sketches_equal_one_sketch_of_all_values():
+    rng = random.Random(11)
+    first = [rng.expovariate(0.2) for _ in range(700)] + [0.0, None]
+    second = [rng.expovariate(0.05) for _ in range(300)]
+    merged = Counter(sketch(first)) + Counter(sketch(second))
+
+    assert merged == Counter(sketch(first + second))
+    edges = [1, 8, 24]
+    assert server.summarize_sketch(dict(merged), [50, 99], edges) == server.summarize_sketch(sketch(first + second), [50, 99], edges)
+
+
+def test_histogram_counts_every_value_once():
+    summary = server.summarize_sketch(sketch([0.0, 0.5, 2, 2, 30, 200]), [50], [1, 24])
+
+    assert [row['count'] for row in summary['histogram']] == [2, 2, 2]
+    assert summary['histogram'][-1] == {'from_hours': 24, 'to_hours': None, 'count': 2}
+
+
+@pytest.mark.anyio
+async def test_time_distribution_merges_groups_from_separate_uploads(db, ingest):
+    def rows(agent, hours):
+        return [
+            {'SR Number': f"{agent}-{index}", 'Resolved By': agent, 'Response Time (hh:mm)': value / 24}
+            for index, value in enumerate(hours)
+        ]
+    rng = random.Random(3)
+    ann = [rng.uniform(0.5, 10) for _ in range(200)]
+    bob = [rng.uniform(5, 50) for _ in range(100)]
+    await ingest(rows('Ann', ann))
+    await ingest(rows('Bob', bob))
+
+    result = await server.compute_time_distribution({}, server.TimeGrouping.OVERALL, [50, 90], [])
+    response = result['groups'][0]['response_time']
+    expected = server.summarize_sketch(sketch(server.time_series_to_hours(pd.Series([value / 24 for value in ann + bob]))), [50, 90], [])
+    assert response['count'] == 300
+    assert response['percentiles'] == expected['percentiles']
@@ -0,0 +1,91 @@
+"""Compact ticket storage: enum codes, the area dictionary and the API view"""
+import uuid
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import server
+
+RECORD = {
+    'sr_number': 'SR1',
+    'created': datetime(2024, 3, 1, 10, 0),
+    'area': 'Billing',
+    'sub_area': None,
+    'status': 'In Progress',
+    'resolved_by': 'Ann',
+    'updated_resolved_by_team': 'L1',
+    'updated_team': 'Business Team',
+    'response_sla_status': 'Met',
+    'resolution_sla_status': 'Breached',
+    'response_time_hours': 1.5,
+    'resolution_time_hours': None,
+    'life_cycle_target_hrs': 24.0,
+    'sla_risk': 'At Risk',
+}
+
+
+def no_dictionary():
+    return {field: {} for field in server.DICTIONARY_FIELDS}
+
+
+def test_stored_ticket_codes_enums_and_drops_nulls_and_ids():
+    stored = server.stored_ticket({'id': str(uuid.uuid4()), 'created_at': '2024-01-01T00:00:00', **RECORD})
+
+    assert stored['status'] == server.STATUS_CODES['In Progress']
+    assert stored['response_sla_status'] == server.SLA_STATUS_CODES['Met']
+    assert stored['sla_risk'] == server.SLA_STATUS_CODES['At Risk']
+    assert not {'id', 'created_at', 'sub_area', 'resolution_time_hours'} & stored.keys()
+
+
+def test_api_ticket_round_trips_stored_ticket():
+    object_id = ObjectId()
+    stored = {'_id': object_id, **server.stored_ticket(RECORD)}
+
+    assert server.api_ticket(stored, no_dictionary()) == {
+        **{name: value for name, value in RECORD.items() if value is not None},
+        'id': str(object_id),
+        'created_at': object_id.generation_time,
+    }
+
+
+def test_unknown_enum_values_are_stored_verbatim():
+    stored = server.stored_ticket({**RECORD, 'status': 'Escalated', 'response_sla_status': 'Waived'})
+
+    assert (stored['status'], stored['response_sla_status']) == ('Escalated', 'Waived')
+    assert server.stored_code('status', 'Escalated') == 'Escalated'
+    assert server.api_ticket(stored, no_dictionary())['status'] == 'Escalated'
+
+
+@pytest.mark.anyio
+async def test_dictionary_codes_are_shared_across_workers(db):
+    documents = [server.stored_ticket({**RECORD, 'sr_number': f"SR{index}", 'area': area}) for index, area in enumerate(['Billing', 'Access', 'Billing'])]
+    await db.ticket_dictionary.create_indexes(server.DICTIONARY_INDEXES)
+    await server.ticket_dictionary.encode(documents)
+
+    codes = [document['area'] for document in documents]
+    assert all(isinstance(code, int) for code in codes)
+    assert codes[0] == codes[2] != codes[1]
+    # Another worker's dictionary starts empty, reads the codes back and reuses them
+    other = server.TicketDictionary()
+    decoded = await other.decode([{'_id': ObjectId(), **document} for document in documents])
+    assert [ticket['area'] for ticket in decoded] == ['Billing', 'Access', 'Billing']
+    again = [server.stored_ticket({**RECORD, 'area': 'Access'})]
+    await other.encode(again)
+    assert again[0]['area'] == codes[1]
+
+
+@pytest.mark.anyio
+async def test_legacy_tickets_are_migrated(db):
+    legacy = {
+        'id': str(uuid.uuid4()), **RECORD, 'created_at': '2024-01-01T00:00:00', 'content_hash': 'abc',
+    }
+    await db.tickets.insert_one(dict(legacy))
+
+    assert await server.migrate_compact_tickets() == 1
+    stored = await db.tickets.find_one({})
+    assert 'id' not in stored and 'sub_area' not in stored
+    assert isinstance(stored['area'], int)
+    [ticket] = await server.ticket_dictionary.decode([stored])
+    assert ticket['status'] == 'In Progress' and ticket['area'] == 'Billing'
+    assert await server.migrate_compact_tickets() == 0